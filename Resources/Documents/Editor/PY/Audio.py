@@ -41,7 +41,10 @@
   </summary>
   ******************************************************************************************
   '''
-from typing import Any, Dict, List, Optional
+import io
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import PySimpleGUI as sg
@@ -49,56 +52,394 @@ import sounddevice as sd
 import soundfile as sf
 from loguru import logger
 
-from src.Configuration import OUTPUT_FILE_NAME, SAMPLE_RATE
+from src.Buffers import AudioBuffer
+from src.Configuration import (
+    AUDIO_BUFFER_PATH,
+    AUDIO_BUFFER_SECONDS,
+    AUDIO_CODEC,
+    AUDIO_DEVICE,
+    AUDIO_IN_MEMORY,
+    CHUNK_OVERLAP_SECONDS,
+    CHUNK_SECONDS,
+    MIN_CHUNK_SECONDS,
+    OUTPUT_FILE_NAME,
+    SAMPLE_RATE,
+    SILENCE_THRESHOLD,
+    VAD_FRAME_SECONDS,
+    VAD_MIN_SILENCE_SECONDS,
+    VAD_PADDING_SECONDS,
+    VAD_TRIM,
+)
 
-def find_blackhole_device_id() -> Optional[ int ]:
+# Codec name: ( soundfile format, subtype, file extension )
+CODECS: Dict[ str, Tuple[ str, str, str ] ] = {
+    'WAV': ('WAV', 'PCM_16', 'wav'),
+    'FLAC': ('FLAC', 'PCM_16', 'flac'),
+    'OPUS': ('OGG', 'OPUS', 'ogg'),
+}
+
+# The last recording, when AUDIO_IN_MEMORY is set
+recording: Optional[ io.BytesIO ] = None
+
+def find_device_id( name: str ) -> Optional[ int ]:
     '''
-    Find the BlackHole device ID in the list of devices.
+    Find the ID of the first input device whose name contains 'name', ignoring case.
+
+    Args:
+        name (str): The device name, or part of it.
 
     Returns:
-        Optional[int]: The BlackHole device ID if found, None otherwise.
+        Optional[int]: The device ID if found, None otherwise.
     '''
     devices: List[ Dict[ str, Any ] ] = sd.query_devices()
     for device_id, device in enumerate( devices ):
-        if 'BlackHole' in device[ 'name' ]:
+        if name.lower( ) in device[ 'name' ].lower( ) and device[ 'max_input_channels' ] > 0:
             return device_id
 
     return None
 
-def record( button: sg.Element ) -> None:
+def find_blackhole_device_id() -> Optional[ int ]:
+    '''
+    Find the BlackHole device ID in the list of devices.
+
+    Returns:
+        Optional[int]: The BlackHole device ID if found, None otherwise.
+    '''
+    return find_device_id( 'BlackHole' )
+
+class DeviceRegistry:
+    '''
+    Cache of the input device ID, so recording starts without enumerating devices.
+
+    The device is resolved once, from a configured ID or name, and reused until the device
+    list changes. PortAudio only sees devices added or removed after it is reinitialized, so
+    'rescan' reinitializes it while no stream is open, reads the list with sd.query_devices
+    and drops the cached ID when the list differs from the last one. Rescans run on demand:
+    open_stream rescans once when the cached device can no longer be opened, and the 'D'
+    key rescans from the window. 'watch' rescans periodically to pick up hot-plugged
+    devices, and is only started when AUDIO_DEVICE_POLL_SECONDS is set.
+
+    sounddevice has no public call to reinitialize PortAudio, so 'rescan' uses its
+    _terminate and _initialize functions (sounddevice 0.3 through 0.5). Without them the
+    device list is only read again, and devices plugged in after startup are not seen.
+    Reinitializing closes every PortAudio stream of the process, and only streams opened
+    through open_stream are known here, which is why periodic rescans are opt-in.
+
+    Args:
+        device (Union[int, str, None], optional): The device ID, a part of its name, or None
+            for the system default. Defaults to AUDIO_DEVICE.
+    '''
+
+    def __init__( self, device: Union[ int, str, None ] = AUDIO_DEVICE ) -> None:
+        self.device: Union[ int, str, None ] = device
+        self.device_id: Optional[ int ] = None
+        self.resolved: bool = False
+        self.signature: Optional[ Tuple[ Tuple[ str, int, int ], ... ] ] = None
+        self.__streams: int = 0
+        self.__stopped: threading.Event = threading.Event( )
+        self.__watcher: Optional[ threading.Thread ] = None
+        self.__lock: threading.RLock = threading.RLock( )
+
+    def get_device_id( self ) -> Optional[ int ]:
+        '''
+        Returns:
+            Optional[int]: The cached device ID, resolving it on first use. None selects the
+                system default device.
+        '''
+        with self.__lock:
+            if not self.resolved:
+                self.__resolve( )
+
+            return self.device_id
+
+    def invalidate( self, rescan: bool = False ) -> None:
+        '''
+        Forget the cached device ID.
+
+        Args:
+            rescan (bool, optional): Whether to reinitialize PortAudio so that added or
+                removed devices are seen. Skipped while a stream is open. Defaults to False.
+        '''
+        with self.__lock:
+            self.resolved = False
+            self.device_id = None
+            if rescan:
+                self.rescan( )
+
+    def rescan( self ) -> bool:
+        '''
+        Reinitialize PortAudio and read the device list again, dropping the cached device ID
+        when the list has changed. Nothing is done while a stream is open, since
+        reinitializing PortAudio would close it.
+
+        Returns:
+            bool: True when the device list has changed since the last scan.
+        '''
+        with self.__lock:
+            if self.__streams:
+                return False
+
+            terminate: Optional[ Callable[ [ ], None ] ] = getattr( sd, '_terminate', None )
+            initialize: Optional[ Callable[ [ ], None ] ] = getattr( sd, '_initialize', None )
+            if terminate is not None and initialize is not None:
+                try:
+                    terminate( )
+                    initialize( )
+                except sd.PortAudioError as error:
+                    logger.error( f'Cannot reinitialize PortAudio: {error}' )
+                    return False
+
+            signature: Tuple[ Tuple[ str, int, int ], ... ] = self.__get_signature( )
+            changed: bool = self.signature is not None and signature != self.signature
+            self.signature = signature
+            if changed:
+                logger.info( 'Audio devices changed; resolving the device again.' )
+                self.resolved = False
+                self.device_id = None
+
+            return changed
+
+    def watch( self, interval: float ) -> threading.Thread:
+        '''
+        Rescan the devices every 'interval' seconds on a background thread until 'stop' is
+        called, so hot-plugged devices are picked up between recordings.
+
+        Args:
+            interval (float): The number of seconds between scans.
+
+        Returns:
+            threading.Thread: The watcher thread.
+        '''
+        with self.__lock:
+            if self.__watcher is None or not self.__watcher.is_alive( ):
+                self.__stopped.clear( )
+                self.__watcher = threading.Thread(
+                    target = self.__watch, args = (interval,), daemon = True
+                )
+                self.__watcher.start( )
+
+            return self.__watcher
+
+    def stop( self ) -> None:
+        '''
+        Stop the watcher thread.
+        '''
+        self.__stopped.set( )
+
+    def warm_up( self ) -> threading.Thread:
+        '''
+        Resolve the device on a background thread, e.g. at startup.
+
+        Returns:
+            threading.Thread: The started thread.
+        '''
+        thread: threading.Thread = threading.Thread( target = self.get_device_id, daemon = True )
+        thread.start( )
+        return thread
+
+    @contextmanager
+    def open_stream( self ) -> Iterator[ sd.InputStream ]:
+        '''
+        Open an input stream on the cached device, rescanning once if it fails to open.
+        PortAudio is not rescanned while the stream is open.
+
+        Yields:
+            sd.InputStream: The started input stream, closed on exit.
+        '''
+        with self.__lock:
+            try:
+                stream: sd.InputStream = sd.InputStream(
+                    samplerate = SAMPLE_RATE, device = self.get_device_id( )
+                )
+            except (sd.PortAudioError, ValueError) as error:
+                logger.warning(
+                    f'Cannot open audio device {self.device_id}: {error}. Rescanning...'
+                )
+                self.invalidate( rescan = True )
+                stream = sd.InputStream( samplerate = SAMPLE_RATE, device = self.get_device_id( ) )
+
+            self.__streams += 1
+
+        try:
+            with stream:
+                yield stream
+        finally:
+            with self.__lock:
+                self.__streams -= 1
+
+    def __resolve( self ) -> None:
+        if self.signature is None:
+            self.signature = self.__get_signature( )
+
+        if isinstance( self.device, int ) or self.device is None:
+            self.device_id = self.device
+        else:
+            self.device_id = find_device_id( self.device )
+            if self.device_id is None:
+                logger.warning( f'Audio device "{self.device}" not found; using the default.' )
+
+        logger.debug( f'Audio device resolved: {self.device_id}' )
+        self.resolved = True
+
+    def __watch( self, interval: float ) -> None:
+        while not self.__stopped.wait( interval ):
+            try:
+                self.rescan( )
+            except Exception as error:
+                logger.error( f'Audio device scan failed: {error}' )
+
+    @staticmethod
+    def __get_signature( ) -> Tuple[ Tuple[ str, int, int ], ... ]:
+        return tuple(
+            (device[ 'name' ], device[ 'hostapi' ], device[ 'max_input_channels' ])
+            for device in sd.query_devices( )
+        )
+
+devices: DeviceRegistry = DeviceRegistry( )
+
+def is_silent( data: np.ndarray, threshold: float = SILENCE_THRESHOLD ) -> bool:
     '''
-    Record audio from the BlackHole device while the record button is active.
-    Save the audio to a file.
+    Check whether a frame of audio is silent.
+
+    Args:
+        data (np.ndarray): The audio frame.
+        threshold (float, optional): The RMS level below which the frame is silent.
+            Defaults to SILENCE_THRESHOLD.
+
+    Returns:
+        bool: True if the RMS level of the frame is below the threshold.
+    '''
+    if data.size == 0:
+        return True
+
+    return float( np.sqrt( np.mean( np.square( data, dtype = np.float64 ) ) ) ) < threshold
+
+def trim_silence(
+        audio_data: np.ndarray,
+        threshold: float = SILENCE_THRESHOLD,
+        min_silence: float = VAD_MIN_SILENCE_SECONDS,
+        padding: float = VAD_PADDING_SECONDS,
+        frame_seconds: float = VAD_FRAME_SECONDS,
+) -> Tuple[ np.ndarray, float ]:
+    '''
+    Drop the silent spans of the audio and join the speech segments.
+
+    The audio is split into short frames whose RMS level decides speech or silence. Pauses
+    shorter than 'min_silence' are kept so segments within a sentence merge, and each segment
+    keeps 'padding' seconds on both sides so word onsets are not clipped.
+
+    Args:
+        audio_data (np.ndarray): The audio data.
+        threshold (float, optional): The RMS level below which a frame is silent.
+            Defaults to SILENCE_THRESHOLD.
+        min_silence (float, optional): The shortest pause, in seconds, that is removed.
+            Defaults to VAD_MIN_SILENCE_SECONDS.
+        padding (float, optional): The seconds kept around each segment.
+            Defaults to VAD_PADDING_SECONDS.
+        frame_seconds (float, optional): The length of an analysis frame.
+            Defaults to VAD_FRAME_SECONDS.
+
+    Returns:
+        Tuple[np.ndarray, float]: The trimmed audio and the number of seconds removed.
+    '''
+    size: int = max( 1, int( frame_seconds * SAMPLE_RATE ) )
+    count: int = -(-len( audio_data ) // size)
+    if count == 0:
+        return audio_data, 0.0
+
+    # RMS level of each frame, without a float64 copy of the audio
+    energy: np.ndarray = np.empty( count, dtype = np.float64 )
+    for index in range( count ):
+        frame: np.ndarray = audio_data[ index * size:(index + 1) * size ]
+        energy[ index ] = np.sqrt( np.vdot( frame, frame ) / frame.size )
+
+    speech: np.ndarray = np.flatnonzero( energy >= threshold )
+    if speech.size == 0:
+        return audio_data[ :0 ], len( audio_data ) / SAMPLE_RATE
+
+    # Merge speech runs separated by short pauses, or by pauses the padding would cover
+    pad: int = int( padding / frame_seconds )
+    pause: int = max( 1, int( min_silence / frame_seconds ), 2 * pad )
+    gaps: np.ndarray = np.flatnonzero( np.diff( speech ) > pause )
+    starts: np.ndarray = np.concatenate( ([ speech[ 0 ] ], speech[ gaps + 1 ]) )
+    ends: np.ndarray = np.concatenate( (speech[ gaps ], [ speech[ -1 ] ]) ) + 1
+
+    # Pad each segment and convert frames to samples
+    segments: List[ np.ndarray ] = [
+        audio_data[ max( 0, start - pad ) * size:min( count, end + pad ) * size ]
+        for start, end in zip( starts, ends )
+    ]
+    trimmed: np.ndarray = segments[ 0 ] if len( segments ) == 1 else np.concatenate( segments )
+    return trimmed, (len( audio_data ) - len( trimmed )) / SAMPLE_RATE
+
+def record(
+        button: sg.Element, on_chunk: Optional[ Callable[ [ np.ndarray, bool ], None ] ] = None
+) -> None:
+    '''
+    Record audio from the configured device while the record button is active.
+    Encode the audio in memory when AUDIO_IN_MEMORY is set, otherwise save it to a file.
+
+    When 'on_chunk' is given, the capture is also cut into chunks while recording continues.
+    A chunk is cut every CHUNK_SECONDS, or earlier on a silent frame once it holds at least
+    MIN_CHUNK_SECONDS of new audio, and starts with the last CHUNK_OVERLAP_SECONDS of the
+    previous chunk. The last chunk is passed with the final flag set, and may be empty.
 
     Args:
         button (sg.Element): The record button element.
+        on_chunk (Optional[Callable[[np.ndarray, bool], None]], optional): Called with each
+            chunk and whether it is the final one. Defaults to None.
     '''
+    global recording
     logger.debug( 'Recording...' )
-    frames: List[ np.ndarray ] = [ ]
+    buffer: AudioBuffer = AudioBuffer( AUDIO_BUFFER_SECONDS, SAMPLE_RATE, AUDIO_BUFFER_PATH )
+    overlap: int = int( CHUNK_OVERLAP_SECONDS * SAMPLE_RATE )
+    start: int = 0
+    cut: int = 0
 
-    # Find BlackHole device ID
-    device_id: Optional[ int ] = find_blackhole_device_id()
-
-    # Record audio
+    # Record audio from the cached device
     try:
-        with sd.InputStream( samplerate = SAMPLE_RATE, device = device_id ) as stream:
+        with devices.open_stream( ) as stream:
             while button.metadata.state:
                 data: np.ndarray
                 overflowed: bool
                 data, overflowed = stream.read( SAMPLE_RATE )
                 if overflowed:
                     logger.warning( 'Audio buffer overflowed' )
-                frames.append( data )
+                buffer.write( data )
+
+                # Cut a chunk on a silence boundary or every CHUNK_SECONDS
+                if on_chunk is not None:
+                    fresh: int = len( buffer ) - cut
+                    if fresh >= CHUNK_SECONDS * SAMPLE_RATE or (
+                            fresh >= MIN_CHUNK_SECONDS * SAMPLE_RATE and is_silent( data )):
+                        on_chunk( buffer.get_data( start ), False )
+                        cut = len( buffer )
+                        start = max( 0, cut - overlap )
 
     except Exception as e:
         logger.error( f'An error occurred during recording: {e}' )
 
-    # Save audio file
-    if frames:
-        audio_data: np.ndarray = np.vstack( frames )
-        save_audio_file( audio_data )
-    else:
+    # Flush the last chunk
+    if on_chunk is not None:
+        on_chunk( buffer.get_data( start if len( buffer ) > cut else len( buffer ) ), True )
+
+    # Drop silent spans
+    audio_data: np.ndarray = buffer.get_data( )
+    if VAD_TRIM and len( audio_data ):
+        removed: float
+        audio_data, removed = trim_silence( audio_data )
+        logger.info( f'Trimmed {removed:.1f} of {buffer.get_seconds( ):.1f} seconds of silence.' )
+
+    # Encode the recording in memory, or save audio file
+    if not len( audio_data ):
         logger.warning( 'No audio recorded.' )
+    elif AUDIO_IN_MEMORY:
+        recording = encode_audio( audio_data, 'record' )
+        logger.debug( f'Audio encoded: {recording.getbuffer( ).nbytes} bytes...' )
+    else:
+        save_audio_file( audio_data )
+
+    buffer.close( )
 
 def save_audio_file(
         audio_data: np.ndarray, output_file_name: str = OUTPUT_FILE_NAME
@@ -118,3 +459,45 @@ def save_audio_file(
         subtype = 'PCM_16',
     )
     logger.debug( f'Audio saved to: {output_file_name}...' )
+
+def encode_audio(
+        audio_data: np.ndarray, name: str = 'chunk', codec: str = AUDIO_CODEC
+) -> io.BytesIO:
+    '''
+    Encode the audio data into an in-memory buffer.
+
+    Args:
+        audio_data (np.ndarray): The audio data.
+        name (str, optional): The file name, without extension, reported to the upload.
+            Defaults to 'chunk'.
+        codec (str, optional): One of the CODECS. Defaults to AUDIO_CODEC.
+
+    Returns:
+        io.BytesIO: The encoded audio, positioned at the start.
+    '''
+    audio_format, subtype, extension = CODECS[ codec.upper( ) ]
+    buffer: io.BytesIO = io.BytesIO( )
+    sf.write(
+        file = buffer,
+        data = audio_data,
+        samplerate = SAMPLE_RATE,
+        format = audio_format,
+        subtype = subtype,
+    )
+    buffer.name = f'{name}.{extension}'
+    buffer.seek( 0 )
+    return buffer
+
+def get_recording( ) -> Union[ str, io.BytesIO ]:
+    '''
+    Get the last recording for transcription.
+
+    Returns:
+        Union[str, io.BytesIO]: The in-memory recording rewound to the start when
+            AUDIO_IN_MEMORY is set and a recording exists, otherwise OUTPUT_FILE_NAME.
+    '''
+    if AUDIO_IN_MEMORY and recording is not None:
+        recording.seek( 0 )
+        return recording
+
+    return OUTPUT_FILE_NAME
@@ -0,0 +1,761 @@
+'''
+  ******************************************************************************************
+      Assembly:                Boo
+      Filename:                Benchmarks.py
+      Author:                  Terry D. Eppler
+      Created:                 05-31-2023
+
+      Last Modified By:        Terry D. Eppler
+      Last Modified On:        06-01-2023
+  ******************************************************************************************
+  <copyright file="Benchmarks.py" company="Terry D. Eppler">
+
+     This is a Federal Budget, Finance, and Accounting application.
+     Copyright ©  2024  Terry Eppler
+
+     Permission is hereby granted, free of charge, to any person obtaining a copy
+     of this software and associated documentation files (the “Software”),
+     to deal in the Software without restriction,
+     including without limitation the rights to use,
+     copy, modify, merge, publish, distribute, sublicense,
+     and/or sell copies of the Software,
+     and to permit persons to whom the Software is furnished to do so,
+     subject to the following conditions:
+
+     The above copyright notice and this permission notice shall be included in all
+     copies or substantial portions of the Software.
+
+     THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+     INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+     FITNESS FOR A PARTICULAR PURPOSE AND NON-INFRINGEMENT.
+     IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+     DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+     ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+     DEALINGS IN THE SOFTWARE.
+
+     You can contact me at: terryeppler@gmail.com or eppler.terry@epa.gov
+
+  </copyright>
+  <summary>
+    Benchmarks.py
+  </summary>
+  ******************************************************************************************
+  '''
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+from openai import OpenAI
+
+from Boo import ClientPool
+
+class MockHandler( BaseHTTPRequestHandler ):
+    '''
+
+        Minimal keep-alive HTTP handler answering every POST with a canned
+        chat completion, used to benchmark the client side in isolation.
+
+    '''
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    delay = 0.005
+    body = json.dumps( { 'id': 'mock', 'object': 'chat.completion', 'created': 0,
+                         'model': 'gpt-4o', 'choices': [ { 'index': 0,
+                         'finish_reason': 'stop', 'message': { 'role': 'assistant',
+                         'content': 'OK' } } ] } ).encode( 'utf-8' )
+
+
+    def do_POST( self ):
+        self.rfile.read( int( self.headers.get( 'Content-Length', 0 ) ) )
+        time.sleep( self.delay )
+        self.send_response( 200 )
+        self.send_header( 'Content-Type', 'application/json' )
+        self.send_header( 'Content-Length', str( len( self.body ) ) )
+        self.end_headers( )
+        self.wfile.write( self.body )
+
+
+    def log_message( self, format, *args ):
+        pass
+
+
+def start_server( ) -> ThreadingHTTPServer:
+    '''
+
+        Purpose: starts the mock server on a free localhost port
+
+        Returns: ThreadingHTTPServer
+
+    '''
+    ThreadingHTTPServer.request_queue_size = 128
+    _server = ThreadingHTTPServer( ( '127.0.0.1', 0 ), MockHandler )
+    _server.daemon_threads = True
+    Thread( target = _server.serve_forever, daemon = True ).start( )
+    return _server
+
+
+def get_percentiles( samples: list[ float ] ) -> tuple[ float, float ]:
+    '''
+
+        Returns: ( p50, p99 ) of 'samples' in milliseconds
+
+    '''
+    _cuts = statistics.quantiles( samples, n = 100 )
+    return ( _cuts[ 49 ] * 1000, _cuts[ 98 ] * 1000 )
+
+
+def benchmark_clients( requests: int = 500, workers: int = 32 ) -> dict:
+    '''
+
+        Purpose: fires 'requests' chat completions at a local mock server from
+        'workers' threads, first with a new OpenAI client per request (the old
+        behavior of every AI subclass) and then with the shared ClientPool
+        clients, and reports p50/p99 latency for each.  Every mode holds a
+        ClientPool request slot and is timed from inside it, so the numbers
+        compare the request itself and not time spent queued for a slot.
+
+        Parameters: requests: int, workers: int
+
+        Returns: dict of ( p50, p99 ) in milliseconds keyed by mode
+
+    '''
+    _server = start_server( )
+    _url = f'http://127.0.0.1:{_server.server_address[ 1 ]}/v1'
+    _messages = [ { 'role': 'user', 'content': 'ping' } ]
+    _results = { }
+
+    def _unpooled( _ ) -> float:
+        with ClientPool.limit( ):
+            _start = time.perf_counter( )
+            _client = OpenAI( api_key = 'mock', base_url = _url )
+            _client.chat.completions.create( model = 'gpt-4o', messages = _messages )
+            _client.close( )
+            return time.perf_counter( ) - _start
+
+    def _pooled( _ ) -> float:
+        with ClientPool.limit( ):
+            _start = time.perf_counter( )
+            _client = ClientPool.get_client( 'mock', _url )
+            _client.chat.completions.create( model = 'gpt-4o', messages = _messages )
+            return time.perf_counter( ) - _start
+
+    async def _async_pooled( ) -> list[ float ]:
+        async def _worker( count: int ) -> list[ float ]:
+            _samples = [ ]
+            for _ in range( count ):
+                async with ClientPool.limit_async( ):
+                    _start = time.perf_counter( )
+                    _client = ClientPool.get_async_client( 'mock', _url )
+                    await _client.chat.completions.create( model = 'gpt-4o',
+                        messages = _messages )
+                    _samples.append( time.perf_counter( ) - _start )
+            return _samples
+        _counts = [ requests // workers + ( 1 if i < requests % workers else 0 )
+                    for i in range( workers ) ]
+        _batches = await asyncio.gather( *[ _worker( c ) for c in _counts ] )
+        return [ _s for _batch in _batches for _s in _batch ]
+
+    with ThreadPoolExecutor( max_workers = workers ) as _pool:
+        _results[ 'unpooled' ] = get_percentiles( list( _pool.map( _unpooled, range( requests ) ) ) )
+    with ThreadPoolExecutor( max_workers = workers ) as _pool:
+        _results[ 'pooled' ] = get_percentiles( list( _pool.map( _pooled, range( requests ) ) ) )
+    _results[ 'async pooled' ] = get_percentiles( asyncio.run( _async_pooled( ) ) )
+
+    _server.shutdown( )
+    ClientPool.close( )
+    for _mode, ( _p50, _p99 ) in _results.items( ):
+        print( f'{_mode:>14}:  p50 = {_p50:8.2f} ms   p99 = {_p99:8.2f} ms' )
+    return _results
+
+
+def get_peak_rss( ) -> float:
+    '''
+
+        Returns: the peak resident set size of this process in megabytes
+
+    '''
+    import resource
+    _peak = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+    return _peak / ( 1024 * 1024 ) if sys.platform == 'darwin' else _peak / 1024
+
+
+def measure_capture( mode: str, minutes: float, channels: int, samplerate: int ) -> tuple:
+    '''
+
+        Purpose: captures 'minutes' of synthetic one-second frames the way
+        Audio.record does in 'mode' ( 'list', 'buffer' or 'memmap' ) and hands the
+        result to a stand-in for save_audio_file. Runs in a fresh process so the
+        peak RSS belongs to this capture alone.
+
+        Parameters: mode: str, minutes: float, channels: int, samplerate: int
+
+        Returns: ( seconds, peak RSS growth in MB )
+
+    '''
+    import numpy as np
+    from Buffers import AudioBuffer
+    _template = np.full( ( samplerate, channels ), 0.25, dtype = np.float32 )
+    _frames = int( minutes * 60 )
+    _path = None
+    _baseline = get_peak_rss( )
+    _start = time.perf_counter( )
+    if mode == 'list':
+        _list = [ ]
+        for _ in range( _frames ):
+            _list.append( _template.copy( ) )
+        _data = np.vstack( _list )
+    else:
+        if mode == 'memmap':
+            _path = os.path.join( tempfile.gettempdir( ), 'capture.raw' )
+        _buffer = AudioBuffer( 60 * 60, samplerate, _path )
+        for _ in range( _frames ):
+            _buffer.write( _template.copy( ) )
+        _data = _buffer.get_data( )
+    _checksum = float( _data[ ::samplerate ].sum( ) )
+    _seconds = time.perf_counter( ) - _start
+    _peak = get_peak_rss( ) - _baseline
+    if _path is not None:
+        del _data
+        _buffer.close( )
+    return ( _seconds, _peak, _checksum )
+
+
+def benchmark_audio( minutes: float = 30, channels: int = 2, samplerate: int = 48000 ) -> dict:
+    '''
+
+        Purpose: records a synthetic 'minutes'-long stream of one-second frames
+        into a list concatenated with np.vstack (the old Audio.record), into an
+        in-memory AudioBuffer, and into a memory-mapped AudioBuffer, each in its
+        own process, and reports capture time and peak RSS growth.
+
+        Parameters: minutes: float, channels: int, samplerate: int
+
+        Returns: dict of ( seconds, peak MB ) keyed by mode
+
+    '''
+    _results = { }
+    _size = minutes * 60 * samplerate * channels * 4 / ( 1024 * 1024 )
+    print( f'{"audio":>14}:  {_size:8.1f} MB of float32 samples' )
+    _context = multiprocessing.get_context( 'spawn' )
+    for _mode in ( 'list', 'buffer', 'memmap' ):
+        with _context.Pool( 1 ) as _pool:
+            _seconds, _peak, _ = _pool.apply( measure_capture,
+                ( _mode, minutes, channels, samplerate ) )
+        _results[ _mode ] = ( _seconds, _peak )
+        print( f'{_mode:>14}:  {_seconds:8.2f} s   peak RSS +{_peak:8.1f} MB' )
+    return _results
+
+
+def create_database( path: str, rows: int ) -> None:
+    '''
+
+        Purpose: writes a synthetic MainAccounts table of 'rows' rows to the
+        SQLite file at 'path'
+
+        Parameters: path: str, rows: int
+
+        Returns: None
+
+    '''
+    import sqlite3
+    _connection = sqlite3.connect( path )
+    _connection.execute( 'CREATE TABLE IF NOT EXISTS MainAccounts ( MainAccountsId INTEGER '
+                         'PRIMARY KEY, AgencyIdentifier TEXT, AgencyCode TEXT, Code TEXT, '
+                         'Name TEXT, Type TEXT );' )
+    _connection.execute( 'CREATE INDEX IF NOT EXISTS MainAccountsCode ON MainAccounts( Code );' )
+    _connection.executemany( 'INSERT INTO MainAccounts ( AgencyIdentifier, AgencyCode, Code, '
+                             'Name, Type ) VALUES ( ?, ?, ?, ?, ? );',
+        ( ( '068', '20', f'{i:04d}', f'Account {i}', 'General' ) for i in range( rows ) ) )
+    _connection.commit( )
+    _connection.close( )
+
+
+def benchmark_lookups( lookups: int = 10000, rows: int = 2000 ) -> dict:
+    '''
+
+        Purpose: runs 'lookups' single-row queries against the MainAccounts table
+        of Boo.db, first opening a new connection per lookup through
+        Connection.connect (the old behavior) and then borrowing one from
+        ConnectionPool, and reports lookups per second for each. When Boo.db
+        does not exist a synthetic one is created in a temporary directory.
+
+        Parameters: lookups: int, rows: int
+
+        Returns: dict of lookups per second keyed by mode
+
+    '''
+    from Data import Connection, ConnectionPool, DbConfig
+    from Static import Provider, Source
+    _cwd = os.getcwd( )
+    _temp = None
+    if not os.path.exists( DbConfig( Source.MainAccounts ).get_data_path( ) ):
+        _temp = tempfile.TemporaryDirectory( )
+        os.chdir( _temp.name )
+        create_database( DbConfig( Source.MainAccounts ).get_data_path( ), rows )
+    _sql = 'SELECT Name FROM MainAccounts WHERE Code = ?;'
+    _codes = [ f'{i % rows:04d}' for i in range( lookups ) ]
+    _results = { }
+    try:
+        _start = time.perf_counter( )
+        for _code in _codes:
+            _connection = Connection( Source.MainAccounts, Provider.SQLite ).connect( )
+            _connection.execute( _sql, ( _code, ) ).fetchone( )
+            _connection.close( )
+        _results[ 'connect' ] = lookups / ( time.perf_counter( ) - _start )
+
+        _start = time.perf_counter( )
+        for _code in _codes:
+            with ConnectionPool.checkout( Source.MainAccounts, Provider.SQLite ) as _connection:
+                _connection.execute( _sql, ( _code, ) ).fetchone( )
+        _results[ 'pooled' ] = lookups / ( time.perf_counter( ) - _start )
+    finally:
+        ConnectionPool.close( )
+        os.chdir( _cwd )
+        if _temp is not None:
+            _temp.cleanup( )
+    for _mode, _rate in _results.items( ):
+        print( f'{_mode:>14}:  {_rate:10.0f} lookups/s' )
+    return _results
+
+
+EXECUTION_COLUMNS = [ 'ReportYear', 'BudgetAccountCode', 'BudgetAccountName',
+                      'TreasuryAccountCode', 'LineNumber', 'LineDescription', 'November',
+                      'December', 'January', 'Feburary', 'March', 'April', 'May', 'June',
+                      'July', 'August', 'September', 'October' ]
+
+
+def create_execution_table( path: str, rows: int ) -> None:
+    '''
+
+        Purpose: writes a synthetic BudgetaryResourceExecution table of 'rows'
+        rows, with the text and monthly amount columns of the real table, to
+        the SQLite file at 'path'
+
+        Parameters: path: str, rows: int
+
+        Returns: None
+
+    '''
+    import sqlite3
+    _connection = sqlite3.connect( path )
+    _columns = ', '.join( f'{c} TEXT' if i < 6 else f'{c} REAL'
+                          for i, c in enumerate( EXECUTION_COLUMNS ) )
+    _connection.execute( f'CREATE TABLE BudgetaryResourceExecution ( '
+                         f'BudgetaryResourceExecutionId INTEGER PRIMARY KEY, {_columns} );' )
+    _marks = ', '.join( '?' for _ in EXECUTION_COLUMNS )
+    _connection.executemany( f'INSERT INTO BudgetaryResourceExecution ( '
+                             f'{", ".join( EXECUTION_COLUMNS )} ) VALUES ( {_marks} );',
+        ( ( str( 2015 + i % 10 ), f'{i % 900:04d}', f'Account {i % 900}', f'{i % 700:04d}',
+            f'{i % 90:04d}', f'Line {i % 90}' ) + tuple( float( i % ( m + 97 ) ) for m in range( 12 ) )
+          for i in range( rows ) ) )
+    _connection.commit( )
+    _connection.close( )
+
+
+def measure_read( mode: str, directory: str ) -> tuple:
+    '''
+
+        Purpose: reads BudgetaryResourceExecution from the Boo.db that DbConfig
+        resolves under 'directory' using DataGenerator in 'mode', in a fresh
+        process so the peak RSS belongs to this read alone.
+
+        Parameters: mode: str, directory: str
+
+        Returns: ( seconds, rows, peak RSS growth in MB )
+
+    '''
+    os.chdir( directory )
+    from Data import DataGenerator
+    from Static import Source
+    _generator = DataGenerator( Source.BudgetaryResourceExecution )
+    _baseline = get_peak_rss( )
+    _start = time.perf_counter( )
+    if mode == 'frame':
+        _rows = len( _generator.create_frame( ) )
+    elif mode == 'chunks':
+        _rows = sum( len( _c ) for _c in _generator.create_chunks( ) )
+    elif mode == 'projected chunks':
+        _rows = sum( len( _c ) for _c in _generator.create_chunks(
+            columns = [ 'BudgetAccountCode', 'LineNumber', 'September' ] ) )
+    else:
+        _rows = sum( 1 for _ in _generator.iter_tuples( ) )
+    return ( time.perf_counter( ) - _start, _rows, get_peak_rss( ) - _baseline )
+
+
+def benchmark_reads( rows: int = 2000000 ) -> dict:
+    '''
+
+        Purpose: builds a synthetic 'rows'-row BudgetaryResourceExecution table
+        and reads it with DataGenerator.create_frame (one DataFrame), with
+        create_chunks (all and three projected columns) and with iter_tuples,
+        each in its own process, and reports rows/sec and peak RSS growth.
+
+        Parameters: rows: int
+
+        Returns: dict of ( rows/sec, peak MB ) keyed by mode
+
+    '''
+    from Data import DbConfig
+    from Static import Source
+    _results = { }
+    _cwd = os.getcwd( )
+    with tempfile.TemporaryDirectory( ) as _directory:
+        os.chdir( _directory )
+        try:
+            create_execution_table( DbConfig( Source.BudgetaryResourceExecution ).get_data_path( ),
+                rows )
+        finally:
+            os.chdir( _cwd )
+        _context = multiprocessing.get_context( 'spawn' )
+        for _mode in ( 'frame', 'chunks', 'projected chunks', 'tuples' ):
+            with _context.Pool( 1 ) as _pool:
+                _seconds, _count, _peak = _pool.apply( measure_read, ( _mode, _directory ) )
+            _results[ _mode ] = ( _count / _seconds, _peak )
+            print( f'{_mode:>16}:  {_count / _seconds:10.0f} rows/s   peak RSS +{_peak:8.1f} MB' )
+    return _results
+
+
+def benchmark_rows( rows: int = 200000 ) -> dict:
+    '''
+
+        Purpose: builds a synthetic 'rows'-row BudgetaryResourceExecution table
+        and times the ways of exporting its rows: the old create_tuples
+        (read_sql + iterrows), read_sql + itertuples, the cursor-backed
+        create_tuples, create_records and create_batches.
+
+        Parameters: rows: int
+
+        Returns: dict of seconds keyed by mode
+
+    '''
+    from pandas import read_sql
+    from Data import ConnectionPool, DataGenerator, DbConfig
+    from Static import Source
+    _results = { }
+    _cwd = os.getcwd( )
+    with tempfile.TemporaryDirectory( ) as _directory:
+        os.chdir( _directory )
+        try:
+            create_execution_table( DbConfig( Source.BudgetaryResourceExecution ).get_data_path( ),
+                rows )
+            _generator = DataGenerator( Source.BudgetaryResourceExecution )
+
+            def _iterrows( ) -> list:
+                with ConnectionPool.checkout( _generator.source ) as _connection:
+                    _frame = read_sql( _generator.command_text, _connection )
+                return [ tuple( i ) for i in _frame.iterrows( ) ]
+
+            def _itertuples( ) -> list:
+                _frame = _generator.create_frame( )
+                return list( _frame.itertuples( index = False, name = None ) )
+
+            _modes = { 'iterrows': _iterrows, 'itertuples': _itertuples,
+                       'create_tuples': _generator.create_tuples,
+                       'create_records': _generator.create_records,
+                       'create_batches': lambda: list( _generator.create_batches( ) ) }
+            for _mode, _function in _modes.items( ):
+                _start = time.perf_counter( )
+                _function( )
+                _results[ _mode ] = time.perf_counter( ) - _start
+        finally:
+            ConnectionPool.close( )
+            os.chdir( _cwd )
+    _base = _results[ 'iterrows' ]
+    for _mode, _seconds in _results.items( ):
+        print( f'{_mode:>16}:  {_seconds:8.2f} s   {_base / _seconds:6.1f}x' )
+    return _results
+
+
+def create_extract( path: str, megabytes: float ) -> int:
+    '''
+
+        Purpose: writes a synthetic budget execution extract of about
+        'megabytes' MB, with a header row, zero-padded codes and monthly
+        amounts, to the CSV file at 'path'
+
+        Parameters: path: str, megabytes: float
+
+        Returns: int - the number of data rows written
+
+    '''
+    _limit = int( megabytes * 1024 * 1024 )
+    _rows = 0
+    with open( path, 'w', newline = '' ) as _file:
+        _file.write( ','.join( EXECUTION_COLUMNS ) + '\n' )
+        while _file.tell( ) < _limit:
+            _file.write( ''.join(
+                f'{2015 + i % 10},{i % 900:04d},Account {i % 900},{i % 700:04d},'
+                f'{i % 90:04d},Line {i % 90},'
+                + ','.join( f'{i % ( m + 97 ) * 1.25:.2f}' for m in range( 12 ) ) + '\n'
+                for i in range( _rows, _rows + 10000 ) ) )
+            _rows += 10000
+    return _rows
+
+
+def benchmark_csv( sizes: tuple = ( 10, 100, 1000 ) ) -> dict:
+    '''
+
+        Purpose: writes synthetic budget extracts of each size in MB and times
+        the old CsvForm read ( python engine, header read as data ) against
+        CsvParser full and chunked reads on the C and pyarrow engines, with
+        and without a three column projection. Full reads are skipped above
+        100 MB so the benchmark fits in memory.
+
+        Parameters: sizes: tuple
+
+        Returns: dict of MB/sec keyed by ( size, mode )
+
+    '''
+    from pandas import read_csv
+    from Readers import CsvParser, pacsv
+    _engines = [ 'c' ] if pacsv is None else [ 'c', 'pyarrow' ]
+    _projection = [ 'BudgetAccountCode', 'LineNumber', 'September' ]
+    _results = { }
+    with tempfile.TemporaryDirectory( ) as _directory:
+        for _size in sizes:
+            _path = os.path.join( _directory, f'extract{_size}.csv' )
+            _rows = create_extract( _path, _size )
+            _megabytes = os.path.getsize( _path ) / ( 1024 * 1024 )
+            _modes = { }
+            if _size <= 100:
+                _modes[ 'python (old)' ] = lambda: len( read_csv( _path, sep = ',',
+                    engine = 'python', header = None ) ) - 1
+            for _engine in _engines:
+                if _size <= 100:
+                    _modes[ f'{_engine} read' ] = lambda e = _engine: len(
+                        CsvParser( _path, engine = e ).read( ) )
+                _modes[ f'{_engine} chunks' ] = lambda e = _engine: sum(
+                    len( c ) for c in CsvParser( _path, engine = e ).read_chunks( ) )
+                _modes[ f'{_engine} projected' ] = lambda e = _engine: sum(
+                    len( c ) for c in CsvParser( _path, engine = e,
+                        usecols = _projection ).read_chunks( ) )
+            print( f'{_megabytes:8.0f} MB, {_rows:,} rows' )
+            for _mode, _function in _modes.items( ):
+                _start = time.perf_counter( )
+                _count = _function( )
+                _seconds = time.perf_counter( ) - _start
+                assert _count == _rows, ( _mode, _count, _rows )
+                _results[ ( _size, _mode ) ] = _megabytes / _seconds
+                print( f'{_mode:>20}:  {_seconds:8.2f} s   {_megabytes / _seconds:8.1f} MB/s' )
+            os.remove( _path )
+    return _results
+
+
+def measure_excel( mode: str, path: str, folder: str ) -> tuple:
+    '''
+
+        Purpose: reads the workbook at 'path' in 'mode', in a fresh process so
+        the peak RSS belongs to this read alone; 'folder' holds the cache.
+
+        Parameters: mode: str, path: str, folder: str
+
+        Returns: ( seconds, rows, peak RSS growth in MB )
+
+    '''
+    from pandas import read_excel
+    from Readers import ExcelParser
+    ExcelParser.folder = folder
+    _baseline = get_peak_rss( )
+    _start = time.perf_counter( )
+    if mode == 'read_excel':
+        _rows = len( read_excel( path, index_col = 0 ) )
+    else:
+        _engine = 'openpyxl' if mode == 'openpyxl' else 'calamine'
+        _parser = ExcelParser( path, engine = _engine, cache = mode != 'openpyxl' )
+        _rows = sum( len( _c ) for _c in _parser.read_chunks( ) )
+    return ( time.perf_counter( ) - _start, _rows, get_peak_rss( ) - _baseline )
+
+
+def benchmark_excel( rows: int = 200000 ) -> dict:
+    '''
+
+        Purpose: writes a synthetic 'rows'-row budget execution workbook and
+        reads it with the old ExcelForm call ( read_excel ), with ExcelParser
+        streaming through openpyxl read-only and through calamine, and again
+        from the parsed cache, each in its own process.
+
+        Parameters: rows: int
+
+        Returns: dict of ( seconds, peak MB ) keyed by mode
+
+    '''
+    from openpyxl import Workbook
+    from Readers import CalamineWorkbook
+    _results = { }
+    with tempfile.TemporaryDirectory( ) as _directory:
+        _path = os.path.join( _directory, 'execution.xlsx' )
+        _workbook = Workbook( write_only = True )
+        _sheet = _workbook.create_sheet( 'Execution' )
+        _sheet.append( EXECUTION_COLUMNS )
+        for i in range( rows ):
+            _sheet.append( [ str( 2015 + i % 10 ), f'{i % 900:04d}', f'Account {i % 900}',
+                             f'{i % 700:04d}', f'{i % 90:04d}', f'Line {i % 90}' ]
+                           + [ float( i % ( m + 97 ) ) for m in range( 12 ) ] )
+        _workbook.save( _path )
+        print( f'{os.path.getsize( _path ) / ( 1024 * 1024 ):8.1f} MB workbook, {rows:,} rows' )
+        _modes = [ 'read_excel', 'openpyxl' ]
+        if CalamineWorkbook is not None:
+            _modes += [ 'calamine', 'cached' ]
+        _context = multiprocessing.get_context( 'spawn' )
+        for _mode in _modes:
+            with _context.Pool( 1 ) as _pool:
+                _seconds, _count, _peak = _pool.apply( measure_excel,
+                    ( _mode, _path, os.path.join( _directory, 'cache' ) ) )
+            _results[ _mode ] = ( _seconds, _peak )
+            print( f'{_mode:>16}:  {_seconds:8.2f} s   peak RSS +{_peak:8.1f} MB' )
+    return _results
+
+
+def measure_report( write_only: bool, rows: int, path: str ) -> tuple:
+    '''
+
+        Purpose: writes a 'rows'-row execution report to 'path' with
+        ExcelReport, streaming when 'write_only', in a fresh process so the
+        peak RSS belongs to this report alone.
+
+        Parameters: write_only: bool, rows: int, path: str
+
+        Returns: ( seconds, peak RSS growth in MB )
+
+    '''
+    from FileSys import ExcelReport
+    _baseline = get_peak_rss( )
+    _start = time.perf_counter( )
+    _report = ExcelReport( path, write_only = write_only )
+    _report.write_rows( ( ( str( 2015 + i % 10 ), f'{i % 900:04d}', f'Account {i % 900}',
+                            f'{i % 90:04d}', float( i % 97 ), float( i % 89 ) )
+                          for i in range( rows ) ),
+        [ 'ReportYear', 'BudgetAccountCode', 'BudgetAccountName', 'LineNumber',
+          'Obligations', 'Outlays' ],
+        { 'Obligations': 'Currency', 'Outlays': 'Currency' } )
+    _report.save( )
+    return ( time.perf_counter( ) - _start, get_peak_rss( ) - _baseline )
+
+
+def benchmark_report( rows: int = 1000000 ) -> dict:
+    '''
+
+        Purpose: writes execution reports with ExcelReport in normal and
+        write-only mode at a fifth of 'rows', and in write-only mode at 'rows',
+        each in its own process, showing write-only memory stays flat.
+
+        Parameters: rows: int
+
+        Returns: dict of ( seconds, peak MB ) keyed by ( mode, rows )
+
+    '''
+    _results = { }
+    _context = multiprocessing.get_context( 'spawn' )
+    with tempfile.TemporaryDirectory( ) as _directory:
+        for _write_only, _rows in ( ( False, rows // 5 ), ( True, rows // 5 ), ( True, rows ) ):
+            _mode = 'write-only' if _write_only else 'normal'
+            _path = os.path.join( _directory, f'{_mode}{_rows}.xlsx' )
+            with _context.Pool( 1 ) as _pool:
+                _seconds, _peak = _pool.apply( measure_report, ( _write_only, _rows, _path ) )
+            _results[ ( _mode, _rows ) ] = ( _seconds, _peak )
+            print( f'{_mode:>12} {_rows:>9,} rows:  {_seconds:8.2f} s   peak RSS +{_peak:8.1f} MB' )
+    return _results
+
+
+def benchmark_copy( gigabytes: float = 2, lines: int = 10000000 ) -> dict:
+    '''
+
+        Purpose: appends a 'gigabytes' GB text file to an empty file line by
+        line ( the old File.writeall, without its readlines ), with
+        shutil.copyfileobj and a 1 MB buffer, with os.sendfile, with
+        os.copy_file_range and with File.append; then writes 'lines' lines one
+        write per line ( the old File.writelines ) and with the batched
+        File.writelines.
+
+        Parameters: gigabytes: float, lines: int
+
+        Returns: dict of MB/sec keyed by mode
+
+    '''
+    import shutil
+    from FileSys import File
+    _results = { }
+    with tempfile.TemporaryDirectory( ) as _directory:
+        _source = os.path.join( _directory, 'source.sql' )
+        _target = os.path.join( _directory, 'target.sql' )
+        _line = 'INSERT INTO BudgetaryResourceExecution VALUES ( 2023, \'0068\', 1250.00 );\n'
+        with open( _source, 'w' ) as _file:
+            _block = _line * 100000
+            while _file.tell( ) < gigabytes * 1024 ** 3:
+                _file.write( _block )
+        _megabytes = os.path.getsize( _source ) / ( 1024 * 1024 )
+
+        def _lines( ) -> None:
+            with open( _source ) as _in, open( _target, 'a' ) as _out:
+                for _text in _in:
+                    _out.write( _text )
+
+        def _copyfileobj( ) -> None:
+            with open( _source, 'rb' ) as _in, open( _target, 'ab' ) as _out:
+                shutil.copyfileobj( _in, _out, 1 << 20 )
+
+        def _kernel( name: str ) -> None:
+            with open( _source, 'rb' ) as _in, open( _target, 'r+b' ) as _out:
+                _size, _done = os.fstat( _in.fileno( ) ).st_size, 0
+                while _done < _size:
+                    if name == 'sendfile':
+                        _done += os.sendfile( _out.fileno( ), _in.fileno( ), _done, _size - _done )
+                    else:
+                        _done += os.copy_file_range( _in.fileno( ), _out.fileno( ),
+                            _size - _done, _done, _done )
+
+        _modes = { 'line by line': _lines, 'copyfileobj': _copyfileobj }
+        for _name in ( 'sendfile', 'copy_file_range' ):
+            if hasattr( os, _name ):
+                _modes[ _name ] = lambda n = _name: _kernel( n )
+        _modes[ 'File.append' ] = lambda: File( _target ).append( _source )
+        print( f'{_megabytes:8.0f} MB source' )
+        for _mode, _function in _modes.items( ):
+            open( _target, 'w' ).close( )
+            _start = time.perf_counter( )
+            _function( )
+            _seconds = time.perf_counter( ) - _start
+            assert os.path.getsize( _target ) == os.path.getsize( _source ), _mode
+            _results[ _mode ] = _megabytes / _seconds
+            print( f'{_mode:>16}:  {_seconds:8.2f} s   {_megabytes / _seconds:8.1f} MB/s' )
+        os.remove( _source )
+
+        def _writes( ) -> None:
+            with open( _target, 'a' ) as _out:
+                for i in range( lines ):
+                    _out.write( _line )
+
+        _modes = { 'write per line': _writes,
+                   'File.writelines': lambda: File( _target ).writelines(
+                       _line for i in range( lines ) ) }
+        _megabytes = len( _line ) * lines / ( 1024 * 1024 )
+        print( f'{lines:,} lines, {_megabytes:.0f} MB' )
+        for _mode, _function in _modes.items( ):
+            open( _target, 'w' ).close( )
+            _start = time.perf_counter( )
+            _function( )
+            _seconds = time.perf_counter( ) - _start
+            _results[ _mode ] = _megabytes / _seconds
+            print( f'{_mode:>16}:  {_seconds:8.2f} s   {_megabytes / _seconds:8.1f} MB/s' )
+    return _results
+
+
+BENCHMARKS = { 'clients': benchmark_clients, 'audio': benchmark_audio,
+               'lookups': benchmark_lookups, 'reads': benchmark_reads,
+               'rows': benchmark_rows, 'csv': benchmark_csv,
+               'excel': benchmark_excel, 'report': benchmark_report,
+               'copy': benchmark_copy }
+
+if __name__ == '__main__':
+    for _name in sys.argv[ 1: ] or BENCHMARKS.keys( ):
+        print( f'--- {_name} ---' )
+        BENCHMARKS[ _name ]( )
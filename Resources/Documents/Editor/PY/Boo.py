@@ -42,12 +42,22 @@
   ******************************************************************************************
   '''
 import os
-from openai import OpenAI
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+import httpx
+from openai import AsyncOpenAI, OpenAI
 import requests
 from pygments.lexers.csound import newline
 
 from Static import GptRequests, GptRoles, GptLanguages
-from Booger import ErrorDialog, Error
+from Booger import ChatWindow, ErrorDialog, Error
+from Cache import ResponseCache
+from Configuration import RESPONSE_CACHE_PATH, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+from Messages import AssistantMessage, ChatLog, SystemMessage, UserMessage
 
 class Header( ):
     '''
@@ -217,16 +227,211 @@ class Models( ):
                   'vector_stores' : self.vector_stores }
 
 
+class ClientPool( ):
+    '''
+
+        Process-wide registry of OpenAI clients shared by every AI subclass.
+        Clients are keyed by api key and base url so requests reuse the same
+        warm keep-alive connections, and the number of requests in flight is
+        bounded by 'max_concurrency'.  Async clients live per event loop and
+        are closed when their loop shuts down or is evicted.
+
+    '''
+
+    max_connections: int = 20
+    max_keepalive: int = 10
+    max_concurrency: int = 8
+    timeout: float = 60.0
+    __lock = threading.Lock( )
+    __clients = { }
+    __async_clients = weakref.WeakKeyDictionary( )
+    __semaphore = None
+    __size = None
+    __async_semaphores = weakref.WeakKeyDictionary( )
+
+
+    @classmethod
+    def get_limits( cls ) -> httpx.Limits:
+        '''
+
+            Returns: httpx.Limits bounding the connection pool of each client
+
+        '''
+        return httpx.Limits( max_connections = cls.max_connections,
+            max_keepalive_connections = cls.max_keepalive )
+
+
+    @classmethod
+    def get_semaphore( cls ) -> threading.BoundedSemaphore:
+        '''
+
+            Returns: the semaphore bounding synchronous requests, recreated
+            whenever 'max_concurrency' has changed since it was built.
+
+        '''
+        with cls.__lock:
+            if cls.__semaphore is None or cls.__size != cls.max_concurrency:
+                cls.__semaphore = threading.BoundedSemaphore( cls.max_concurrency )
+                cls.__size = cls.max_concurrency
+            return cls.__semaphore
+
+
+    @classmethod
+    def get_client( cls, api_key: str = None, base_url: str = None ) -> OpenAI:
+        '''
+
+            Returns: the shared OpenAI client for 'api_key' and 'base_url',
+            creating it on first use.
+
+        '''
+        _key = ( api_key, base_url )
+        with cls.__lock:
+            if _key not in cls.__clients:
+                _http = httpx.Client( limits = cls.get_limits( ), timeout = cls.timeout )
+                cls.__clients[ _key ] = OpenAI( api_key = api_key, base_url = base_url,
+                    http_client = _http )
+            return cls.__clients[ _key ]
+
+
+    @classmethod
+    def get_async_client( cls, api_key: str = None, base_url: str = None ) -> AsyncOpenAI:
+        '''
+
+            Returns: the shared AsyncOpenAI client for 'api_key' and 'base_url'
+            on the running event loop, creating it on first use.  The first
+            client on a loop starts a keeper task that closes the loop's clients
+            when the loop cancels its tasks at shutdown.
+
+        '''
+        _loop = asyncio.get_running_loop( )
+        _key = ( api_key, base_url )
+        with cls.__lock:
+            cls.__evict( )
+            _entry = cls.__async_clients.get( _loop )
+            if _entry is None:
+                _entry = { 'clients': { }, 'keeper': None }
+                cls.__async_clients[ _loop ] = _entry
+                _entry[ 'keeper' ] = _loop.create_task( cls.__keep( _loop ) )
+            _clients = _entry[ 'clients' ]
+            if _key not in _clients:
+                _http = httpx.AsyncClient( limits = cls.get_limits( ), timeout = cls.timeout )
+                _clients[ _key ] = AsyncOpenAI( api_key = api_key,
+                    base_url = base_url, http_client = _http )
+            return _clients[ _key ]
+
+
+    @classmethod
+    @contextmanager
+    def limit( cls ):
+        '''
+
+            Context manager holding one of the 'max_concurrency' request slots.
+
+        '''
+        with cls.get_semaphore( ):
+            yield
+
+
+    @classmethod
+    @asynccontextmanager
+    async def limit_async( cls ):
+        '''
+
+            Async context manager holding one of the 'max_concurrency' request
+            slots on the running event loop.
+
+        '''
+        _loop = asyncio.get_running_loop( )
+        with cls.__lock:
+            _semaphore = cls.__async_semaphores.get( _loop )
+            if _semaphore is None:
+                _semaphore = asyncio.Semaphore( cls.max_concurrency )
+                cls.__async_semaphores[ _loop ] = _semaphore
+        async with _semaphore:
+            yield
+
+
+    @classmethod
+    async def aclose( cls ) -> None:
+        '''
+
+            Closes the async clients of the running event loop and evicts them.
+
+        '''
+        _loop = asyncio.get_running_loop( )
+        with cls.__lock:
+            _entry = cls.__async_clients.pop( _loop, None )
+            cls.__async_semaphores.pop( _loop, None )
+        if _entry is not None:
+            _entry[ 'keeper' ].cancel( )
+            for _client in _entry[ 'clients' ].values( ):
+                await _client.close( )
+
+
+    @classmethod
+    def close( cls ) -> None:
+        '''
+
+            Closes the synchronous clients, asks every live event loop to close
+            its async clients, and empties the registry.
+
+        '''
+        with cls.__lock:
+            for _client in cls.__clients.values( ):
+                _client.close( )
+            cls.__clients.clear( )
+            for _loop, _entry in list( cls.__async_clients.items( ) ):
+                if not _loop.is_closed( ):
+                    _loop.call_soon_threadsafe( _entry[ 'keeper' ].cancel )
+            cls.__async_semaphores.clear( )
+
+
+    @classmethod
+    def __evict( cls ) -> None:
+        '''
+
+            Drops the entries of event loops that were closed without cancelling
+            their keeper task.  Caller holds the lock.
+
+        '''
+        for _loop in [ l for l in cls.__async_clients.keys( ) if l.is_closed( ) ]:
+            cls.__async_clients.pop( _loop, None )
+            cls.__async_semaphores.pop( _loop, None )
+
+
+    @classmethod
+    async def __keep( cls, loop: asyncio.AbstractEventLoop ) -> None:
+        '''
+
+            Keeper task parked on 'loop' until it is cancelled, either by
+            close( ) or by the loop shutting down, then closes the loop's
+            async clients and evicts them.
+
+        '''
+        try:
+            await loop.create_future( )
+        finally:
+            with cls.__lock:
+                _entry = cls.__async_clients.pop( loop, None )
+                cls.__async_semaphores.pop( loop, None )
+            if _entry is not None:
+                for _client in _entry[ 'clients' ].values( ):
+                    await _client.close( )
+
+
 class AI( ):
     '''
     AI is the base class for all OpenAI functionalityl
     '''
 
+    response_cache: ResponseCache = ResponseCache( size = RESPONSE_CACHE_SIZE,
+        ttl = RESPONSE_CACHE_TTL, path = RESPONSE_CACHE_PATH )
+
     def __init__( self ):
         self.header = Header( )
         self.endpoint = EndPoint( )
         self.api_key = self.header.api_key
-        self.client = OpenAI( api_key=self.api_key )
+        self.client = ClientPool.get_client( self.api_key )
         self.system_instructions = '''You are the most knowledgeable Budget Analyst in the federal 
         government who provides detailed responses based on your vast knowledge of 
         budget legislation, and federal appropriations.  
@@ -243,6 +448,234 @@ class AI( ):
         '''
 
 
+    def __dir__( self ) -> list[ str ]:
+        '''
+            Methods that returns a list of member names
+            Returns: list[ str ]
+        '''
+        return [ 'header', 'endpoint', 'api_key', 'client',
+                 'system_instructions', 'response_cache', 'get_options',
+                 'generate_request', 'stream_request', 'generate_async',
+                 'stream_async', 'show_chat' ]
+
+
+    def get_options( self, stream: bool = False ) -> dict:
+        '''
+
+            Returns: dict of the chat completion arguments shared by the sync,
+            async and streaming requests of the subclass.
+
+        '''
+        _options = { 'model': self.model,
+                     'messages': self.messages.get_messages( ),
+                     'temperature': self.temperature,
+                     'max_completion_tokens': 2048,
+                     'top_p': self.top_percent,
+                     'frequency_penalty': self.frequency_penalty,
+                     'presence_penalty': self.presence_penalty }
+        if stream:
+            _options[ 'stream' ] = True
+        return _options
+
+
+    def generate_request( self, prompt: str, cache: bool = None ) -> str:
+        '''
+
+            Given an input prompt 'prompt', function generates a chat completion
+            request from the openai api.  Temperature-0 requests, or requests with
+            'cache' set to True, are answered from AI.response_cache when possible.
+
+        Args:
+            prompt: query provided by the user to the GPT application
+            cache: bool overriding whether the response cache is used
+
+        Returns: str
+
+        '''
+        try:
+            if prompt is None:
+                alert = 'The prompt argument is not available'
+                raise Exception( alert )
+            else:
+                self.prompt = prompt
+
+            _sys = 'You are a helpful assistant and Budget Analyst'
+            self.messages.add( SystemMessage( _sys ) )
+            self.messages.add( UserMessage( self.prompt ) )
+            _key = None
+            if self.response_cache.is_cacheable( self.temperature, cache ):
+                _key = ResponseCache.create_key( self.model, _sys, self.prompt,
+                    self.temperature, self.messages.get_messages( ) )
+                _cached = self.response_cache.get( _key )
+                if _cached is not None:
+                    self.content = _cached
+                    self.messages.add( AssistantMessage( self.content ) )
+                    return self.content
+
+            _start = time.perf_counter( )
+            with ClientPool.limit( ):
+                self.response = self.client.chat.completions.create( **self.get_options( ) )
+
+            self.content = self.response.choices[ 0 ].message.content
+            self.messages.add( AssistantMessage( self.content ) )
+            if _key is not None:
+                _tokens = self.response.usage.total_tokens if self.response.usage else 0
+                self.response_cache.put( _key, self.content,
+                    time.perf_counter( ) - _start, _tokens )
+            return self.content
+        except Exception as e:
+            exception = Error( e )
+            exception.module = 'Boo'
+            exception.cause = type( self ).__name__
+            exception.method = 'generate_request( prompt: str, cache: bool ) -> str'
+            error = ErrorDialog( exception )
+            error.show()
+
+
+    def stream_request( self, prompt: str ) -> Iterator[ str ]:
+        '''
+
+            Given an input prompt 'prompt', function generates a streaming chat
+            completion request and yields the content deltas as they arrive.
+            The generator usually runs on a worker thread, so errors are raised
+            to the consumer instead of opening an ErrorDialog there.  Closing the
+            generator early closes the response stream and frees its
+            ClientPool slot; consumers that stop reading should close it.
+
+        Args:
+            prompt: query provided by the user to the GPT application
+
+        Returns: Iterator[ str ] of content deltas
+
+        '''
+        if prompt is None:
+            alert = 'The prompt argument is not available'
+            raise Exception( alert )
+        else:
+            self.prompt = prompt
+
+        self.messages.add( SystemMessage( 'You are a helpful assistant and Budget Analyst' ) )
+        self.messages.add( UserMessage( self.prompt ) )
+        with ClientPool.limit( ):
+            self.response = self.client.chat.completions.create(
+                **self.get_options( stream = True ) )
+
+            _deltas = [ ]
+            try:
+                for chunk in self.response:
+                    if not chunk.choices:
+                        continue
+                    _delta = chunk.choices[ 0 ].delta.content
+                    if _delta:
+                        _deltas.append( _delta )
+                        yield _delta
+            finally:
+                self.response.close( )
+
+        self.content = ''.join( _deltas )
+        self.messages.add( AssistantMessage( self.content ) )
+
+
+    async def generate_async( self, prompt: str ) -> str:
+        '''
+
+            Awaitable version of generate_request( prompt ) that runs on the shared
+            AsyncOpenAI client, bounded by ClientPool.max_concurrency.
+
+        Args:
+            prompt: query provided by the user to the GPT application
+
+        Returns: str
+
+        '''
+        try:
+            if prompt is None:
+                alert = 'The prompt argument is not available'
+                raise Exception( alert )
+            else:
+                self.prompt = prompt
+
+            self.messages.add( SystemMessage( 'You are a helpful assistant and Budget Analyst' ) )
+            self.messages.add( UserMessage( self.prompt ) )
+            _client = ClientPool.get_async_client( self.api_key )
+            async with ClientPool.limit_async( ):
+                self.response = await _client.chat.completions.create( **self.get_options( ) )
+
+            self.content = self.response.choices[ 0 ].message.content
+            self.messages.add( AssistantMessage( self.content ) )
+            return self.content
+        except Exception as e:
+            exception = Error( e )
+            exception.module = 'Boo'
+            exception.cause = type( self ).__name__
+            exception.method = 'generate_async( prompt: str ) -> str'
+            error = ErrorDialog( exception )
+            error.show()
+
+
+    async def stream_async( self, prompt: str ) -> AsyncIterator[ str ]:
+        '''
+
+            Async iterator version of stream_request( prompt ) that yields the
+            content deltas from the shared AsyncOpenAI client as they arrive.
+            Errors are raised to the consumer like stream_request( prompt ), and
+            closing it early with aclose( ) frees its slot the same way.
+
+        Args:
+            prompt: query provided by the user to the GPT application
+
+        Returns: AsyncIterator[ str ] of content deltas
+
+        '''
+        if prompt is None:
+            alert = 'The prompt argument is not available'
+            raise Exception( alert )
+        else:
+            self.prompt = prompt
+
+        self.messages.add( SystemMessage( 'You are a helpful assistant and Budget Analyst' ) )
+        self.messages.add( UserMessage( self.prompt ) )
+        _client = ClientPool.get_async_client( self.api_key )
+        async with ClientPool.limit_async( ):
+            self.response = await _client.chat.completions.create(
+                **self.get_options( stream = True ) )
+
+            _deltas = [ ]
+            try:
+                async for chunk in self.response:
+                    if not chunk.choices:
+                        continue
+                    _delta = chunk.choices[ 0 ].delta.content
+                    if _delta:
+                        _deltas.append( _delta )
+                        yield _delta
+            finally:
+                await self.response.close( )
+
+        self.content = ''.join( _deltas )
+        self.messages.add( AssistantMessage( self.content ) )
+
+
+    def show_chat( self ) -> None:
+        '''
+
+            Opens a ChatWindow that renders the deltas of stream_request( prompt )
+            progressively as they arrive.
+
+        '''
+        try:
+            _window = ChatWindow( stream = self.stream_request )
+            _window.show( )
+        except Exception as e:
+            exception = Error( e )
+            exception.module = 'Boo'
+            exception.cause = type( self ).__name__
+            exception.method = 'show_chat( self ) -> None'
+            error = ErrorDialog( exception )
+            error.show()
+
+
+
 class GptOptions( ):
     '''
 
@@ -466,12 +899,21 @@ class Message( ):
                      'content' + f' = {self.content}'
 
 
+    def get_data( self ) -> dict:
+        '''
+
+            Returns: dict[ str ] of the role and content sent to the chat api
+
+        '''
+        return { 'role': self.role, 'content': self.content }
+
+
     def __dir__( self ) -> list[ str ]:
         '''
             Methods that returns a list of member names
             Returns: list[ str ]
         '''
-        return [ 'role', 'content', 'type' ]
+        return [ 'role', 'content', 'type', 'get_data' ]
 
 
 class TextGeneration( AI ):
@@ -483,8 +925,6 @@ class TextGeneration( AI ):
 
     def __init__( self  ):
         super( ).__init__( )
-        self.client = OpenAI( )
-        self.header = super().header
         self.request_type = GptRequests.TextGeneration
         self.endpoint = EndPoint( ).text_generation
         self.model = 'gpt-4o'
@@ -498,7 +938,7 @@ class TextGeneration( AI ):
         self.content = None
         self.response = None
         self.prompt = None
-        self.messages = [ ]
+        self.messages = ChatLog( self.model )
         self.data = { 'number': f'{self.number}',
                  'model': f'{self.model}',
                  'temperature': f'{self.temperature}',
@@ -520,57 +960,11 @@ class TextGeneration( AI ):
         return [ 'header', 'request_type', 'endpoint',
                  'model', 'number', 'messages',
                  'content', 'store', 'stream',
-                 'response', 'prompt', 'generate_request' ]
+                 'response', 'prompt', 'generate_request',
+                 'stream_request', 'generate_async', 'stream_async' ]
 
 
-    def generate_request( self, prompt: str ) -> str:
-        '''
-
-            Given an input prompt 'prompt', function generates a text generation
-            request from the openai api.
-
-        Args:
-            prompt: query provided by the user to the GPT application
-
-        Returns:
-
-        '''
-        try:
-            if prompt is None:
-                alert = f'The prompt argument is not available'
-                raise Exception( alert )
-            else:
-                self.prompt = prompt
-
-            self.client.api_key = self.header.api_key
-            _system_prompt = 'You are a helpful assistant and Budget Analyst'
-            _system = Message( prompt=_system_prompt, role = 'system', type = 'text' )
-            _user = Message( prompt=self.prompt, role = 'user', type = 'text' )
-            self.messages.append( _system )
-            self.messages.append( _user )
-
-            completion = self.client.chat.completions.create(
-                model = self.model,
-                messages = self.messages,
-                temperature = 0.08,
-                max_completion_tokens = 2048,
-                top_p = 0.09,
-                frequency_penalty = 0.00,
-                presence_penalty = 0.00,
-            )
-
-            self.content = completion[ 'choices' ][ 0 ][ 'message' ][ 'content' ]
-            return self.content
-        except Exception as e:
-            exception = Error( e )
-            exception.module = 'Boo'
-            exception.cause = 'TextGeneration'
-            exception.method = 'generate_request( prompt: str ) -> str'
-            error = ErrorDialog( exception )
-            error.show()
-
-
-class ChatCompletion( ):
+class ChatCompletion( AI ):
     '''
 
         Class provides the functionality fo the Completions API
@@ -578,12 +972,18 @@ class ChatCompletion( ):
     '''
 
     def __init__( self ):
-        self.header = Header( )
-        self.client = OpenAI( )
-        self.request_type = GptRequests.ChatCompletions
-        self.endpoint = EndPoint().chat_completions
+        super( ).__init__( )
+        self.request_type = GptRequests.ChatCompletion
+        self.endpoint = EndPoint().chat_completion
         self.model = 'gpt-4o'
-        self.messages = [ ]
+        self.number = 1
+        self.temperature = 0.08
+        self.top_percent = 0.09
+        self.frequency_penalty = 0.0
+        self.presence_penalty = 0.0
+        self.store = False
+        self.stream = True
+        self.messages = ChatLog( self.model )
         self.content = None
         self.response = None
         self.prompt = None
@@ -607,62 +1007,25 @@ class ChatCompletion( ):
         '''
         return [ 'header', 'client', 'request_type', 'endpoint',
                  'model', 'number', 'messages',
-                 'content', 'response', 'prompt', 'generate_request' ]
-
-
-    def generate_request( self, prompt: str ) -> str:
-        '''
-                Function that generates chat completions given a prompt
-            Args:
-                prompt:
-
-            Returns:
-
-        '''
-
-        try:
-            if prompt is None:
-                alert = 'The prompt argument is not available'
-                raise Exception( alert )
-            else:
-                self.prompt = prompt
-            self.client.api_key = self.header.api_key
-            _sys = 'You are a helpful assistant and Budget Analyst'
-            _system = Message( prompt=_sys, role = 'system', type = 'text' )
-            _user = Message( prompt=self.prompt, role = 'user', type = 'text' )
-            self.messages.append( _system )
-            self.messages.append( _user )
-            self.response = self.client.chat.completions.create(
-                model = self.model,
-                messages = self.messages,
-                temperature = 0.08,
-                max_completion_tokens = 2048,
-                top_p = 0.09,
-                frequency_penalty = 0.0,
-                presence_penalty = 0.0,
-            )
-
-            self.content = self.response[ 'choices' ][ 0 ][ 'message' ][ 'content' ]
-            return self.content
-        except Exception as e:
-            exception = Error( e )
-            exception.module = 'Boo'
-            exception.cause = 'ChatCompletion'
-            exception.method = 'generate_request( prompt: str )'
-            error = ErrorDialog( exception )
-            error.show()
+                 'content', 'response', 'prompt', 'generate_request',
+                 'stream_request', 'generate_async', 'stream_async' ]
 
 
-class ImageGeneration( ):
+class ImageGeneration( AI ):
     '''
         Class provides the functionality fo the Image Generation API
     '''
 
     def __init__( self ):
-        self.header = Header( )
-        self.client = OpenAI( )
+        super( ).__init__( )
         self.endpoint = EndPoint().image_generation
         self.model = 'dall-e-2'
+        self.temperature = 0.08
+        self.top_percent = 0.09
+        self.frequency_penalty = 0.0
+        self.presence_penalty = 0.0
+        self.store = False
+        self.stream = False
         self.messages = [ ]
         self.content = None
         self.response = None
@@ -715,23 +1078,23 @@ class ImageGeneration( ):
                 self.number = num
                 self.size = size
 
-            openai.api_key = self.header.api_key
             _sys = 'You are a helpful assistant and Budget Analyst'
             _system = Message( prompt=_sys, role = 'system', type = 'text' )
             _user = Message( prompt=self.prompt, role = 'user', type = 'text' )
             self.messages.append( _system )
             self.messages.append( _user )
-            self.response = self.client.chat.completions.create(
-                model = self.model,
-                messages = self.messages,
-                n = self.number,
-                size = self.size,
-                temperature = 0.08,
-                max_completion_tokens = 2048,
-                top_p = 0.09,
-                frequency_penalty = 0.00,
-                presence_penalty = 0.00,
-            )
+            with ClientPool.limit( ):
+                self.response = self.client.chat.completions.create(
+                    model = self.model,
+                    messages = self.messages,
+                    n = self.number,
+                    size = self.size,
+                    temperature = 0.08,
+                    max_completion_tokens = 2048,
+                    top_p = 0.09,
+                    frequency_penalty = 0.00,
+                    presence_penalty = 0.00,
+                )
 
             self.url = self.response[ 'data' ][ 0 ][ 'url' ]
             self.content = requests.get( url ).content
@@ -54,8 +54,7 @@ import io
 from src.Minion import App
 import traceback
 import numpy as np
-from pandas import read_csv as CsvReader
-from pandas import read_excel as ExcelReader
+from pandas import DataFrame, concat
 from matplotlib.backends.backend_tkagg import FigureCanvasAgg
 import matplotlib.figure
 import matplotlib.pyplot as plt
@@ -64,7 +63,10 @@ from mpl_toolkits.mplot3d.axes3d import get_test_data
 from matplotlib.ticker import NullFormatter
 from mpl_toolkits.axes_grid1.axes_rgb import RGBAxes
 from Static import EXT, Client
+from Readers import CsvParser, ExcelParser
 import urllib.request
+import threading
+import time
 
 class Error( Exception ):
     '''
@@ -1166,28 +1168,39 @@ class GridForm( Dark ):
             _err = ErrorDialog( _exc )
             _err.show()
 
-class LoadingPanel( Dark ):
+class QueryExecutor( ):
     '''
-	Construcotr:  LoadingPanel( )
+	Constructor:
+	QueryExecutor( query, total: int = None, frames: bool = False )
 
-	Purpose:  object providing form loading behavior
+	Purpose:
+	Runs 'query', a callable returning an iterator of chunks ( DataFrames or
+	lists of rows ), on a worker thread and posts each chunk, the rows read so
+	far, errors and completion to a window through write_event_value. A query
+	that returns a DataFrame is posted as a single chunk; any other value is
+	kept in 'result'.  With 'frames' DataFrame chunks are posted as they are
+	instead of as row lists.  'total' may be a callable, e.g. a COUNT(*) query,
+	that the worker calls before the query; the total is then posted as the
+	first progress event.  Event values are ( generation, payload ) tuples so
+	events from a cancelled or restarted run can be ignored with is_current( )
 	'''
-
-    def __init__( self ):
-        super().__init__()
-        self.theme_background = super().theme_background
-        self.theme_font = super().theme_font
-        self.icon_path = super().icon_path
-        self.element_backcolor = super().element_backcolor
-        self.element_forecolor = super().element_forecolor
-        self.theme_textcolor = super().text_forecolor
-        self.text_backcolor = super().text_backcolor
-        self.input_backcolor = super().input_backcolor
-        self.input_forecolor = super().input_forecolor
-        self.button_color = super().button_color
-        self.image = os.getcwd() + r'\etc\img\loaders\loading.gif'
-        self.form_size = (800, 600)
-        self.timeout = 6000
+    chunk_event = '-QUERY-CHUNK-'
+    progress_event = '-QUERY-PROGRESS-'
+    error_event = '-QUERY-ERROR-'
+    done_event = '-QUERY-DONE-'
+
+    def __init__( self, query, total: int = None, frames: bool = False ):
+        self.query = query
+        self.total = total
+        self.frames = frames
+        self.window = None
+        self.generation = 0
+        self.columns = None
+        self.result = None
+        self.rows = 0
+        self.chunks = 0
+        self.__cancel = threading.Event( )
+        self.__thread = None
 
     def __dir__( self ) -> list[ str ]:
         '''
@@ -1195,70 +1208,183 @@ class LoadingPanel( Dark ):
         Returns a list[ str ] of member names
 
 		'''
-        return [ 'size', 'settings_path', 'theme_background',
-                 'theme_textcolor', 'element_backcolor', 'element_forecolor',
-                 'text_forecolor', 'text_backcolor', 'input_backcolor',
-                 'input_forecolor', 'button_color', 'button_backcolor',
-                 'button_forecolor', 'icon_path', 'theme_font',
-                 'scrollbar_color', 'progressbar_color', 'timeout', 'show' ]
+        return [ 'query', 'total', 'frames', 'window', 'generation', 'columns',
+                 'result', 'rows', 'chunks', 'chunk_event', 'progress_event',
+                 'error_event', 'done_event', 'start', 'cancel', 'is_running',
+                 'is_cancelled', 'is_current', 'get_progress', 'get_rows' ]
 
-    def show( self ):
-        try:
-            _layout = [ [ sg.Text(
-                background_color = '#000000',
-                text_color = '#FFF000',
-                justification = 'c',
-                key = '-T-',
-                font = ('Bodoni MT', 40) ) ], [ sg.Image( key = '-IMAGE-' ) ] ]
+    @staticmethod
+    def get_rows( chunk ) -> list:
+        '''
+		Purpose:
+		Converts a DataFrame chunk or an iterable of rows to a list of row lists
 
-            _window = sg.Window( '  Loading...', _layout,
-                icon = self.icon_path,
-                element_justification = 'c',
-                margins = (0, 0),
-                size = (800, 600),
-                element_padding = (0, 0), finalize = True )
+		Parameters:
+		chunk: DataFrame or iterable
 
-            _window[ '-T-' ].expand( True, True )
-            _interframe_duration = Image.open( self.image ).info[ 'duration' ]
+		Returns:
+		list
+		'''
+        if hasattr( chunk, 'columns' ) and hasattr( chunk, 'values' ):
+            return chunk.values.tolist( )
+        return [ list( r ) for r in chunk ]
 
-            while True:
-                for frame in ImageSequence.Iterator( Image.open( self.image ) ):
-                    _event, _values = _window.read( timeout = _interframe_duration )
-                    if _event == sg.WIN_CLOSED or _event == sg.WIN_X_EVENT:
-                        exit( 0 )
-                    _window[ '-IMAGE-' ].update( data = ImageTk.PhotoImage( frame ) )
-                    _window.close()
+    def start( self, window: sg.Window ) -> int:
+        '''
+		Purpose:
+		Cancels any running query and starts a new run posting to 'window'
+
+		Parameters:
+		window: sg.Window
+
+		Returns:
+		int - the generation of the new run
+		'''
+        self.cancel( )
+        self.window = window
+        self.generation += 1
+        self.columns = None
+        self.result = None
+        self.rows = 0
+        self.chunks = 0
+        self.__cancel = threading.Event( )
+        self.__thread = threading.Thread( target = self.__run,
+            args = (self.generation, self.__cancel), daemon = True )
+        self.__thread.start( )
+        return self.generation
+
+    def cancel( self ):
+        '''
+		Purpose:
+		Signals the running query to stop after the current chunk
+
+		Parameters:
+		None
+
+		Returns:
+		None
+		'''
+        self.__cancel.set( )
+
+    def is_running( self ) -> bool:
+        return self.__thread is not None and self.__thread.is_alive( )
+
+    def is_cancelled( self ) -> bool:
+        return self.__cancel.is_set( )
+
+    def is_current( self, value: tuple ) -> bool:
+        '''
+		Purpose:
+		Returns True when an event value belongs to the current, uncancelled run
+
+		Parameters:
+		value: tuple
+
+		Returns:
+		bool
+		'''
+        return isinstance( value, tuple ) and value[ 0 ] == self.generation \
+            and not self.__cancel.is_set( )
+
+    def get_progress( self ) -> float:
+        '''
+		Purpose:
+		Returns the fraction of 'total' rows read, or None when the total is unknown
+
+		Parameters:
+		None
+
+		Returns:
+		float
+		'''
+        if not self.total or callable( self.total ):
+            return None
+        return min( 1.0, self.rows / self.total )
+
+    def __post( self, generation: int, event: str, payload ):
+        if self.window is not None and not self.window.was_closed( ):
+            self.window.write_event_value( event, (generation, payload) )
+
+    def __run( self, generation: int, cancel: threading.Event ):
+        _chunks = None
+        try:
+            if callable( self.total ):
+                self.total = self.total( )
+                self.__post( generation, self.progress_event,
+                    (self.rows, self.get_progress( )) )
+            _chunks = self.query( )
+            if hasattr( _chunks, 'columns' ):
+                _chunks = iter( [ _chunks ] )
+            elif not hasattr( _chunks, '__next__' ):
+                self.result = _chunks
+                _chunks = None
+                return
+            for _chunk in _chunks:
+                if cancel.is_set( ):
+                    break
+                if self.columns is None and hasattr( _chunk, 'columns' ):
+                    self.columns = [ str( c ) for c in _chunk.columns ]
+                if self.frames and hasattr( _chunk, 'columns' ):
+                    _rows = _chunk
+                else:
+                    _rows = self.get_rows( _chunk )
+                self.rows += len( _rows )
+                self.chunks += 1
+                self.__post( generation, self.chunk_event, _rows )
+                self.__post( generation, self.progress_event,
+                    (self.rows, self.get_progress( )) )
         except Exception as e:
-            _exc = Error( e )
-            _exc.module = 'Booger'
-            _exc.cause = 'LoadingPanel'
-            _exc.method = 'show( self )'
-            _err = ErrorDialog( _exc )
-            _err.show()
+            self.__post( generation, self.error_event, e )
+        finally:
+            if _chunks is not None and hasattr( _chunks, 'close' ):
+                _chunks.close( )
+            self.__post( generation, self.done_event, (self.rows, cancel.is_set( )) )
 
-class WaitingPanel( Dark ):
+class DataGrid( ):
     '''
-	Construcotr:  WaitingPanel( )
+	Constructor:
+	DataGrid( frame = None, page_size: int = 100 )
 
-	Purpose:  object providing form loader behavior
+	Purpose:
+	Virtual table model over a DataFrame.  Sorting and filtering run vectorized
+	in pandas and only produce a row order; get_page( ) materializes the rows of
+	the current page alone, so an sg.Table can page through any number of rows
+	while holding a single page of Python lists.  Appended chunks are kept as
+	they are, indexed by their first row, so appending never copies the rows
+	already loaded and sorting or filtering joins only the columns they read
 	'''
-
-    def __init__( self ):
-        super().__init__()
-        self.theme_background = super().theme_background
-        self.theme_font = super().theme_font
-        self.icon_path = super().icon_path
-        self.element_backcolor = super().element_backcolor
-        self.element_forecolor = super().element_forecolor
-        self.theme_textcolor = super().text_forecolor
-        self.text_backcolor = super().text_backcolor
-        self.input_backcolor = super().input_backcolor
-        self.input_forecolor = super().input_forecolor
-        self.button_color = super().button_color
-        self.image = os.getcwd() + r'\etc\img\loaders\loader.gif'
-        self.theme_font = ('Roboto', 9)
-        self.form_size = (800, 600)
-        self.timeout = 6000
+    first_key = '-FIRST-'
+    previous_key = '-PREVIOUS-'
+    next_key = '-NEXT-'
+    last_key = '-LAST-'
+    page_key = '-PAGE-'
+    column_key = '-COLUMN-'
+    filter_key = '-FILTER-'
+    apply_key = '-APPLY-'
+    clear_key = '-CLEAR-'
+    table_key = '-TABLE-'
+    status_key = '-STATUS-'
+    progress_key = '-LOADED-'
+    cancel_key = '-CANCEL-'
+
+    def __init__( self, frame = None, page_size: int = 100 ):
+        self.page_size = page_size
+        self.page = 0
+        self.refresh = 0.5
+        self.error = None
+        self.completed = False
+        self.__rendered = 0.0
+        self.__tick = 0
+        self.sort_column = None
+        self.ascending = True
+        self.filter_column = None
+        self.filter_text = None
+        self.__frames = [ ]
+        self.__offsets = [ ]
+        self.__rows = 0
+        self.__columns = { }
+        self.__order = None
+        self.append( frame )
 
     def __dir__( self ) -> list[ str ]:
         '''
@@ -1266,53 +1392,320 @@ class WaitingPanel( Dark ):
         Returns a list[ str ] of member names
 
 		'''
-        return [ 'size', 'settings_path', 'theme_background',
-                 'theme_textcolor', 'element_backcolor', 'element_forecolor',
-                 'text_forecolor', 'text_backcolor', 'input_backcolor',
-                 'input_forecolor', 'button_color', 'button_backcolor',
-                 'button_forecolor', 'icon_path', 'theme_font',
-                 'scrollbar_color', 'progressbar_color', 'timeout', 'show' ]
+        return [ 'page_size', 'page', 'sort_column', 'ascending',
+                 'filter_column', 'filter_text', 'append', 'get_frame',
+                 'get_column', 'get_order', 'get_count', 'get_page_count', 'get_page',
+                 'set_page', 'sort', 'filter', 'create_navigation',
+                 'create_status', 'render', 'handle', 'load', 'refresh', 'error',
+                 'completed' ]
+
+    def append( self, frame ):
+        '''
+		Purpose:
+		Adds a chunk of rows to the backing store at offset 'rows so far'; the
+		joined columns and the row order are rebuilt on the next read
 
-    def show( self ):
-        try:
-            _layout = [ [ sg.Text(
-                background_color = '#000000',
-                text_color = '#FFF000',
-                justification = 'c',
-                key = '-T-',
-                font = ('Bodoni MT', 40) ) ], [ sg.Image( key = '-IMAGE-' ) ] ]
+		Parameters:
+		frame: DataFrame
 
-            _window = sg.Window( '  Waiting...', _layout,
-                icon = self.icon_path,
-                element_justification = 'c',
-                margins = (0, 0),
-                element_padding = (0, 0),
-                size = (800, 600),
-                finalize = True )
+		Returns:
+		None
+		'''
+        if frame is not None and len( frame ) > 0:
+            self.__offsets.append( self.__rows )
+            self.__frames.append( frame )
+            self.__rows += len( frame )
+            self.__columns = { }
+            self.__order = None
+
+    def get_frame( self ) -> DataFrame:
+        '''
+		Purpose:
+		Returns every chunk joined into one DataFrame; paging does not need it
 
-            _window[ '-T-' ].expand( True, True )
-            _interframe_duration = Image.open( self.image ).info[ 'duration' ]
+		Parameters:
+		None
 
-            while True:
-                for frame in ImageSequence.Iterator( Image.open( self.image ) ):
-                    _event, _values = _window.read( timeout = _interframe_duration )
-                    if _event == sg.WIN_CLOSED:
-                        exit( 0 )
-                    _window[ '-IMAGE-' ].update( data = ImageTk.PhotoImage( frame ) )
-                    _window.close()
-        except Exception as e:
-            _exc = Error( e )
-            _exc.module = 'Booger'
-            _exc.cause = 'WaitingPanel'
-            _exc.method = 'show( self )'
-            _err = ErrorDialog( _exc )
-            _err.show()
+		Returns:
+		DataFrame
+		'''
+        if len( self.__frames ) == 0:
+            return DataFrame( )
+        if len( self.__frames ) == 1:
+            return self.__frames[ 0 ]
+        return concat( self.__frames, ignore_index = True )
+
+    def get_column( self, column: int ):
+        '''
+		Purpose:
+		Returns the column at position 'column' across every chunk, joined once
+		per append
+
+		Parameters:
+		column: int
+
+		Returns:
+		Series
+		'''
+        if column not in self.__columns:
+            _parts = [ f.iloc[ :, column ] for f in self.__frames ]
+            self.__columns[ column ] = _parts[ 0 ].reset_index( drop = True ) \
+                if len( _parts ) == 1 else concat( _parts, ignore_index = True )
+        return self.__columns[ column ]
+
+    def get_order( self ) -> np.ndarray:
+        '''
+		Purpose:
+		Returns the positions of the frame's rows after filtering and sorting
+
+		Parameters:
+		None
+
+		Returns:
+		np.ndarray
+		'''
+        if self.__order is None:
+            _order = np.arange( self.__rows )
+            if self.filter_text and self.__rows > 0:
+                if self.filter_column is None:
+                    _columns = range( len( self.__frames[ 0 ].columns ) )
+                else:
+                    _columns = [ self.filter_column ]
+                _mask = np.zeros( self.__rows, dtype = bool )
+                for c in _columns:
+                    _mask |= self.get_column( c ).astype( str ).str.contains( self.filter_text,
+                        case = False, regex = False, na = False ).to_numpy( )
+                _order = _order[ _mask ]
+            if self.sort_column is not None and len( _order ) > 0:
+                _values = self.get_column( self.sort_column ).iloc[ _order ].reset_index(
+                    drop = True )
+                try:
+                    _sorted = _values.sort_values( ascending = self.ascending, kind = 'stable',
+                        na_position = 'last' )
+                except TypeError:
+                    _sorted = _values.astype( str ).sort_values( ascending = self.ascending,
+                        kind = 'stable' )
+                _order = _order[ _sorted.index.to_numpy( ) ]
+            self.__order = _order
+        return self.__order
+
+    def get_count( self ) -> int:
+        if not self.filter_text and self.sort_column is None:
+            return self.__rows
+        return len( self.get_order( ) )
+
+    def get_page_count( self ) -> int:
+        return max( 1, -( -self.get_count( ) // self.page_size ) )
+
+    def set_page( self, page: int ) -> int:
+        self.page = max( 0, min( page, self.get_page_count( ) - 1 ) )
+        return self.page
+
+    def get_page( self ) -> list[ list ]:
+        '''
+		Purpose:
+		Materializes the rows of the current page, each prefixed with its one
+		based row number in the file
+
+		Parameters:
+		None
+
+		Returns:
+		list[ list ]
+		'''
+        self.set_page( self.page )
+        _start = self.page * self.page_size
+        if not self.filter_text and self.sort_column is None:
+            _positions = np.arange( _start, min( _start + self.page_size, self.__rows ) )
+        else:
+            _positions = self.get_order( )[ _start: _start + self.page_size ]
+        _chunks = np.searchsorted( self.__offsets, _positions, side = 'right' ) - 1
+        _rows = [ None ] * len( _positions )
+        for _chunk in np.unique( _chunks ):
+            _at = np.flatnonzero( _chunks == _chunk )
+            _local = _positions[ _at ] - self.__offsets[ _chunk ]
+            for i, r in zip( _at, self.__frames[ _chunk ].iloc[ _local ].values.tolist( ) ):
+                _rows[ i ] = r
+        return [ [ int( p ) + 1 ] + r for p, r in zip( _positions, _rows ) ]
+
+    def sort( self, column: int, ascending: bool = None ):
+        '''
+		Purpose:
+		Sorts by the column at position 'column'; sorting the same column again
+		reverses the direction
+
+		Parameters:
+		column: int, ascending: bool
+
+		Returns:
+		None
+		'''
+        if ascending is None:
+            ascending = not self.ascending if column == self.sort_column else True
+        self.sort_column = column
+        self.ascending = ascending
+        self.page = 0
+        self.__order = None
+
+    def filter( self, text: str, column: int = None ):
+        '''
+		Purpose:
+		Keeps the rows whose 'column', or any column when None, contains 'text'
+
+		Parameters:
+		text: str, column: int
+
+		Returns:
+		None
+		'''
+        self.filter_text = text if text else None
+        self.filter_column = column
+        self.page = 0
+        self.__order = None
 
-class ProcessingPanel( Dark ):
+    def create_navigation( self, headings: list[ str ] ) -> list:
+        '''
+		Purpose:
+		Returns the paging and filter elements handled by handle( )
+
+		Parameters:
+		headings: list[ str ]
+
+		Returns:
+		list
+		'''
+        return [ sg.Button( '<<', key = self.first_key ),
+                 sg.Button( '<', key = self.previous_key ),
+                 sg.Text( 'Page 1 of 1', size = (22, 1), justification = 'c',
+                     key = self.page_key ),
+                 sg.Button( '>', key = self.next_key ),
+                 sg.Button( '>>', key = self.last_key ),
+                 sg.Text( 'Filter' ),
+                 sg.Combo( [ 'All' ] + list( headings ), default_value = 'All',
+                     readonly = True, size = (15, 1), key = self.column_key ),
+                 sg.Input( size = (20, 1), key = self.filter_key ),
+                 sg.Button( 'Apply', key = self.apply_key, bind_return_key = True ),
+                 sg.Button( 'Clear', key = self.clear_key ) ]
+
+    def create_status( self ) -> list:
+        '''
+		Purpose:
+		Returns the status line, progress bar and Cancel button updated by load( )
+
+		Parameters:
+		None
+
+		Returns:
+		list
+		'''
+        return [ sg.Text( 'Loading...', size = (25, 1), key = self.status_key ),
+                 sg.ProgressBar( 100, orientation = 'h', size = (20, 10),
+                     key = self.progress_key ),
+                 sg.Button( 'Cancel', key = self.cancel_key ) ]
+
+    def render( self, window: sg.Window ):
+        self.__rendered = time.monotonic( )
+        _rows = self.get_page( )
+        window[ self.table_key ].update( values = _rows )
+        window[ self.page_key ].update( f'Page {self.page + 1:,} of '
+                                        f'{self.get_page_count( ):,} ({self.get_count( ):,} rows)' )
+
+    def handle( self, window: sg.Window, event, values: dict ) -> bool:
+        '''
+		Purpose:
+		Applies paging, header click sorting and filter events to the grid and
+		renders the new page
+
+		Parameters:
+		window: sg.Window, event, values: dict
+
+		Returns:
+		bool - True when the event belonged to the grid
+		'''
+        if event == self.first_key:
+            self.set_page( 0 )
+        elif event == self.previous_key:
+            self.set_page( self.page - 1 )
+        elif event == self.next_key:
+            self.set_page( self.page + 1 )
+        elif event == self.last_key:
+            self.set_page( self.get_page_count( ) - 1 )
+        elif event == self.apply_key:
+            _headings = window[ self.column_key ].Values[ 1: ]
+            _column = values[ self.column_key ]
+            self.filter( values[ self.filter_key ],
+                _headings.index( _column ) if _column in _headings else None )
+        elif event == self.clear_key:
+            window[ self.filter_key ].update( '' )
+            self.filter( None )
+        elif isinstance( event, tuple ) and event[ 0 ] == self.table_key \
+                and event[ 1 ] == '+CLICKED+':
+            _row, _column = event[ 2 ]
+            if _row != -1 or _column is None or _column < 1:
+                return True
+            self.sort( _column - 1 )
+        else:
+            return False
+        self.render( window )
+        return True
+
+    def load( self, window: sg.Window, executor: QueryExecutor, event, values: dict ) -> bool:
+        '''
+		Purpose:
+		Applies the events of 'executor' to the grid while the window stays
+		open: each chunk is appended as it arrives and the visible page is
+		rendered at most every 'refresh' seconds, the status line and progress
+		bar report the rows read, and Cancel stops the query after the current
+		chunk.  The last error reported is kept in 'error'
+
+		Parameters:
+		window: sg.Window, executor: QueryExecutor, event, values: dict
+
+		Returns:
+		bool - True when the event belonged to the load
+		'''
+        if event == self.cancel_key:
+            executor.cancel( )
+            window[ self.cancel_key ].update( disabled = True )
+        elif event == executor.chunk_event:
+            if executor.is_current( values[ event ] ):
+                self.append( values[ event ][ 1 ] )
+                if time.monotonic( ) - self.__rendered >= self.refresh:
+                    self.render( window )
+        elif event == executor.progress_event:
+            if executor.is_current( values[ event ] ):
+                _rows, _fraction = values[ event ][ 1 ]
+                window[ self.status_key ].update( f'{_rows:,} rows loaded' )
+                if _fraction is not None:
+                    window[ self.progress_key ].update( current_count = int( _fraction * 100 ) )
+        elif event == executor.error_event:
+            if executor.is_current( values[ event ] ):
+                self.error = values[ event ][ 1 ]
+        elif event == executor.done_event:
+            if values[ event ][ 0 ] == executor.generation:
+                _cancelled = values[ event ][ 1 ][ 1 ]
+                self.completed = not _cancelled and self.error is None
+                self.render( window )
+                window[ self.status_key ].update( f'{self.__rows:,} rows'
+                                                  + ( ' (cancelled)' if _cancelled else '' ) )
+                window[ self.progress_key ].update( current_count = 100 )
+                window[ self.cancel_key ].update( disabled = True )
+        elif event == sg.TIMEOUT_EVENT and executor.is_running( ) \
+                and executor.get_progress( ) is None:
+            self.__tick = ( self.__tick + 5 ) % 100
+            window[ self.progress_key ].update( current_count = self.__tick )
+        else:
+            return False
+        return True
+
+class ProgressPanel( Dark ):
     '''
-	Construcotr:  ProcessingPanel( )
+	Construcotr:  ProgressPanel( )
 
-	Purpose:  object providing form processing behavior
+	Purpose:  base class for the animated panels that report the progress of a
+	QueryExecutor.  Without an executor the animation runs for 'timeout'
+	milliseconds, or until closed when 'timeout' is None.  The last error the
+	executor reported is kept in 'error'
 	'''
 
     def __init__( self ):
@@ -1327,9 +1720,11 @@ class ProcessingPanel( Dark ):
         self.input_backcolor = super().input_backcolor
         self.input_forecolor = super().input_forecolor
         self.button_color = super().button_color
-        self.image = os.getcwd() + r'\etc\img\loaders\processing.gif'
+        self.image = os.getcwd() + r'\etc\img\loaders\loading.gif'
+        self.title = '  Loading...'
         self.form_size = (800, 600)
         self.timeout = None
+        self.error = None
 
     def __dir__( self ) -> list[ str ]:
         '''
@@ -1342,49 +1737,139 @@ class ProcessingPanel( Dark ):
                  'text_forecolor', 'text_backcolor', 'input_backcolor',
                  'input_forecolor', 'button_color', 'button_backcolor',
                  'button_forecolor', 'icon_path', 'theme_font',
-                 'scrollbar_color', 'progressbar_color',
-                 'timeout', 'show' ]
+                 'scrollbar_color', 'progressbar_color', 'image', 'title',
+                 'timeout', 'error', 'show' ]
 
-    def show( self ):
+    def show( self, executor: QueryExecutor = None, consume = None ) -> bool:
+        '''
+		Purpose:
+		Animates the panel while 'executor' runs, showing the rows read and a
+		progress bar, and hands each chunk to 'consume' on the GUI thread;
+		closing the panel or pressing Cancel cancels the query
+
+		Parameters:
+		executor: QueryExecutor, consume: callable taking a chunk
+
+		Returns:
+		bool - True when the query ran to completion
+		'''
         try:
             _layout = [ [ sg.Text(
                 background_color = '#000000',
                 text_color = '#FFF000',
                 justification = 'c',
                 key = '-T-',
-                font = ('Bodoni MT', 40) ) ], [ sg.Image( key = '-IMAGE-' ) ] ]
+                font = ('Bodoni MT', 40) ) ], [ sg.Image( key = '-IMAGE-' ) ],
+                        [ sg.ProgressBar( 100, orientation = 'h', size = (40, 10),
+                            key = '-PROGRESS-' ) ],
+                        [ sg.Button( 'Cancel', key = '-CANCEL-' ) ] ]
 
-            _window = sg.Window( '  Processing...', _layout,
-                element_justification = 'c',
+            _window = sg.Window( self.title, _layout,
                 icon = self.icon_path,
+                element_justification = 'c',
                 margins = (0, 0),
-                size = (800, 600),
-                element_padding = (0, 0),
-                finalize = True )
+                size = self.form_size,
+                element_padding = (0, 0), finalize = True )
 
             _window[ '-T-' ].expand( True, True )
-
-            _interframe_duration = Image.open( self.image ).info[ 'duration' ]
-            self.timeout = _interframe_duration
+            _frames = [ ImageTk.PhotoImage( f.copy( ) )
+                        for f in ImageSequence.Iterator( Image.open( self.image ) ) ]
+            _duration = Image.open( self.image ).info.get( 'duration', 100 )
+            _started = time.monotonic( )
+            _completed = False
+            _index = 0
+            self.error = None
+            if executor is not None:
+                executor.start( _window )
 
             while True:
-                for frame in ImageSequence.Iterator( Image.open( self.image ) ):
-                    _event, _values = _window.read( timeout = self.timeout,
-                        timeout_key = '-TIMEOUT-' )
-                    if _event == sg.WIN_CLOSED or _event == sg.WIN_X_EVENT:
-                        exit( 0 )
-
-                    _window[ '-IMAGE-' ].update( data = ImageTk.PhotoImage( frame ) )
-                    _window.close()
+                _event, _values = _window.read( timeout = _duration )
+                if _event in (sg.WIN_CLOSED, sg.WIN_X_EVENT, '-CANCEL-'):
+                    if executor is not None:
+                        executor.cancel( )
+                    break
+                if executor is None:
+                    _elapsed = ( time.monotonic( ) - _started ) * 1000
+                    if self.timeout is not None and _elapsed >= self.timeout:
+                        _completed = True
+                        break
+                    _window[ '-PROGRESS-' ].update( current_count = _index % 100 )
+                elif _event == executor.chunk_event \
+                        and executor.is_current( _values[ _event ] ):
+                    if consume is not None:
+                        consume( _values[ _event ][ 1 ] )
+                elif _event == executor.progress_event \
+                        and executor.is_current( _values[ _event ] ):
+                    _rows, _fraction = _values[ _event ][ 1 ]
+                    _window[ '-T-' ].update( f'{_rows:,} rows' )
+                    if _fraction is not None:
+                        _window[ '-PROGRESS-' ].update( current_count = int( _fraction * 100 ) )
+                elif _event == executor.error_event \
+                        and executor.is_current( _values[ _event ] ):
+                    self.error = _values[ _event ][ 1 ]
+                    _window[ '-T-' ].update( str( self.error ) )
+                elif _event == executor.done_event \
+                        and _values[ _event ][ 0 ] == executor.generation:
+                    _completed = not _values[ _event ][ 1 ][ 1 ] and self.error is None
+                    break
+                elif executor.total is None:
+                    _window[ '-PROGRESS-' ].update( current_count = _index % 100 )
+                _window[ '-IMAGE-' ].update( data = _frames[ _index % len( _frames ) ] )
+                _index += 1
 
+            _window.close()
+            return _completed
         except Exception as e:
             _exc = Error( e )
             _exc.module = 'Booger'
-            _exc.cause = 'ProcessingPanel'
-            _exc.method = 'show( self )'
+            _exc.cause = 'ProgressPanel'
+            _exc.method = 'show( self, executor )'
             _err = ErrorDialog( _exc )
             _err.show()
 
+class LoadingPanel( ProgressPanel ):
+    '''
+	Construcotr:  LoadingPanel( )
+
+	Purpose:  object providing form loading behavior
+	'''
+
+    def __init__( self ):
+        super().__init__()
+        self.image = os.getcwd() + r'\etc\img\loaders\loading.gif'
+        self.title = '  Loading...'
+        self.form_size = (800, 600)
+        self.timeout = 6000
+
+class WaitingPanel( ProgressPanel ):
+    '''
+	Construcotr:  WaitingPanel( )
+
+	Purpose:  object providing form loader behavior
+	'''
+
+    def __init__( self ):
+        super().__init__()
+        self.image = os.getcwd() + r'\etc\img\loaders\loader.gif'
+        self.title = '  Waiting...'
+        self.theme_font = ('Roboto', 9)
+        self.form_size = (800, 600)
+        self.timeout = 6000
+
+class ProcessingPanel( ProgressPanel ):
+    '''
+	Construcotr:  ProcessingPanel( )
+
+	Purpose:  object providing form processing behavior
+	'''
+
+    def __init__( self ):
+        super().__init__()
+        self.image = os.getcwd() + r'\etc\img\loaders\processing.gif'
+        self.title = '  Processing...'
+        self.form_size = (800, 600)
+        self.timeout = None
+
 class SplashPanel( Dark ):
     '''
 	Construcotr:  SplashPanel( )
@@ -2030,13 +2515,14 @@ class CalendarDialog( Dark ):
 class ComboBoxDialog( Dark ):
     '''
 	Construcotr:
-	ComboBoxDialog( data: list = None )
+	ComboBoxDialog( data: list = None, search = None )
 
 	Purpose:
-	Logger object provides form for log printing
+	Logger object provides form for log printing. When 'search' is given,
+	a search box filters the items through search( text ) as the user types.
 	'''
 
-    def __init__( self, data: list = None ):
+    def __init__( self, data: list = None, search = None ):
         super().__init__()
         self.theme_background = super().theme_background
         self.theme_font = super().theme_font
@@ -2050,6 +2536,8 @@ class ComboBoxDialog( Dark ):
         self.button_color = super().button_color
         self.form_size = (400, 150)
         self.items = data
+        self.search = search
+        self.selected_item = None
 
     def __str__( self ) -> str:
         if self.selected_item is not None:
@@ -2066,7 +2554,7 @@ class ComboBoxDialog( Dark ):
                  'text_forecolor', 'text_backcolor', 'input_backcolor',
                  'input_forecolor', 'button_color', 'button_backcolor',
                  'button_forecolor', 'icon_path', 'theme_font',
-                 'scrollbar_color', 'progressbar_color', 'items',
+                 'scrollbar_color', 'progressbar_color', 'items', 'search',
                  'selected_item', 'show' ]
 
     def show( self ):
@@ -2080,12 +2568,21 @@ class ComboBoxDialog( Dark ):
         try:
             _btnsz = (10, 1)
             _spc = (5, 1)
+            if self.items is None and self.search is not None:
+                self.items = self.search( '' )
             if self.items is None:
                 self.items = [ f'Item {x} ' for x in range( 30 ) ]
                 _values = self.items
 
+            _search = [ [ sg.Text( size = _spc ),
+                          sg.Input( size = (35, 1), enable_events = True, key = '-SEARCH-' ) ] ] \
+                if self.search is not None else [ ]
+            if self.search is not None:
+                self.form_size = (400, 180)
+
             _layout = [ [ sg.Text( size = _spc ), sg.Text( size = _spc ) ],
                         [ sg.Text( size = _spc ), sg.Text( 'Select Item' ) ],
+                        *_search,
                         [ sg.Text( size = _spc ),
                           sg.DropDown( self.items, key = '-ITEM-', size = (35, 1) ) ],
                         [ sg.Text( size = _spc ), sg.Text( size = _spc ) ],
@@ -2102,6 +2599,12 @@ class ComboBoxDialog( Dark ):
                 if _event in (sg.WIN_CLOSED, 'Exit', 'Cancel'):
                     break
 
+                if _event == '-SEARCH-':
+                    _items = self.search( _values[ '-SEARCH-' ] )
+                    _window[ '-ITEM-' ].update( value = _items[ 0 ] if _items else '',
+                        values = _items )
+                    continue
+
                 self.selected_item = _values[ '-ITEM-' ]
                 sg.popup( _event, _values, self.selected_item,
                     text_color = self.theme_textcolor,
@@ -2120,13 +2623,14 @@ class ComboBoxDialog( Dark ):
 class ListBoxDialog( Dark ):
     '''
 	Construcotr:
-	    ListBox( data: list = None )
+	    ListBox( data: list = None, search = None )
 
 	Purpose:
-	    List search and selection
+	    List search and selection. When 'search' is given, the list is
+	    populated and filtered through search( text ) instead of a scan of 'data'.
     '''
 
-    def __init__( self, data: list[ str ] = None ):
+    def __init__( self, data: list[ str ] = None, search = None ):
         super().__init__()
         self.theme_background = super().theme_background
         self.theme_font = super().theme_font
@@ -2141,6 +2645,8 @@ class ListBoxDialog( Dark ):
         self.form_size = (400, 250)
         self.image = os.getcwd() + r'\etc\img\app\dialog\lookup.png'
         self.items = data
+        self.search = search
+        self.selected_item = None
 
     def __str__( self ) -> str:
         if self.selected_item is not None:
@@ -2157,7 +2663,7 @@ class ListBoxDialog( Dark ):
                  'text_forecolor', 'text_backcolor', 'input_backcolor',
                  'input_forecolor', 'button_color', 'button_backcolor',
                  'button_forecolor', 'icon_path', 'theme_font',
-                 'scrollbar_color', 'progressbar_color', 'items',
+                 'scrollbar_color', 'progressbar_color', 'items', 'search',
                  'selected_items', 'show' ]
 
     def show( self ):
@@ -2179,6 +2685,8 @@ class ListBoxDialog( Dark ):
 
             if isinstance( self.items, list ):
                 _names = [ src for src in self.items ]
+            elif self.search is not None:
+                _names = self.search( '' )
             else:
                 _names = [ f'Item - {i}' for i in range( 40 ) ]
 
@@ -2204,7 +2712,8 @@ class ListBoxDialog( Dark ):
                 _event, _values = _window.read()
                 if _event in (sg.WIN_CLOSED, 'Exit'):
                     break
-                self.selected_item = str( _values[ '-ITEM-' ][ 0 ] )
+                if _values[ '-ITEM-' ]:
+                    self.selected_item = str( _values[ '-ITEM-' ][ 0 ] )
                 if _event == 'Selected':
                     self.selected_item = str( _values[ '-ITEM-' ][ 0 ] )
                     sg.popup( 'Results', self.selected_item,
@@ -2214,7 +2723,10 @@ class ListBoxDialog( Dark ):
 
                 if _values[ '-INPUT-' ] != '':
                     _search = _values[ '-INPUT-' ]
-                    _newvalues = [ x for x in _names if _search in x ]
+                    if self.search is not None:
+                        _newvalues = self.search( _search )
+                    else:
+                        _newvalues = [ x for x in _names if _search in x ]
                     _window[ '-ITEM-' ].update( _newvalues )
                 else:
                     _window[ '-ITEM-' ].update( _names )
@@ -3590,6 +4102,9 @@ class CsvForm( Dark ):
         self.input_backcolor = super().input_backcolor
         self.input_forecolor = super().input_forecolor
         self.button_color = super().button_color
+        self.chunk_size = 10000
+        self.engine = 'auto'
+        self.page_size = 100
         self.form_size = (800, 600)
 
     def __dir__( self ) -> list[ str ]:
@@ -3603,21 +4118,26 @@ class CsvForm( Dark ):
                  'text_forecolor', 'text_backcolor', 'input_backcolor',
                  'input_forecolor', 'button_color', 'button_backcolor',
                  'button_forecolor', 'icon_path', 'theme_font',
-                 'scrollbar_color', 'progressbar_color', 'header',
+                 'scrollbar_color', 'progressbar_color', 'header', 'chunk_size', 'engine', 'page_size',
                  'show' ]
 
     def show( self ):
         '''
 		Purpose:
+		Reads the selected CSV file in chunks with a CsvParser on a QueryExecutor
+		into a DataGrid that shows each chunk as it arrives, one page at a time,
+		with header click sorting and filtering that run in pandas. Cancel stops
+		the load and keeps the rows read so far. The header question is only
+		asked when the parser cannot tell whether the first row is a header
 
 		Parameters:
+		None
 
 		Returns:
+		None
 		'''
         try:
             _sm = (3, 1)
-            _med = (15, 1)
-            _spc = (25, 1)
             _dialog = FileDialog()
             _dialog.show()
             _path = _dialog.selected_path
@@ -3627,40 +4147,54 @@ class CsvForm( Dark ):
                 _msg.show()
                 return
 
-            _data = [ ]
-            _header = [ ]
-
-            _button = sg.popup_yes_no( 'Does file have column column_names?',
-                icon = self.icon_path,
-                font = self.theme_font )
+            if _path is None:
+                return
 
-            if _path is not None:
-                try:
-                    _frame = CsvReader( _path, sep = ',', engine = 'python', header = None )
-                    _data = _frame.values.tolist()
-                    if _button == 'Yes':
-                        _header = _frame.iloc[ 0 ].tolist()
-                        _data = _frame[ 1: ].column_values.tolist()
-                    elif _button == 'No':
-                        _header = [ 'Column' + str( x ) for x in range( len( _data[ 0 ] ) ) ]
-                except Exception:
-                    sg.popup_error( 'Error reading file' )
-                    return
+            _parser = CsvParser( _path, engine = self.engine, chunk_size = self.chunk_size )
+            try:
+                if _parser.detect_header( ) is None:
+                    _button = sg.popup_yes_no( 'Does file have column column_names?',
+                        icon = self.icon_path,
+                        font = self.theme_font )
+                    _parser.header = _button == 'Yes'
+                _header = _parser.get_columns( )
+            except Exception:
+                sg.popup_error( 'Error reading file' )
+                return
 
+            _grid = DataGrid( page_size = self.page_size )
+            _executor = QueryExecutor( _parser.read_chunks, frames = True )
             _left = [ [ sg.Text( size = _sm ), ] ]
             _right = [ [ sg.Text( size = _sm ), ] ]
-            _datagrid = [ [ sg.Table( values = _data, headings = _header, justification = 'center',
-                row_height = 18, display_row_numbers = True, vertical_scroll_only = False,
+            _datagrid = [ [ sg.Table( values = [ ], headings = [ '#' ] + _header,
+                justification = 'center',
+                row_height = 18, display_row_numbers = False, vertical_scroll_only = False,
                 header_background_color = '#1B262E', header_relief = sg.RELIEF_FLAT,
                 header_border_width = 1, selected_row_colors = ('#FFFFFF', '#4682B4'),
                 header_text_color = '#FFFFFF', header_font = ('Roboto', 8, 'bold'),
                 font = ('Roboto', 8), background_color = '#EDF3F8',
                 alternating_row_color = '#EDF3F8', border_width = 1, text_color = '#000000',
                 expand_x = True, expand_y = True, sbar_relief = sg.RELIEF_FLAT,
-                num_rows = min( 26, len( _data ) ) ), ], ]
+                num_rows = 26, enable_click_events = True, key = _grid.table_key ), ],
+                          _grid.create_navigation( _header ),
+                          _grid.create_status( ) ]
             _window = sg.Window( '  Budget Execution', _datagrid, icon = self.icon_path,
-                font = self.theme_font, resizable = True )
-            _event, _values = _window.read()
+                font = self.theme_font, resizable = True, finalize = True )
+            _window.bind( '<Prior>', _grid.previous_key )
+            _window.bind( '<Next>', _grid.next_key )
+            _grid.render( _window )
+            _executor.start( _window )
+
+            while True:
+                _event, _values = _window.read( timeout = 100 if _executor.is_running( ) else None )
+                if _event in (sg.WIN_CLOSED, sg.WIN_X_EVENT):
+                    _executor.cancel( )
+                    break
+                elif _grid.load( _window, _executor, _event, _values ):
+                    if _event == _executor.error_event and _grid.error is not None:
+                        sg.popup_error( 'Error reading file' )
+                else:
+                    _grid.handle( _window, _event, _values )
             _window.close()
         except Exception as e:
             _exc = Error( e )
@@ -3701,6 +4235,9 @@ class ExcelForm( Dark ):
         self.input_backcolor = super().input_backcolor
         self.input_forecolor = super().input_forecolor
         self.button_color = super().button_color
+        self.chunk_size = 50000
+        self.engine = 'auto'
+        self.page_size = 100
         self.form_size = (1250, 650)
 
     def __dir__( self ) -> list[ str ]:
@@ -3715,15 +4252,22 @@ class ExcelForm( Dark ):
                  'input_forecolor', 'button_color', 'button_backcolor',
                  'button_forecolor', 'icon_path', 'theme_font',
                  'scrollbar_color', 'progressbar_color',
-                 'header', 'show' ]
+                 'header', 'chunk_size', 'engine', 'page_size', 'show' ]
 
     def show( self ):
         '''
 		Purpose:
+		Asks for the sheet, cell range and header row of the selected workbook,
+		then streams the selection with an ExcelParser on a QueryExecutor into a
+		DataGrid that shows each chunk as it arrives; reopening an unchanged
+		workbook reads the parsed cache. Cancel stops the load and keeps the
+		rows read so far
 
 		Parameters:
+		None
 
 		Returns:
+		None
 		'''
         try:
             _small = (3, 1)
@@ -3738,40 +4282,64 @@ class ExcelForm( Dark ):
                 _msg.show()
                 return
 
-            _data = [ ]
-            _header = [ ]
+            if _filename is None:
+                return
+
+            _parser = ExcelParser( _filename, engine = self.engine, chunk_size = self.chunk_size )
+            try:
+                _sheets = _parser.get_sheets( )
+            except Exception:
+                sg.popup_error( 'Error reading file' )
+                return
 
-            _button = sg.popup_yes_no( 'First Row Has Headers?',
-                title = 'Headers?',
+            _picker = [ [ sg.Text( 'Sheet', size = _med ),
+                          sg.Combo( _sheets, default_value = _sheets[ 0 ], readonly = True,
+                              size = _spc, key = '-SHEET-' ) ],
+                        [ sg.Text( 'Range', size = _med ),
+                          sg.Input( '', size = _spc, key = '-RANGE-',
+                              tooltip = ' A1:F500, B:H or blank for the whole sheet ' ) ],
+                        [ sg.Checkbox( 'First Row Has Headers', default = True,
+                            key = '-HEADERS-' ) ],
+                        [ sg.Button( 'Load', size = _med, bind_return_key = True ),
+                          sg.Button( 'Cancel', size = _med ) ] ]
+            _selector = sg.Window( '  Select Sheet', _picker,
                 icon = self.icon_path,
-                font = ('Roboto', 9) )
-            if _filename is not None:
-                try:
-                    _dataframe = ExcelReader( _filename, index_col = 0 )
-                    _data = _dataframe.values.tolist()
-                    if _button == 'Yes':
-                        _header = [ f'{i} ' for i in _dataframe.columns ]
-                    elif _button == 'No':
-                        _header = [ 'Column - ' + str( x ) for x in range( len( _data[ 0 ] ) ) ]
-                except:
-                    sg.popup_error( 'Error reading file' )
-                    return
+                font = ('Roboto', 9),
+                modal = True )
+            _event, _values = _selector.read( )
+            _selector.close( )
+            if _event != 'Load':
+                return
+
+            _parser.sheet = _values[ '-SHEET-' ]
+            _parser.cells = _values[ '-RANGE-' ].strip( ) or None
+            _parser.header = _values[ '-HEADERS-' ]
+            try:
+                _header = _parser.get_columns( )
+            except Exception:
+                sg.popup_error( 'Error reading file' )
+                return
+
+            _grid = DataGrid( page_size = self.page_size )
+            _executor = QueryExecutor( _parser.read_chunks, frames = True )
             _left = [ [ sg.Text( size = _small ), ] ]
             _right = [ [ sg.Text( size = _small ), ] ]
-            _datagrid = [ [ sg.Table( values = _data, headings = _header, justification = 'center',
-                row_height = 18, display_row_numbers = True, vertical_scroll_only = False,
+            _datagrid = [ [ sg.Table( values = [ ], headings = [ '#' ] + _header,
+                justification = 'center',
+                row_height = 18, display_row_numbers = False, vertical_scroll_only = False,
                 header_background_color = '#1B262E', header_relief = sg.RELIEF_FLAT,
                 header_border_width = 1, selected_row_colors = ('#FFFFFF', '#4682B4'),
                 header_text_color = '#FFFFFF', header_font = ('Roboto', 8, 'bold'),
                 font = ('Roboto', 8), background_color = '#EDF3F8',
                 alternating_row_color = '#EDF3F8', border_width = 1, text_color = '#000000',
                 expand_x = True, expand_y = True, sbar_relief = sg.RELIEF_FLAT,
-                num_rows = min( 26, len( _data ) ) ), ], ]
+                num_rows = 26, enable_click_events = True, key = _grid.table_key ), ],
+                          _grid.create_navigation( _header ) ]
             _layout = [ [ sg.Text( size = (3, 3) ) ],
                         [ sg.Column( _left, expand_x = True ),
                           sg.Column( _datagrid, expand_x = True, expand_y = True ),
                           sg.Column( _right, expand_x = True ) ],
-                        [ sg.Text( size = _small ) ],
+                        [ sg.Text( size = (10, 1) ) ] + _grid.create_status( ),
                         [ sg.Text( size = (10, 1) ), sg.Button( 'Open', size = _med,
                             key = '-OPEN-' ),
                           sg.Text( size = _spc ), sg.Button( 'Export', size = _med,
@@ -3786,15 +4354,28 @@ class ExcelForm( Dark ):
                 icon = self.icon_path,
                 font = self.theme_font,
                 resizable = True,
+                finalize = True,
                 right_click_menu = sg.MENU_RIGHT_CLICK_EDITME_VER_SETTINGS_EXIT )
-            _event, _values = _window.read()
-            if _event in (sg.WIN_X_EVENT, '-CLOSE-'):
-                _window.close()
-            elif _event in ('-OPEN-', '-EXPORT-', '-SAVE-', 'Save'):
-                _info = 'Not Yet Implemented!'
-                _msg = MessageDialog( _info )
-                _msg.show()
-                _window.close()
+            _window.bind( '<Prior>', _grid.previous_key )
+            _window.bind( '<Next>', _grid.next_key )
+            _grid.render( _window )
+            _executor.start( _window )
+
+            while True:
+                _event, _values = _window.read( timeout = 100 if _executor.is_running( ) else None )
+                if _event in (sg.WIN_CLOSED, sg.WIN_X_EVENT, '-CLOSE-'):
+                    _executor.cancel( )
+                    break
+                elif _grid.load( _window, _executor, _event, _values ):
+                    if _event == _executor.error_event and _grid.error is not None:
+                        sg.popup_error( 'Error reading file' )
+                elif _grid.handle( _window, _event, _values ):
+                    continue
+                elif _event in ('-OPEN-', '-EXPORT-', '-SAVE-', 'Save'):
+                    _info = 'Not Yet Implemented!'
+                    _msg = MessageDialog( _info )
+                    _msg.show()
+            _window.close()
         except Exception as e:
             _exc = Error( e )
             _exc.module = 'Booger'
@@ -4014,14 +4595,64 @@ class GraphForm( Dark ):
 
 class ChatWindow():
     '''
-	Function to generate a chat window
+	Constructor:
+	ChatWindow( stream = None )
+
+	Purpose:
+	Function to generate a chat window.  The optional 'stream' argument is a
+	callable such as TextGeneration( ).stream_request that takes a prompt and
+	yields content deltas, which are rendered progressively as they arrive.
+	Closing the window stops the stream and closes its generator
 	'''
 
-    def __init__( self ):
+    def __init__( self, stream = None ):
         sg.theme( 'GreenTan' )
+        self.stream = stream
+        self.__closed = threading.Event( )
+
+    def __dir__( self ) -> list[ str ]:
+        '''
+
+        Returns a list[ str ] of member names
+
+		'''
+        return [ 'stream', 'show', 'send' ]
+
+    def send( self, window: sg.Window, query: str ):
+        '''
+		Purpose:
+		Iterates the deltas yielded by 'stream' on a worker thread and posts
+		each one to the window as a '-DELTA-' event, followed by '-DONE-'.
+		Errors raised by the stream are posted as an '-ERROR-' event so the
+		dialog is opened by the window's own thread.  Once the window closes
+		the generator is closed, releasing the request it holds
+
+		Parameters:
+		window: sg.Window, query: str
+
+		Returns:
+		None
+		'''
+        _closed = self.__closed
+        _deltas = None
+        try:
+            _deltas = self.stream( query )
+            for _delta in _deltas or [ ]:
+                if _closed.is_set( ):
+                    break
+                window.write_event_value( '-DELTA-', _delta )
+        except Exception as e:
+            if not _closed.is_set( ):
+                window.write_event_value( '-ERROR-', e )
+        finally:
+            if _deltas is not None and hasattr( _deltas, 'close' ):
+                _deltas.close( )
+            if not _closed.is_set( ):
+                window.write_event_value( '-DONE-', None )
 
     def show( self ):
         try:
+            self.__closed = threading.Event( )
             _layout = [ [ sg.Text( 'Your output will go here', size = (40, 1) ) ],
                         [ sg.Output( size = (110, 20), font = ('Helvetica 10') ) ],
                         [ sg.Multiline( size = (70, 5), enter_submits = True, key = '-QUERY-',
@@ -4040,10 +4671,28 @@ class ChatWindow():
                 event, values = window.read()
                 # quit if exit button or X
                 if event in (sg.WIN_CLOSED, 'EXIT'):
+                    self.__closed.set( )
                     break
                 if event == 'SEND':
                     query = values[ '-QUERY-' ].rstrip()
-                    print( 'The command you entered was {}'.format( query ), flush = True )
+                    if self.stream is None:
+                        print( 'The command you entered was {}'.format( query ), flush = True )
+                    else:
+                        print( '\r\n' + query + '\r\n', flush = True )
+                        window[ 'SEND' ].update( disabled = True )
+                        window.perform_long_operation( lambda: self.send( window, query ), '-SENT-' )
+                elif event == '-DELTA-':
+                    print( values[ '-DELTA-' ], end = '', flush = True )
+                elif event == '-ERROR-':
+                    _exc = Error( values[ '-ERROR-' ] )
+                    _exc.module = 'Booger'
+                    _exc.cause = 'ChatWindow'
+                    _exc.method = 'send( self, window: sg.Window, query: str )'
+                    _err = ErrorDialog( _exc )
+                    _err.show()
+                elif event == '-DONE-':
+                    print( '', flush = True )
+                    window[ 'SEND' ].update( disabled = False )
 
             window.close()
         except Exception as e:
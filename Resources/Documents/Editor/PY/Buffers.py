@@ -0,0 +1,161 @@
+'''
+  ******************************************************************************************
+      Assembly:                Boo
+      Filename:                Buffers.py
+      Author:                  Terry D. Eppler
+      Created:                 05-31-2023
+
+      Last Modified By:        Terry D. Eppler
+      Last Modified On:        06-01-2023
+  ******************************************************************************************
+  <copyright file="Buffers.py" company="Terry D. Eppler">
+
+     This is a Federal Budget, Finance, and Accounting application.
+     Copyright ©  2024  Terry Eppler
+
+     Permission is hereby granted, free of charge, to any person obtaining a copy
+     of this software and associated documentation files (the “Software”),
+     to deal in the Software without restriction,
+     including without limitation the rights to use,
+     copy, modify, merge, publish, distribute, sublicense,
+     and/or sell copies of the Software,
+     and to permit persons to whom the Software is furnished to do so,
+     subject to the following conditions:
+
+     The above copyright notice and this permission notice shall be included in all
+     copies or substantial portions of the Software.
+
+     THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+     INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+     FITNESS FOR A PARTICULAR PURPOSE AND NON-INFRINGEMENT.
+     IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+     DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+     ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+     DEALINGS IN THE SOFTWARE.
+
+     You can contact me at: terryeppler@gmail.com or eppler.terry@epa.gov
+
+  </copyright>
+  <summary>
+    Buffers.py
+  </summary>
+  ******************************************************************************************
+  '''
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+class AudioBuffer:
+    '''
+    Preallocated, growable buffer that audio frames are written into in place.
+
+    The buffer starts at a small capacity and grows geometrically when a recording outlives
+    it, so a short recording only allocates a few seconds of samples and a long one copies
+    each sample a bounded number of times. With 'path' set the buffer is a memory-mapped
+    scratch file instead, which grows by extending the file without copying. Views returned by get_data share memory with the buffer and
+    stay valid after it grows, because written samples are never overwritten.
+
+    Args:
+        seconds (float): The initial capacity in seconds.
+        samplerate (int): The sample rate of the frames.
+        path (Optional[str], optional): The scratch file to map. Defaults to None.
+        growth (float, optional): The factor the capacity grows by. Defaults to 2.0.
+    '''
+
+    def __init__(
+            self,
+            seconds: float,
+            samplerate: int,
+            path: Optional[ str ] = None,
+            growth: float = 2.0,
+    ) -> None:
+        self.samplerate: int = samplerate
+        self.capacity: int = max( 1, int( seconds * samplerate ) )
+        self.path: Optional[ str ] = path
+        self.growth: float = growth
+        self.size: int = 0
+        self.__data: Optional[ np.ndarray ] = None
+
+    def __len__( self ) -> int:
+        return self.size
+
+    def get_seconds( self ) -> float:
+        '''
+        Returns:
+            float: The number of seconds written.
+        '''
+        return self.size / self.samplerate
+
+    def write( self, frame: np.ndarray ) -> None:
+        '''
+        Copy a frame into the buffer, growing it when full.
+
+        Args:
+            frame (np.ndarray): The frame, shaped ( samples, channels ).
+        '''
+        if self.__data is None:
+            self.__allocate( frame.shape[ 1: ], frame.dtype )
+
+        end: int = self.size + len( frame )
+        if end > self.capacity:
+            self.__grow( end )
+
+        self.__data[ self.size:end ] = frame
+        self.size = end
+
+    def get_data( self, start: int = 0, end: Optional[ int ] = None ) -> np.ndarray:
+        '''
+        Get a zero-copy view of the written samples.
+
+        Args:
+            start (int, optional): The first sample. Defaults to 0.
+            end (Optional[int], optional): The sample after the last. Defaults to the size.
+
+        Returns:
+            np.ndarray: The view.
+        '''
+        if self.__data is None:
+            return np.empty( (0, 1), dtype = np.float32 )
+
+        return self.__data[ start:self.size if end is None else min( end, self.size ) ]
+
+    def close( self ) -> None:
+        '''
+        Release the buffer and delete the scratch file, if any.
+        Views handed out earlier keep their memory alive.
+        '''
+        self.__data = None
+        self.size = 0
+        if self.path is not None and os.path.exists( self.path ):
+            try:
+                os.remove( self.path )
+            except OSError:
+                pass
+
+    def __allocate( self, shape: Tuple[ int, ... ], dtype: np.dtype ) -> None:
+        if self.path is None:
+            self.__data = np.empty( (self.capacity,) + shape, dtype = dtype )
+        else:
+            self.__data = np.memmap(
+                self.path, dtype = dtype, mode = 'w+', shape = (self.capacity,) + shape
+            )
+
+    def __grow( self, needed: int ) -> None:
+        capacity: int = self.capacity
+        while capacity < needed:
+            capacity = int( capacity * self.growth ) + 1
+
+        if self.path is None:
+            data: np.ndarray = np.empty( (capacity,) + self.__data.shape[ 1: ],
+                                         dtype = self.__data.dtype )
+            data[ :self.size ] = self.__data[ :self.size ]
+        else:
+            self.__data.flush( )
+            data = np.memmap(
+                self.path, dtype = self.__data.dtype, mode = 'r+',
+                shape = (capacity,) + self.__data.shape[ 1: ]
+            )
+
+        self.__data = data
+        self.capacity = capacity
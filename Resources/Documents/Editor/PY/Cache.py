@@ -0,0 +1,254 @@
+'''
+  ******************************************************************************************
+      Assembly:                Boo
+      Filename:                Cache.py
+      Author:                  Terry D. Eppler
+      Created:                 05-31-2023
+
+      Last Modified By:        Terry D. Eppler
+      Last Modified On:        06-01-2023
+  ******************************************************************************************
+  <copyright file="Cache.py" company="Terry D. Eppler">
+
+     This is a Federal Budget, Finance, and Accounting application.
+     Copyright ©  2024  Terry Eppler
+
+     Permission is hereby granted, free of charge, to any person obtaining a copy
+     of this software and associated documentation files (the “Software”),
+     to deal in the Software without restriction,
+     including without limitation the rights to use,
+     copy, modify, merge, publish, distribute, sublicense,
+     and/or sell copies of the Software,
+     and to permit persons to whom the Software is furnished to do so,
+     subject to the following conditions:
+
+     The above copyright notice and this permission notice shall be included in all
+     copies or substantial portions of the Software.
+
+     THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+     INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+     FITNESS FOR A PARTICULAR PURPOSE AND NON-INFRINGEMENT.
+     IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+     DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+     ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+     DEALINGS IN THE SOFTWARE.
+
+     You can contact me at: terryeppler@gmail.com or eppler.terry@epa.gov
+
+  </copyright>
+  <summary>
+    Cache.py
+  </summary>
+  ******************************************************************************************
+  '''
+import hashlib
+import json
+import sqlite3 as sqlite
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+class ResponseCache( ):
+    '''
+
+        Constructor:
+
+            ResponseCache( size: int = 512, ttl: float = None, path: str = None )
+
+        Purpose:
+
+            Content-addressed cache of GPT responses keyed by a hash of the
+            ( model, system prompt, user prompt, temperature ) tuple. Entries are
+            held in memory with LRU eviction and, when 'path' is given, persisted
+            to a SQLite file so they survive restarts. Entries older than 'ttl'
+            seconds are treated as misses.
+
+    '''
+
+    def __init__( self, size: int = 512, ttl: float = None, path: str = None ):
+        self.size = size
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+        self.saved_tokens = 0
+        self.__entries = OrderedDict( )
+        self.__lock = threading.Lock( )
+        self.__connection = None
+        if path is not None:
+            self.__connection = sqlite.connect( path, check_same_thread = False )
+            self.__connection.execute( 'CREATE TABLE IF NOT EXISTS Responses '
+                                       '( Key TEXT PRIMARY KEY, Content TEXT, Created REAL, '
+                                       'Accessed REAL, Seconds REAL, Tokens INTEGER );' )
+            self.__connection.commit( )
+
+
+    def __dir__( self ) -> list[ str ]:
+        '''
+
+            Returns a list[ str ] of member names.
+
+        '''
+        return [ 'size', 'ttl', 'path', 'hits', 'misses', 'evictions',
+                 'saved_seconds', 'saved_tokens', 'create_key', 'is_cacheable',
+                 'is_expired',
+                 'get', 'put', 'clear', 'get_stats' ]
+
+
+    def __len__( self ) -> int:
+        return len( self.__entries )
+
+
+    @staticmethod
+    def create_key( model: str, system: str, prompt: str, temperature: float,
+                    messages: list[ dict ] = None ) -> str:
+        '''
+
+            Returns: the sha256 hex digest addressing the request tuple and,
+            when given, the full 'messages' history sent with the prompt, so
+            the same prompt in a different conversation is a different key.
+
+        '''
+        _data = json.dumps( [ model, system, prompt, float( temperature ), messages ],
+            ensure_ascii = False, default = str )
+        return hashlib.sha256( _data.encode( 'utf-8' ) ).hexdigest( )
+
+
+    @staticmethod
+    def is_cacheable( temperature: float, cache: bool = None ) -> bool:
+        '''
+
+            Returns: True when the caller opted in with 'cache', or, when 'cache'
+            is None, when the request is deterministic ( temperature 0 ).
+
+        '''
+        if cache is not None:
+            return cache
+        return float( temperature ) == 0.0
+
+
+    def is_expired( self, created: float ) -> bool:
+        '''
+
+            Returns: True if an entry created at 'created' has outlived 'ttl'
+
+        '''
+        return self.ttl is not None and time.time( ) - created > self.ttl
+
+
+    def get( self, key: str ) -> Optional[ str ]:
+        '''
+
+            Purpose: looks up 'key', counting a hit or a miss.
+
+            Parameters: key: str from create_key( )
+
+            Returns: the cached content or None
+
+        '''
+        with self.__lock:
+            _entry = self.__entries.get( key )
+            if _entry is None and self.__connection is not None:
+                _row = self.__connection.execute( 'SELECT Content, Created, Seconds, Tokens '
+                                                  'FROM Responses WHERE Key = ?;',
+                    ( key, ) ).fetchone( )
+                if _row is not None:
+                    _entry = tuple( _row )
+                    self.__insert( key, _entry )
+
+            if _entry is None or self.is_expired( _entry[ 1 ] ):
+                if _entry is not None:
+                    self.__remove( key )
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end( key )
+            self.hits += 1
+            self.saved_seconds += _entry[ 2 ]
+            self.saved_tokens += _entry[ 3 ]
+            if self.__connection is not None:
+                self.__connection.execute( 'UPDATE Responses SET Accessed = ? WHERE Key = ?;',
+                    ( time.time( ), key ) )
+                self.__connection.commit( )
+            return _entry[ 0 ]
+
+
+    def put( self, key: str, content: str, seconds: float = 0.0, tokens: int = 0 ) -> None:
+        '''
+
+            Purpose: stores 'content' under 'key' along with what the original
+            request cost, so later hits can report what they saved.
+
+            Parameters: key: str, content: str, seconds: float, tokens: int
+
+            Returns: None
+
+        '''
+        if content is None:
+            return
+        _entry = ( content, time.time( ), float( seconds ), int( tokens or 0 ) )
+        with self.__lock:
+            self.__insert( key, _entry )
+            if self.__connection is not None:
+                self.__connection.execute( 'INSERT OR REPLACE INTO Responses '
+                                           'VALUES ( ?, ?, ?, ?, ?, ? );',
+                    ( key, _entry[ 0 ], _entry[ 1 ], _entry[ 1 ], _entry[ 2 ], _entry[ 3 ] ) )
+                self.__connection.execute( 'DELETE FROM Responses WHERE Key NOT IN '
+                                           '( SELECT Key FROM Responses '
+                                           'ORDER BY Accessed DESC LIMIT ? );', ( self.size, ) )
+                self.__connection.commit( )
+
+
+    def clear( self ) -> None:
+        '''
+
+            Purpose: removes every entry and resets the counters.
+
+        '''
+        with self.__lock:
+            self.__entries.clear( )
+            if self.__connection is not None:
+                self.__connection.execute( 'DELETE FROM Responses;' )
+                self.__connection.commit( )
+            self.hits = self.misses = self.evictions = self.saved_tokens = 0
+            self.saved_seconds = 0.0
+
+
+    def get_stats( self, price: float = 0.0 ) -> dict:
+        '''
+
+            Purpose: summarizes the cache counters.
+
+            Parameters: price: float in dollars per million tokens
+
+            Returns: dict of hits, misses, hit_rate, evictions, saved_seconds,
+            saved_tokens and saved_dollars
+
+        '''
+        _total = self.hits + self.misses
+        return { 'hits': self.hits,
+                 'misses': self.misses,
+                 'hit_rate': self.hits / _total if _total else 0.0,
+                 'evictions': self.evictions,
+                 'entries': len( self.__entries ),
+                 'saved_seconds': self.saved_seconds,
+                 'saved_tokens': self.saved_tokens,
+                 'saved_dollars': self.saved_tokens * price / 1_000_000 }
+
+
+    def __insert( self, key: str, entry: tuple ) -> None:
+        self.__entries[ key ] = entry
+        self.__entries.move_to_end( key )
+        while len( self.__entries ) > self.size:
+            self.__entries.popitem( last = False )
+            self.evictions += 1
+
+
+    def __remove( self, key: str ) -> None:
+        self.__entries.pop( key, None )
+        if self.__connection is not None:
+            self.__connection.execute( 'DELETE FROM Responses WHERE Key = ?;', ( key, ) )
+            self.__connection.commit( )
@@ -8,3 +8,32 @@ MODELS = ["gpt-4o-mini", "gpt-4o", "gpt-4-turbo", "gpt-3.5-turbo"]
 DEFAULT_MODEL = MODELS[0]
 
 DEFAULT_POSITION = "Python Developer"
+
+RESPONSE_CACHE_SIZE = 512
+RESPONSE_CACHE_TTL = 7 * 24 * 60 * 60
+RESPONSE_CACHE_PATH = None
+
+QUICK_ANSWER_TIMEOUT = 20
+FULL_ANSWER_TIMEOUT = 60
+
+STREAMING_TRANSCRIPTION = True
+TRANSCRIPTION_WORKERS = 3
+TRANSCRIPTION_TIMEOUT = 60
+CHUNK_SECONDS = 15
+MIN_CHUNK_SECONDS = 5
+CHUNK_OVERLAP_SECONDS = 1
+SILENCE_THRESHOLD = 0.01
+
+AUDIO_BUFFER_SECONDS = 30  # initial capacity; the buffer grows as the recording continues
+AUDIO_BUFFER_PATH = None
+
+AUDIO_IN_MEMORY = True
+AUDIO_CODEC = "FLAC"  # "WAV", "FLAC" or "OPUS"
+
+VAD_TRIM = True
+VAD_FRAME_SECONDS = 0.03
+VAD_MIN_SILENCE_SECONDS = 0.6
+VAD_PADDING_SECONDS = 0.2
+
+AUDIO_DEVICE = "BlackHole"  # device ID, part of its name, or None for the default
+AUDIO_DEVICE_POLL_SECONDS = None  # seconds between device rescans, or None to rescan on demand
@@ -42,12 +42,28 @@
   ******************************************************************************************
   '''
 import sqlite3 as sqlite
-from pandas import DataFrame
+import numpy as np
+from pandas import DataFrame, concat
 from pandas import read_sql as sqlreader
+from pandas import read_csv as csvreader
 import pyodbc as db
 import os
+import json
+import queue
+import threading
+import time
+import zlib
+from bisect import bisect_left
+from itertools import islice
+from contextlib import contextmanager
+from typing import Iterator
 from Static import Source, Provider, SQL, ParamStyle
-from Booger import Error, ErrorDialog
+from Booger import Error, ErrorDialog, ComboBoxDialog, ListBoxDialog, LoadingPanel, QueryExecutor
+
+try:
+	import pyarrow as pa
+except ImportError:
+	pa = None
 
 class Pascal( ):
 	'''
@@ -180,16 +196,148 @@ class SqlPath( ):
 	def __init__( self ):
 		self.sqlite_driver = 'sqlite3'
 		self.sqlite_path = r'../db/sqlite/Boo.db'
+		self.sqlite_database = r'db\sqlite\datamodels\sql'
 		self.access_driver = r'DRIVER={ Microsoft Access Driver (*.mdb, *.accdb) };DBQ='
 		self.access_path = os.getcwd( ) + r'\db\access\Boo.accdb'
+		self.access_database = r'db\access\datamodels\sql'
+		self.sqlserver_database = r'db\mssql\datamodels\sql'
 
 
 	def __dir__( self ) -> list[ str ]:
 		'''
 		Retunes a list[ str ] of member names.
 		'''
-		return [ 'sqlite_driver', 'sqlite_database',
-		         'access_driver', 'access_path' ]
+		return [ 'sqlite_driver', 'sqlite_path', 'sqlite_database',
+		         'access_driver', 'access_path', 'access_database',
+		         'sqlserver_database' ]
+
+
+	def get_database( self, provider: Provider ) -> str:
+		'''
+
+			Returns: the command folder of 'provider', relative to the working
+			directory, with separators native to the platform
+
+		'''
+		if provider == Provider.Access:
+			_folder = self.access_database
+		elif provider == Provider.SqlServer:
+			_folder = self.sqlserver_database
+		else:
+			_folder = self.sqlite_database
+		return os.path.join( *_folder.split( '\\' ) )
+
+
+class CommandRegistry( ):
+	'''
+
+		Constructor:
+			None; the registry is process-wide and used through its class methods.
+
+		Purpose:
+			Class indexing every <command>\\<Source>.sql file under the provider
+			command folders once and caching its text keyed by
+			( Provider, SQL, Source ). Lookups cost no file system calls; a
+			cached entry is re-stat'ed at most every 'reload_interval' seconds
+			and re-read when its modification time changed, and a miss rescans
+			the folders at most that often.
+
+	'''
+
+	reload_interval = 2.0
+	__lock = threading.Lock( )
+	__commands = { }
+	__root = None
+	__scanned = 0.0
+
+
+	@classmethod
+	def index( cls, root: str=None ) -> int:
+		'''
+
+			Purpose: scans the command folders of every provider under 'root'
+			(the working directory by default) and caches each file's text.
+
+			Parameters: root: str
+
+			Returns: int: the number of commands indexed
+
+		'''
+		_sqlpath = SqlPath( )
+		_sources = { s.name: s for s in Source }
+		_commands = { c.name: c for c in SQL }
+		_found = { }
+		_root = root or cls.__root or os.getcwd( )
+		for _provider in ( Provider.SQLite, Provider.Access, Provider.SqlServer ):
+			_folder = os.path.join( _root, _sqlpath.get_database( _provider ) )
+			if not os.path.isdir( _folder ):
+				continue
+			for _command in os.scandir( _folder ):
+				if not _command.is_dir( ) or _command.name.upper( ) not in _commands:
+					continue
+				for _file in os.scandir( _command.path ):
+					_name, _ext = os.path.splitext( _file.name )
+					if _ext.lower( ) == '.sql' and _name in _sources:
+						_key = ( _provider, _commands[ _command.name.upper( ) ], _sources[ _name ] )
+						_found[ _key ] = _file.path
+		with cls.__lock:
+			_cached = cls.__commands
+			cls.__commands = { }
+			for _key, _path in _found.items( ):
+				_entry = _cached.get( _key )
+				cls.__commands[ _key ] = _entry if _entry and _entry[ 0 ] == _path \
+					else cls.__read( _path )
+			cls.__root = _root
+			cls.__scanned = time.monotonic( )
+			return len( cls.__commands )
+
+
+	@classmethod
+	def get_text( cls, src: Source, pro: Provider=Provider.SQLite,
+	              cmd: SQL=SQL.SELECTALL ) -> str:
+		'''
+
+			Returns: the cached text of the command file for ( pro, cmd, src ),
+			or None when no such file exists
+
+		'''
+		_key = ( pro, cmd, src )
+		_now = time.monotonic( )
+		if cls.__root is None or ( _key not in cls.__commands
+		                           and _now - cls.__scanned >= cls.reload_interval ):
+			cls.index( )
+		with cls.__lock:
+			_entry = cls.__commands.get( _key )
+			if _entry is None:
+				return None
+			if _now - _entry[ 3 ] >= cls.reload_interval:
+				_entry[ 3 ] = _now
+				try:
+					if os.stat( _entry[ 0 ] ).st_mtime_ns != _entry[ 1 ]:
+						_entry = cls.__commands[ _key ] = cls.__read( _entry[ 0 ] )
+				except OSError:
+					del cls.__commands[ _key ]
+					return None
+			return _entry[ 2 ]
+
+
+	@classmethod
+	def clear( cls ) -> None:
+		'''
+
+			Purpose: empties the registry so the next lookup rescans.
+
+		'''
+		with cls.__lock:
+			cls.__commands = { }
+			cls.__root = None
+
+
+	@staticmethod
+	def __read( path: str ) -> list:
+		with open( path, 'r', encoding='utf-8' ) as _file:
+			_text = _file.read( )
+		return [ path, os.stat( path ).st_mtime_ns, _text, time.monotonic( ) ]
 
 
 class SqlFile( ):
@@ -258,7 +406,7 @@ class SqlFile( ):
 			if _provider == 'SQLite' and _tablename in _data:
 				_filepath = f'{_sqlpath.sqlite_database}\\{_command}\\{_tablename}.sql'
 				return os.path.join( _current, _filepath )
-			elif _provider == 'ACCDB' and _tablename in _data:
+			elif _provider == 'Access' and _tablename in _data:
 				_filepath = f'{_sqlpath.access_database}\\{_command}\\{_tablename}.sql'
 				return os.path.join( _current, _filepath )
 			elif _provider == 'SqlServer' and _tablename in _data:
@@ -298,7 +446,7 @@ class SqlFile( ):
 			if _provider == 'SQLite' and _source in _data:
 				_folder = f'{_sqlpath.sqlite_database}\\{_command}'
 				return os.path.join( _current, _folder )
-			elif _provider == 'ACCDB' and _source in _data:
+			elif _provider == 'Access' and _source in _data:
 				_folder = f'{_sqlpath.access_database}\\{_command}'
 				return os.path.join( _current, _folder )
 			elif _provider == 'SqlServer' and _source in _data:
@@ -319,35 +467,27 @@ class SqlFile( ):
 	def get_command_text( self ) -> str:
 		'''
 			
-			Purpose:
+			Purpose: Returns the text of the command file for this source,
+			provider and command type from the CommandRegistry cache.
 	
-			Parameters:
+			Parameters: None
 	
-			Returns:
+			Returns: str
 			
 		'''
 
 		try:
-			_source = self.source.name
-			_paths = self.get_file_path( )
-			_folder = self.get_folder_path( )
-			_sql = ''
-			for name in os.listdir( _folder ):
-				if name.endswith( '.sql' ) \
-						and os.path.splitext( name )[ 0 ] == self.source.name:
-					_path = os.path.join( _folder, name )
-					_query = open( _path )
-					_sql = _query.read( )
-				if _sql is None:
-					_msg = 'INVALID INPUT!'
-					raise ValueError( _msg )
-				else:
-					return _sql
+			_sql = CommandRegistry.get_text( self.source, self.provider, self.command_type )
+			if _sql is None:
+				_msg = 'INVALID INPUT!'
+				raise ValueError( _msg )
+			else:
+				return _sql
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'Data'
 			exception.cause = 'SqlFile'
-			exception.method = 'get_command_text( self, other )'
+			exception.method = 'get_command_text( self )'
 			error = ErrorDialog( exception )
 			error.show( )
 
@@ -480,7 +620,7 @@ class DbConfig( ):
 					+ f'AttachDBFileName={self.source.name}' \
 					+ f'DATABASE={_path}Trusted_Connection=yes;'
 			else:
-				return f'{_path} '
+				return _path
 		except Exception as e:
 			exception = Error( e )
 			exception.cause = 'DbConfig Class'
@@ -502,12 +642,10 @@ class Connection( DbConfig ):
 
 	def __init__( self, src: Source, pro: Provider=Provider.SQLite ):
 		super( ).__init__( src, pro )
-		self.source = super( ).source
-		self.provider = super( ).provider
-		self.data_path = super( ).get_data_path( )
-		self.driver = super( ).get_driver_info( )
-		self.dsn = super( ).table_name + ';'
-		self.connection_string = super( ).get_connection_string( )
+		self.data_path = self.get_data_path( )
+		self.driver = self.get_driver_info( )
+		self.dsn = self.table_name + ';'
+		self.connection_string = self.get_connection_string( )
 
 
 	def __dir__( self ) -> list[ str ]:
@@ -519,7 +657,7 @@ class Connection( DbConfig ):
 		return [ 'source', 'provider', 'table_name', 'getdriver_info',
 		         'get_data_path', 'get_connection_string',
 		         'driver_info', 'data_path',
-		         'connection_string', 'connect' ]
+		         'connection_string', 'connect', 'checkout' ]
 
 
 	def connect( self ):
@@ -551,6 +689,209 @@ class Connection( DbConfig ):
 			error.show( )
 
 
+	def checkout( self ):
+		'''
+			Purpose:
+				Borrows a pooled connection for this source and provider,
+				returned to the pool when the 'with' block exits.
+	
+			Parameters:
+				self
+	
+			Returns:
+				context manager yielding a connection
+		'''
+		return ConnectionPool.checkout( self.source, self.provider )
+
+
+class ConnectionPool( ):
+	'''
+
+		Constructor:
+			None; the pool is process-wide and used through its class methods.
+
+		Purpose:
+			Class keeping up to 'max_size' open connections per ( Source, Provider )
+			so callers stop paying for a new connection on every query. Idle
+			connections are health-checked before reuse once they have sat for
+			'health_interval' seconds, and SQLite connections keep a prepared
+			statement cache of 'statement_cache' entries that stays warm across
+			checkouts.
+
+	'''
+
+	max_size = 4
+	timeout = 30.0
+	health_interval = 30.0
+	statement_cache = 256
+	__lock = threading.Condition( )
+	__idle = { }
+	__open = { }
+
+
+	@classmethod
+	def create( cls, src: Source, pro: Provider=Provider.SQLite ):
+		'''
+			Purpose:
+				Opens a new connection to the database holding 'src'.
+	
+			Parameters:
+				src: Source, pro: Provider
+	
+			Returns:
+				sqlite3.Connection or pyodbc.Connection
+		'''
+		_config = DbConfig( src, pro )
+		if pro == Provider.Access or pro == Provider.SqlServer:
+			return db.connect( _config.get_connection_string( ) )
+		else:
+			return sqlite.connect( _config.get_data_path( ), check_same_thread=False,
+				cached_statements=cls.statement_cache )
+
+
+	@staticmethod
+	def is_healthy( connection ) -> bool:
+		'''
+			Purpose:
+				Checks that 'connection' still answers a trivial query.
+	
+			Parameters:
+				connection
+	
+			Returns:
+				bool
+		'''
+		try:
+			_cursor = connection.cursor( )
+			_cursor.execute( 'SELECT 1;' )
+			_cursor.fetchall( )
+			_cursor.close( )
+			return True
+		except Exception:
+			return False
+
+
+	@classmethod
+	def acquire( cls, src: Source, pro: Provider=Provider.SQLite ):
+		'''
+			Purpose:
+				Takes an idle connection for ( src, pro ), opening one when the
+				pool is below 'max_size', otherwise waiting up to 'timeout'
+				seconds for one to be released.
+	
+			Parameters:
+				src: Source, pro: Provider
+	
+			Returns:
+				connection
+		'''
+		_key = ( src, pro )
+		_deadline = time.monotonic( ) + cls.timeout
+		with cls.__lock:
+			while True:
+				_idle = cls.__idle.setdefault( _key, [ ] )
+				while _idle:
+					_connection, _released = _idle.pop( )
+					if time.monotonic( ) - _released < cls.health_interval \
+							or cls.is_healthy( _connection ):
+						return _connection
+					cls.__discard( _key, _connection )
+				if cls.__open.get( _key, 0 ) < cls.max_size:
+					cls.__open[ _key ] = cls.__open.get( _key, 0 ) + 1
+					break
+				_remaining = _deadline - time.monotonic( )
+				if _remaining <= 0 or not cls.__lock.wait( _remaining ):
+					raise TimeoutError( f'No {pro.name} connection to {src.name} available.' )
+		try:
+			return cls.create( src, pro )
+		except Exception:
+			with cls.__lock:
+				cls.__open[ _key ] -= 1
+				cls.__lock.notify( )
+			raise
+
+
+	@classmethod
+	def release( cls, src: Source, pro: Provider, connection, broken: bool=False ) -> None:
+		'''
+			Purpose:
+				Returns 'connection' to the pool after rolling back any open
+				transaction, or closes it when 'broken' is set.
+	
+			Parameters:
+				src: Source, pro: Provider, connection, broken: bool
+	
+			Returns:
+				None
+		'''
+		_key = ( src, pro )
+		if not broken:
+			try:
+				connection.rollback( )
+			except Exception:
+				broken = True
+		with cls.__lock:
+			if broken:
+				cls.__discard( _key, connection )
+			else:
+				cls.__idle.setdefault( _key, [ ] ).append( ( connection, time.monotonic( ) ) )
+			cls.__lock.notify( )
+
+
+	@classmethod
+	@contextmanager
+	def checkout( cls, src: Source, pro: Provider=Provider.SQLite ):
+		'''
+			Purpose:
+				Context manager lending a pooled connection for ( src, pro ).
+				The connection is returned on exit; it is discarded instead if
+				the block raised a database error.
+	
+			Parameters:
+				src: Source, pro: Provider
+	
+			Returns:
+				connection
+		'''
+		_connection = cls.acquire( src, pro )
+		_broken = False
+		try:
+			yield _connection
+		except ( sqlite.DatabaseError, db.Error ):
+			_broken = not cls.is_healthy( _connection )
+			raise
+		finally:
+			cls.release( src, pro, _connection, _broken )
+
+
+	@classmethod
+	def close( cls ) -> None:
+		'''
+			Purpose:
+				Closes every idle connection and empties the pool.
+	
+			Parameters:
+				None
+	
+			Returns:
+				None
+		'''
+		with cls.__lock:
+			for _key, _idle in cls.__idle.items( ):
+				for _connection, _ in _idle:
+					cls.__discard( _key, _connection )
+			cls.__idle.clear( )
+
+
+	@classmethod
+	def __discard( cls, key: tuple, connection ) -> None:
+		cls.__open[ key ] = max( 0, cls.__open.get( key, 0 ) - 1 )
+		try:
+			connection.close( )
+		except Exception:
+			pass
+
+
 class SqlConfig( ):
 	'''
 
@@ -736,90 +1077,1353 @@ class SqlConfig( ):
 			error.show( )
 
 
-class DataGenerator( ):
+class SqlBuilder( ):
 	'''
-	
+
 		Constructor:
-	
-			DataGenerator( source: Source )
-	
+
+			SqlBuilder( source: Source, provider: Provider=Provider.SQLite,
+						paramstyle: ParamStyle=ParamStyle.qmark )
+
 		Purpose:
-	
-			Class containing factory method for providing
-			pandas dataframes.
+
+			Class building parameterized statements against a Source table.
+			Values never enter the statement text: each method returns an
+			( sql, params ) tuple whose placeholders follow 'paramstyle', so
+			one statement shape is prepared once and executed with many values.
+			Named WHERE placeholders carry 'key_prefix' so a column that is both
+			set and matched binds two distinct parameters.
 
 	'''
 
+	key_prefix = 'w_'
 
-	def __init__( self, src: Source ):
+	def __init__( self, src: Source, pro: Provider=Provider.SQLite,
+	              paramstyle: ParamStyle=ParamStyle.qmark ):
 		self.source = src
+		self.provider = pro
 		self.table_name = src.name
-		self.data_path = DbConfig( src ).get_data_path( )
-		self.command_text = f'SELECT * FROM {src.name};'
+		self.parameter_style = paramstyle if paramstyle is not None else ParamStyle.qmark
 
 
 	def __dir__( self ) -> list[ str ]:
 		'''
-			Returns a list[ str ] of member names
+
+		Returns a list[ str ] of member names.
+
+		'''
+		return [ 'source', 'provider', 'table_name', 'parameter_style',
+		         'key_prefix', 'get_placeholder', 'get_params', 'create_select', 'create_insert',
+		         'create_update', 'create_delete', 'select', 'insert', 'update',
+		         'delete', 'execute_many' ]
+
+
+	def get_placeholder( self, name: str, index: int ) -> str:
 		'''
-		return [ 'source', 'data_path', 'table_name',
-		         'command_text', 'create_frame', 'create_tuples' ]
+		Purpose:
+			Returns the placeholder for column 'name' at position 'index'.
 
+		Parameters:
+			name: str, index: int
 
-	def create_frame( self ) -> DataFrame:
+		Returns:
+			str
+		'''
+		if self.parameter_style == ParamStyle.number:
+			return f':{index + 1}'
+		elif self.parameter_style == ParamStyle.name:
+			return f':{name}'
+		elif self.parameter_style == ParamStyle.format:
+			return '%s'
+		elif self.parameter_style == ParamStyle.pyformat:
+			return f'%({name})s'
+		else:
+			return '?'
+
+
+	def get_params( self, names: list[ str ], values, keys: list[ str ]=None ):
 		'''
+		Purpose:
+			Binds 'values' to 'names' + 'keys' in the form the parameter style
+			expects: a dict for named styles, with the WHERE 'keys' under
+			'key_prefix', otherwise a tuple.
 
-			Purpose:
-	
-			Parameters:
-	
-			Returns:
+			>>> _builder = SqlBuilder( Source.Appropriations, paramstyle = ParamStyle.name )
+			>>> _builder.update( { 'Status': 'Closed' }, { 'Status': 'Open' } )
+			('UPDATE Appropriations SET Status = :Status WHERE Status = :w_Status;', \
+{'Status': 'Closed', 'w_Status': 'Open'})
+
+		Parameters:
+			names: list[ str ], values: sequence, keys: list[ str ]
+
+		Returns:
+			dict or tuple
+		'''
+		if self.parameter_style in ( ParamStyle.name, ParamStyle.pyformat ):
+			_names = list( names ) + [ self.key_prefix + k for k in keys or [ ] ]
+			return dict( zip( _names, values ) )
+		else:
+			return tuple( values )
+
+
+	def create_select( self, columns: list[ str ]=None, keys: list[ str ]=None ) -> str:
+		'''
+		Purpose:
+			Returns the SELECT statement projecting 'columns' (all when None)
+			filtered on equality with each of 'keys'.
+
+		Parameters:
+			columns: list[ str ], keys: list[ str ]
+
+		Returns:
+			str
+		'''
+		_columns = ', '.join( self.__check( columns ) ) if columns else '*'
+		return f'SELECT {_columns} FROM {self.table_name}' + self.__where( keys or [ ], 0 ) + ';'
+
+
+	def create_insert( self, names: list[ str ] ) -> str:
+		'''
+		Purpose:
+			Returns the INSERT statement for the columns in 'names'.
+
+		Parameters:
+			names: list[ str ]
+
+		Returns:
+			str
+		'''
+		_names = self.__check( names )
+		_marks = ', '.join( self.get_placeholder( n, i ) for i, n in enumerate( _names ) )
+		return f'INSERT INTO {self.table_name} ( {", ".join( _names )} ) VALUES ( {_marks} );'
+
+
+	def create_update( self, names: list[ str ], keys: list[ str ] ) -> str:
+		'''
+		Purpose:
+			Returns the UPDATE statement setting 'names' on the rows matching
+			'keys'. Parameters bind in the order names + keys.
+
+		Parameters:
+			names: list[ str ], keys: list[ str ]
+
+		Returns:
+			str
+		'''
+		_names = self.__check( names )
+		_pairs = ', '.join( f'{n} = {self.get_placeholder( n, i )}'
+		                    for i, n in enumerate( _names ) )
+		return f'UPDATE {self.table_name} SET {_pairs}' + self.__where( keys, len( _names ) ) + ';'
+
+
+	def create_delete( self, keys: list[ str ] ) -> str:
+		'''
+		Purpose:
+			Returns the DELETE statement for the rows matching 'keys'.
 
+		Parameters:
+			keys: list[ str ]
+
+		Returns:
+			str
+		'''
+		return f'DELETE FROM {self.table_name}' + self.__where( keys, 0 ) + ';'
+
+
+	def select( self, where: dict=None, columns: list[ str ]=None ) -> tuple:
 		'''
+		Purpose:
+			Builds a SELECT of 'columns' filtered on the column/value pairs in 'where'.
+
+		Parameters:
+			where: dict, columns: list[ str ]
 
+		Returns:
+			tuple( sql, params )
+		'''
 		try:
-			_connection = sqlite.connect( self.data_path )
-			_sql = f'SELECT * FROM {self.source.name};'
-			_frame = sqlreader( _sql, _connection )
-			if _frame is None:
-				_msg = "INVALID INPUT!"
-				raise ValueError( _msg )
-			else:
-				return _frame
+			_where = where or { }
+			_keys = list( _where.keys( ) )
+			return ( self.create_select( columns, _keys ),
+			         self.get_params( [ ], _where.values( ), _keys ) )
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'Data'
-			exception.cause = 'DataGenerator'
-			exception.method = 'create_frame( self )'
+			exception.cause = 'SqlBuilder'
+			exception.method = 'select( self, where: dict=None, columns: list[ str ]=None )'
 			error = ErrorDialog( exception )
 			error.show( )
 
 
-	def create_tuples( self ) -> list[ tuple ]:
+	def insert( self, values: dict ) -> tuple:
 		'''
-	
-			Purpose:
-	
-			Parameters:
-	
-			Returns:
+		Purpose:
+			Builds an INSERT of the column/value pairs in 'values'.
+
+		Parameters:
+			values: dict
+
+		Returns:
+			tuple( sql, params )
+		'''
+		try:
+			_names = list( values.keys( ) )
+			return ( self.create_insert( _names ), self.get_params( _names, values.values( ) ) )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'SqlBuilder'
+			exception.method = 'insert( self, values: dict )'
+			error = ErrorDialog( exception )
+			error.show( )
+
 
+	def update( self, values: dict, where: dict ) -> tuple:
 		'''
+		Purpose:
+			Builds an UPDATE setting 'values' on the rows matching 'where'.
+
+		Parameters:
+			values: dict, where: dict
 
+		Returns:
+			tuple( sql, params )
+		'''
 		try:
-			_connection = sqlite.connect( self.data_path )
-			_sql = f'SELECT * FROM {self.source.name};'
-			_frame = sqlreader( _sql, _connection )
-			_data = [ tuple( i ) for i in _frame.iterrows( ) ]
-			if _data is None:
-				_msg = "INVALID INPUT!"
+			if not where:
+				_msg = 'UPDATE requires at least one key column!'
 				raise ValueError( _msg )
-			else:
-				return _data
+			_names = list( values.keys( ) )
+			_keys = list( where.keys( ) )
+			_params = self.get_params( _names,
+				list( values.values( ) ) + list( where.values( ) ), _keys )
+			return ( self.create_update( _names, _keys ), _params )
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'Data'
-			exception.cause = 'DataGenerator'
-			exception.method = 'create_tuples( self )'
+			exception.cause = 'SqlBuilder'
+			exception.method = 'update( self, values: dict, where: dict )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+	def delete( self, where: dict ) -> tuple:
+		'''
+		Purpose:
+			Builds a DELETE of the rows matching 'where'.
+
+		Parameters:
+			where: dict
+
+		Returns:
+			tuple( sql, params )
+		'''
+		try:
+			if not where:
+				_msg = 'DELETE requires at least one key column!'
+				raise ValueError( _msg )
+			_keys = list( where.keys( ) )
+			return ( self.create_delete( _keys ), self.get_params( [ ], where.values( ), _keys ) )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'SqlBuilder'
+			exception.method = 'delete( self, where: dict )'
 			error = ErrorDialog( exception )
 			error.show( )
+
+
+	def execute_many( self, sql: str, names: list[ str ], rows, keys: list[ str ]=None ) -> int:
+		'''
+		Purpose:
+			Executes one INSERT or UPDATE shape built by create_insert or
+			create_update for every row in 'rows' inside a single transaction
+			on a pooled connection. Each row is a sequence of values in the
+			order of 'names' (names + keys for updates).
+
+		Parameters:
+			sql: str, names: list[ str ], rows: iterable of sequences,
+			keys: list[ str ]
+
+		Returns:
+			int: the number of rows affected
+		'''
+		try:
+			with ConnectionPool.checkout( self.source, self.provider ) as _connection:
+				_cursor = _connection.cursor( )
+				if hasattr( _cursor, 'fast_executemany' ):
+					_cursor.fast_executemany = True
+				_cursor.executemany( sql, ( self.get_params( names, r, keys ) for r in rows ) )
+				_count = _cursor.rowcount
+				_connection.commit( )
+				_cursor.close( )
+				return _count
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'SqlBuilder'
+			exception.method = 'execute_many( self, sql: str, names: list[ str ], rows, keys )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+	def __check( self, names: list[ str ] ) -> list[ str ]:
+		for _name in names:
+			if not str( _name ).isidentifier( ):
+				raise ValueError( f'INVALID COLUMN NAME: {_name}' )
+		return list( names )
+
+
+	def __where( self, keys: list[ str ], offset: int ) -> str:
+		if not keys:
+			return ''
+		_pairs = ' AND '.join( f'{k} = {self.get_placeholder( self.key_prefix + k, offset + i )}'
+		                       for i, k in enumerate( self.__check( keys ) ) )
+		return f' WHERE {_pairs}'
+
+
+class SnapshotCache( ):
+	'''
+
+		Constructor:
+			None; the cache is process-wide and used through its class methods.
+
+		Purpose:
+			Class keeping a columnar Arrow IPC snapshot of each SQLite table in
+			'folder' ( db/snapshots under the working directory when None ).
+			Snapshots are memory-mapped on load and reused while the stamp
+			stored in their schema metadata still matches the database: the
+			modification time and size of the database file and its -wal
+			file, plus the table's row count when 'count_rows' is set. Other
+			providers expose no reliable change marker, so their tables are
+			always read from the database.
+
+	'''
+
+	folder = None
+	count_rows = False
+	__lock = threading.Lock( )
+
+
+	@classmethod
+	def get_folder( cls ) -> str:
+		'''
+
+			Returns: the snapshot folder, resolved when first needed
+
+		'''
+		if cls.folder is None:
+			return os.path.join( os.getcwd( ), 'db', 'snapshots' )
+		return cls.folder
+
+
+	@classmethod
+	def get_path( cls, src: Source, pro: Provider=Provider.SQLite ) -> str:
+		'''
+
+			Returns: the path of the snapshot file for ( src, pro )
+
+		'''
+		return os.path.join( cls.get_folder( ), f'{pro.name}.{src.name}.arrow' )
+
+
+	@classmethod
+	def get_stamp( cls, src: Source, pro: Provider=Provider.SQLite ) -> dict:
+		'''
+
+			Returns: the dict describing the current state of the table, compared
+			against the stamp stored in the snapshot, or None when 'pro' has no
+			reliable change marker
+
+		'''
+		if pro != Provider.SQLite:
+			return None
+		_path = DbConfig( src, pro ).get_data_path( )
+		_stamp = { }
+		for _file in ( _path, _path + '-wal' ):
+			if os.path.exists( _file ):
+				_stat = os.stat( _file )
+				_stamp[ _file ] = [ _stat.st_mtime_ns, _stat.st_size ]
+		if cls.count_rows:
+			with ConnectionPool.checkout( src, pro ) as _connection:
+				_cursor = _connection.cursor( )
+				_cursor.execute( f'SELECT COUNT(*) FROM {src.name};' )
+				_stamp[ 'rows' ] = _cursor.fetchone( )[ 0 ]
+				_cursor.close( )
+		return _stamp
+
+
+	@classmethod
+	def read( cls, src: Source, pro: Provider=Provider.SQLite, stamp: dict=None ):
+		'''
+
+			Purpose: memory-maps the snapshot of ( src, pro ) when it exists and
+			its stamp equals 'stamp'.
+
+			Parameters: src: Source, pro: Provider, stamp: dict
+
+			Returns: pyarrow.Table or None
+
+		'''
+		_path = cls.get_path( src, pro )
+		if not os.path.exists( _path ):
+			return None
+		try:
+			_reader = pa.ipc.open_file( pa.memory_map( _path, 'r' ) )
+			_metadata = _reader.schema.metadata or { }
+			if json.loads( _metadata.get( b'stamp', b'null' ) ) != stamp:
+				return None
+			return _reader.read_all( )
+		except ( pa.ArrowException, OSError, ValueError ):
+			return None
+
+
+	@classmethod
+	def write( cls, src: Source, pro: Provider, frame: DataFrame, stamp: dict ) -> None:
+		'''
+
+			Purpose: writes 'frame' as the snapshot of ( src, pro ) tagged with
+			'stamp', replacing the previous snapshot atomically.
+
+			Parameters: src: Source, pro: Provider, frame: DataFrame, stamp: dict
+
+			Returns: None
+
+		'''
+		_path = cls.get_path( src, pro )
+		_table = pa.Table.from_pandas( frame, preserve_index=False )
+		_table = _table.replace_schema_metadata( { 'stamp': json.dumps( stamp ) } )
+		with cls.__lock:
+			os.makedirs( cls.get_folder( ), exist_ok=True )
+			_temp = f'{_path}.{os.getpid( )}.{threading.get_ident( )}.tmp'
+			with pa.OSFile( _temp, 'wb' ) as _sink:
+				with pa.ipc.new_file( _sink, _table.schema ) as _writer:
+					_writer.write_table( _table )
+			try:
+				os.replace( _temp, _path )
+			except OSError:
+				# A snapshot still mapped by another reader cannot be replaced on
+				# Windows; keep serving from the database until it is released.
+				os.remove( _temp )
+
+
+	@classmethod
+	def load( cls, src: Source, pro: Provider=Provider.SQLite,
+	          columns: list[ str ]=None ) -> DataFrame:
+		'''
+
+			Purpose: returns the table, or only 'columns', from its snapshot when
+			it is current, otherwise reads the database and refreshes the
+			snapshot. Reads the database directly when pyarrow is not installed
+			or the provider has no stamp.
+
+			Parameters: src: Source, pro: Provider, columns: list[ str ]
+
+			Returns: DataFrame
+
+		'''
+		try:
+			_stamp = cls.get_stamp( src, pro ) if pa is not None else None
+			if _stamp is None:
+				return DataGenerator( src, pro ).create_frame( columns )
+			_table = cls.read( src, pro, _stamp )
+			if _table is None:
+				_frame = DataGenerator( src, pro ).create_frame( )
+				if _frame is None:
+					return None
+				cls.write( src, pro, _frame, _stamp )
+				return _frame[ columns ] if columns else _frame
+			if columns:
+				_table = _table.select( columns )
+			return _table.to_pandas( )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'SnapshotCache'
+			exception.method = 'load( cls, src: Source, pro: Provider, columns: list[ str ]=None )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+	@classmethod
+	def invalidate( cls, src: Source=None, pro: Provider=Provider.SQLite ) -> None:
+		'''
+
+			Purpose: deletes the snapshot of ( src, pro ), or every snapshot when
+			'src' is None.
+
+			Parameters: src: Source, pro: Provider
+
+			Returns: None
+
+		'''
+		with cls.__lock:
+			_folder = cls.get_folder( )
+			if src is not None:
+				_paths = [ cls.get_path( src, pro ) ]
+			elif os.path.isdir( _folder ):
+				_paths = [ os.path.join( _folder, f ) for f in os.listdir( _folder )
+				           if f.endswith( '.arrow' ) ]
+			else:
+				_paths = [ ]
+			for _path in _paths:
+				if os.path.exists( _path ):
+					os.remove( _path )
+
+
+class DataGenerator( ):
+	'''
+	
+		Constructor:
+	
+			DataGenerator( source: Source, provider: Provider=Provider.SQLite )
+	
+		Purpose:
+	
+			Class containing factory method for providing
+			pandas dataframes. The streaming methods create_chunks and
+			iter_tuples keep memory bounded by 'chunk_size' rows regardless
+			of table size.
+
+	'''
+
+	chunk_size = 50000
+
+
+	def __init__( self, src: Source, pro: Provider=Provider.SQLite ):
+		self.source = src
+		self.provider = pro
+		self.table_name = src.name
+		self.data_path = DbConfig( src, pro ).get_data_path( )
+		self.command_text = f'SELECT * FROM {src.name};'
+
+
+	def __dir__( self ) -> list[ str ]:
+		'''
+			Returns a list[ str ] of member names
+		'''
+		return [ 'source', 'provider', 'data_path', 'table_name', 'chunk_size',
+		         'command_text', 'get_command_text', 'create_frame', 'create_tuples',
+		         'create_records', 'create_batches', 'create_chunks', 'iter_tuples',
+		         'load_frame', 'create_executor', 'load_progress' ]
+
+
+	def get_command_text( self, columns: list[ str ]=None ) -> str:
+		'''
+
+			Purpose: Returns the SELECT statement projecting 'columns', or
+			every column when None.
+
+			Parameters: columns: list[ str ]
+
+			Returns: str
+
+		'''
+		if not columns:
+			return self.command_text
+		return SqlBuilder( self.source, self.provider ).create_select( columns )
+
+
+	def create_frame( self, columns: list[ str ]=None ) -> DataFrame:
+		'''
+
+			Purpose: Reads the table, or only 'columns', into one DataFrame.
+	
+			Parameters: columns: list[ str ]
+	
+			Returns: DataFrame
+
+		'''
+
+		try:
+			_sql = self.get_command_text( columns )
+			with ConnectionPool.checkout( self.source, self.provider ) as _connection:
+				_frame = sqlreader( _sql, _connection )
+			if _frame is None:
+				_msg = "INVALID INPUT!"
+				raise ValueError( _msg )
+			else:
+				return _frame
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'DataGenerator'
+			exception.method = 'create_frame( self, columns: list[ str ]=None )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+	def load_frame( self, columns: list[ str ]=None ) -> DataFrame:
+		'''
+
+			Purpose: Returns the table, or only 'columns', from its local
+			Arrow snapshot, re-reading the database only when it changed.
+
+			Parameters: columns: list[ str ]
+
+			Returns: DataFrame
+
+		'''
+		return SnapshotCache.load( self.source, self.provider, columns )
+
+
+	def create_chunks( self, size: int=None, columns: list[ str ]=None ) -> Iterator[ DataFrame ]:
+		'''
+
+			Purpose: Yields the table, or only 'columns', as DataFrames of at
+			most 'size' rows. A pooled connection is held until the generator
+			is exhausted or closed.
+
+			Parameters: size: int, columns: list[ str ]
+
+			Returns: Iterator[ DataFrame ]
+
+		'''
+
+		try:
+			yield from self.__read_chunks( size, columns )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'DataGenerator'
+			exception.method = 'create_chunks( self, size: int=None, columns: list[ str ]=None )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+	def create_executor( self, size: int=None, columns: list[ str ]=None ) -> QueryExecutor:
+		'''
+
+			Purpose: Returns a QueryExecutor that reads the table, or only
+			'columns', in DataFrames of at most 'size' rows on a worker thread.
+			The table's row count is queried on the worker too, before the
+			first chunk, and becomes the executor's total. Errors are posted to
+			the executor's window instead of opening a dialog on the worker.
+
+			Parameters: size: int, columns: list[ str ]
+
+			Returns: QueryExecutor
+
+		'''
+		return QueryExecutor( lambda: self.__read_chunks( size, columns ), total=self.__count,
+			frames=True )
+
+
+	def load_progress( self, columns: list[ str ]=None ) -> DataFrame:
+		'''
+
+			Purpose: Reads the table, or only 'columns', on a QueryExecutor
+			while a LoadingPanel shows the rows read, so the window thread
+			stays responsive.
+
+			Parameters: columns: list[ str ]
+
+			Returns: DataFrame, or None when the load was cancelled or failed
+
+		'''
+		try:
+			_chunks = [ ]
+			_panel = LoadingPanel( )
+			if not _panel.show( self.create_executor( columns=columns ), _chunks.append ):
+				if _panel.error is not None:
+					raise _panel.error
+				return None
+			return concat( _chunks, ignore_index=True ) if _chunks else DataFrame( )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'DataGenerator'
+			exception.method = 'load_progress( self, columns: list[ str ]=None )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+	def __count( self ) -> int:
+		with ConnectionPool.checkout( self.source, self.provider ) as _connection:
+			_cursor = _connection.cursor( )
+			try:
+				_cursor.execute( f'SELECT COUNT(*) FROM {self.table_name};' )
+				return _cursor.fetchone( )[ 0 ]
+			finally:
+				_cursor.close( )
+
+
+	def __read_chunks( self, size: int, columns: list[ str ] ) -> Iterator[ DataFrame ]:
+		_sql = self.get_command_text( columns )
+		with ConnectionPool.checkout( self.source, self.provider ) as _connection:
+			yield from sqlreader( _sql, _connection, chunksize=size or self.chunk_size )
+
+
+	def iter_tuples( self, size: int=None, columns: list[ str ]=None ) -> Iterator[ tuple ]:
+		'''
+
+			Purpose: Yields the rows of the table, or of only 'columns', as
+			plain tuples straight from the cursor, fetching 'size' rows at a
+			time without building a DataFrame.
+
+			Parameters: size: int, columns: list[ str ]
+
+			Returns: Iterator[ tuple ]
+
+		'''
+
+		try:
+			_sql = self.get_command_text( columns )
+			with ConnectionPool.checkout( self.source, self.provider ) as _connection:
+				_cursor = _connection.cursor( )
+				try:
+					_cursor.execute( _sql )
+					_rows = _cursor.fetchmany( size or self.chunk_size )
+					while _rows:
+						for _row in _rows:
+							yield tuple( _row )
+						_rows = _cursor.fetchmany( size or self.chunk_size )
+				finally:
+					_cursor.close( )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'DataGenerator'
+			exception.method = 'iter_tuples( self, size: int=None, columns: list[ str ]=None )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+	def create_tuples( self, columns: list[ str ]=None ) -> list[ tuple ]:
+		'''
+	
+			Purpose: Returns the rows of the table, or of only 'columns', as
+			plain tuples fetched straight from the cursor.
+	
+			Parameters: columns: list[ str ]
+	
+			Returns: list[ tuple ]
+
+		'''
+
+		try:
+			_sql = self.get_command_text( columns )
+			with ConnectionPool.checkout( self.source, self.provider ) as _connection:
+				_cursor = _connection.cursor( )
+				_cursor.execute( _sql )
+				_data = _cursor.fetchall( )
+				_cursor.close( )
+			if _data and not isinstance( _data[ 0 ], tuple ):
+				_data = [ tuple( _row ) for _row in _data ]
+			if _data is None:
+				_msg = "INVALID INPUT!"
+				raise ValueError( _msg )
+			else:
+				return _data
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'DataGenerator'
+			exception.method = 'create_tuples( self, columns: list[ str ]=None )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+	def create_records( self, columns: list[ str ]=None ) -> np.recarray:
+		'''
+
+			Purpose: Returns the table, or only 'columns', as a NumPy record
+			array with one typed field per column.
+
+			Parameters: columns: list[ str ]
+
+			Returns: np.recarray
+
+		'''
+
+		try:
+			return self.create_frame( columns ).to_records( index=False )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'DataGenerator'
+			exception.method = 'create_records( self, columns: list[ str ]=None )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+	def create_batches( self, size: int=None, columns: list[ str ]=None ):
+		'''
+
+			Purpose: Yields the table, or only 'columns', as Arrow record
+			batches of at most 'size' rows. Requires pyarrow.
+
+			Parameters: size: int, columns: list[ str ]
+
+			Returns: Iterator[ pyarrow.RecordBatch ]
+
+		'''
+
+		try:
+			if pa is None:
+				_msg = 'create_batches requires pyarrow!'
+				raise ImportError( _msg )
+			for _chunk in self.create_chunks( size, columns ):
+				yield pa.RecordBatch.from_pandas( _chunk, preserve_index=False )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'DataGenerator'
+			exception.method = 'create_batches( self, size: int=None, columns: list[ str ]=None )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+class LookupIndex( ):
+	'''
+
+		Constructor:
+
+			LookupIndex( source: Source, code: str='Code', name: str='Name',
+						provider: Provider=Provider.SQLite )
+
+		Purpose:
+
+			Class holding an in-memory index of a code table for instant lookups.
+			A hash index resolves codes to names, and a sorted term index answers
+			case-insensitive prefix searches over the code and every word of the
+			name for type-ahead. The table is read on first use; afterwards,
+			at most every 'check_interval' seconds, one aggregate query compares
+			the row count and a checksum of the rows already loaded with the
+			values kept when they were read. On SQLite the checksum is a sum
+			of CRC-32s of the ( rowid, code, name ) rows computed in SQL, so
+			appended rows are fetched alone and merged in, and an update or
+			delete of a loaded row reloads the index. SQL Server sources are
+			compared with CHECKSUM_AGG and reload on any change; other providers
+			only have the row count, so an update that keeps the count is not
+			seen until reload( ) is called.
+
+	'''
+
+	check_interval = 5.0
+
+
+	def __init__( self, src: Source, code: str='Code', name: str='Name',
+	              pro: Provider=Provider.SQLite ):
+		self.source = src
+		self.provider = pro
+		self.code_column = code
+		self.name_column = name
+		self.codes = { }
+		self.__terms = [ ]
+		self.__rowid = 0
+		self.__count = 0
+		self.__checksum = 0
+		self.__stamp = None
+		self.__ready = False
+		self.__checked = 0.0
+		self.__lock = threading.RLock( )
+
+
+	def __len__( self ) -> int:
+		self.__ensure( )
+		return len( self.codes )
+
+
+	def __dir__( self ) -> list[ str ]:
+		'''
+
+		Returns a list[ str ] of member names.
+
+		'''
+		return [ 'source', 'provider', 'code_column', 'name_column', 'codes',
+		         'check_interval', 'get_name', 'get_item', 'search', 'refresh',
+		         'reload' ]
+
+
+	def get_name( self, code: str ) -> str:
+		'''
+
+			Returns: the name for 'code', or None when the code is unknown
+
+		'''
+		self.__ensure( )
+		return self.codes.get( str( code ) )
+
+
+	def get_item( self, code: str ) -> str:
+		'''
+
+			Returns: the display text 'code - name' shown in the dialogs
+
+		'''
+		return f'{code} - {self.codes.get( code, "" )}'
+
+
+	def search( self, prefix: str='', limit: int=None ) -> list[ str ]:
+		'''
+
+			Purpose: finds the codes whose code, or any word of whose name,
+			starts with 'prefix', ignoring case.
+
+			Parameters: prefix: str, limit: int
+
+			Returns: list[ str ] of 'code - name' items ordered by match
+
+		'''
+		self.__ensure( )
+		with self.__lock:
+			if not prefix or not prefix.strip( ):
+				_codes = list( self.codes )
+				return [ self.get_item( c ) for c in _codes[ :limit ] ]
+			_prefix = prefix.strip( ).lower( )
+			_found = { }
+			_index = bisect_left( self.__terms, ( _prefix, '' ) )
+			while _index < len( self.__terms ) and self.__terms[ _index ][ 0 ].startswith( _prefix ):
+				_found.setdefault( self.__terms[ _index ][ 1 ] )
+				if limit is not None and len( _found ) >= limit:
+					break
+				_index += 1
+			return [ self.get_item( c ) for c in _found ]
+
+
+	def refresh( self ) -> int:
+		'''
+
+			Purpose: brings the index up to date with the table.  The count
+			and checksum of the rows already loaded are compared in one
+			aggregate query; when they still match, only the rows after the
+			last loaded rowid are fetched and merged in, otherwise the index
+			is reloaded.
+
+			Parameters: None
+
+			Returns: int: the number of rows merged, or -1 after a full reload
+
+		'''
+		with self.__lock:
+			self.__checked = time.monotonic( )
+			if not self.__ready:
+				self.reload( )
+				return -1
+			if self.provider != Provider.SQLite:
+				if self.__get_state( ) != ( self.__count, self.__checksum ):
+					self.reload( )
+					return -1
+				return 0
+			_stamp = SnapshotCache.get_stamp( self.source, self.provider )
+			if _stamp == self.__stamp:
+				return 0
+			if self.__get_state( self.__rowid ) != ( self.__count, self.__checksum ):
+				self.reload( )
+				return -1
+			_rows = self.__fetch( self.__rowid )
+			self.__add( _rows )
+			self.__stamp = _stamp
+			return len( _rows )
+
+
+	def reload( self ) -> None:
+		'''
+
+			Purpose: rebuilds the index from the whole table.
+
+			Parameters: None
+
+			Returns: None
+
+		'''
+		with self.__lock:
+			self.__checked = time.monotonic( )
+			self.__stamp = SnapshotCache.get_stamp( self.source, self.provider )
+			self.codes = { }
+			self.__terms = [ ]
+			self.__rowid = 0
+			self.__count = 0
+			self.__checksum = 0
+			self.__add( self.__fetch( 0 ), sort=True )
+			if self.provider != Provider.SQLite:
+				self.__count, self.__checksum = self.__get_state( )
+			self.__ready = True
+
+
+	def __ensure( self ) -> None:
+		if not self.__ready:
+			self.reload( )
+		elif time.monotonic( ) - self.__checked >= self.check_interval:
+			self.refresh( )
+
+
+	def __get_state( self, upto: int=None ) -> tuple:
+		with ConnectionPool.checkout( self.source, self.provider ) as _connection:
+			_cursor = _connection.cursor( )
+			if self.provider == Provider.SQLite:
+				_connection.create_function( 'lookup_crc', 3, LookupIndex.__crc,
+					deterministic=True )
+				_cursor.execute( f'SELECT COUNT(*), COALESCE( SUM( lookup_crc( rowid, '
+				                 f'{self.code_column}, {self.name_column} ) ), 0 ) '
+				                 f'FROM {self.source.name} WHERE rowid <= ?;', ( upto, ) )
+			elif self.provider == Provider.SqlServer:
+				_cursor.execute( f'SELECT COUNT(*), COALESCE( CHECKSUM_AGG( CHECKSUM( '
+				                 f'{self.code_column}, {self.name_column} ) ), 0 ) '
+				                 f'FROM {self.source.name};' )
+			else:
+				_cursor.execute( f'SELECT COUNT(*), 0 FROM {self.source.name};' )
+			_state = tuple( _cursor.fetchone( ) )
+			_cursor.close( )
+			return _state
+
+
+	def __fetch( self, after: int ) -> list[ tuple ]:
+		with ConnectionPool.checkout( self.source, self.provider ) as _connection:
+			_cursor = _connection.cursor( )
+			if self.provider == Provider.SQLite:
+				_cursor.execute( f'SELECT rowid, {self.code_column}, {self.name_column} '
+				                 f'FROM {self.source.name} WHERE rowid > ? ORDER BY rowid;',
+					( after, ) )
+				_rows = _cursor.fetchall( )
+			else:
+				_cursor.execute( f'SELECT {self.code_column}, {self.name_column} '
+				                 f'FROM {self.source.name};' )
+				_rows = [ ( i + 1, r[ 0 ], r[ 1 ] ) for i, r in enumerate( _cursor.fetchall( ) ) ]
+			_cursor.close( )
+			return _rows
+
+
+	@staticmethod
+	def __crc( rowid: int, code, name ) -> int:
+		return zlib.crc32( repr( ( rowid, code, name ) ).encode( 'utf-8' ) )
+
+
+	def __add( self, rows: list[ tuple ], sort: bool=False ) -> None:
+		_terms = [ ]
+		for _rowid, _code, _name in rows:
+			if _code is None:
+				continue
+			_code = str( _code ).strip( )
+			_name = '' if _name is None else str( _name ).strip( )
+			self.codes[ _code ] = _name
+			_terms.append( ( _code.lower( ), _code ) )
+			_terms.extend( ( w.lower( ), _code ) for w in _name.split( ) )
+		if rows:
+			self.__count += len( rows )
+			self.__checksum += sum( LookupIndex.__crc( *r ) for r in rows )
+			self.__rowid = max( self.__rowid, rows[ -1 ][ 0 ] )
+		if sort:
+			_terms.extend( self.__terms )
+			_terms.sort( )
+			self.__terms = _terms
+		else:
+			for _term in _terms:
+				self.__terms.insert( bisect_left( self.__terms, _term ), _term )
+
+
+class LookupService( ):
+	'''
+
+		Constructor:
+			None; the service is process-wide and used through its class methods.
+
+		Purpose:
+			Class handing out one lazily loaded LookupIndex per code table, with
+			the code and description columns of each table registered in
+			'columns'.
+
+	'''
+
+	columns = { Source.TreasurySymbols: ( 'TreasuryAccount', 'Title' ),
+	            Source.MainAccounts: ( 'Code', 'Name' ),
+	            Source.BudgetObjectClasses: ( 'Code', 'Name' ),
+	            Source.ResourceLines: ( 'Number', 'Name' ) }
+	__lock = threading.Lock( )
+	__indexes = { }
+
+
+	@classmethod
+	def get_index( cls, src: Source, pro: Provider=Provider.SQLite ) -> LookupIndex:
+		'''
+
+			Returns: the shared LookupIndex for ( src, pro ), created on first use
+
+		'''
+		with cls.__lock:
+			if ( src, pro ) not in cls.__indexes:
+				_code, _name = cls.columns.get( src, ( 'Code', 'Name' ) )
+				cls.__indexes[ ( src, pro ) ] = LookupIndex( src, _code, _name, pro )
+			return cls.__indexes[ ( src, pro ) ]
+
+
+	@classmethod
+	def get_name( cls, src: Source, code: str, pro: Provider=Provider.SQLite ) -> str:
+		'''
+
+			Returns: the name for 'code' in the code table 'src'
+
+		'''
+		return cls.get_index( src, pro ).get_name( code )
+
+
+	@classmethod
+	def search( cls, src: Source, prefix: str='', limit: int=None,
+	            pro: Provider=Provider.SQLite ) -> list[ str ]:
+		'''
+
+			Returns: the 'code - name' items of 'src' matching 'prefix'
+
+		'''
+		return cls.get_index( src, pro ).search( prefix, limit )
+
+
+	@classmethod
+	def select( cls, src: Source, listbox: bool=False, limit: int=100,
+	            pro: Provider=Provider.SQLite ) -> str:
+		'''
+
+			Purpose: shows a ComboBoxDialog, or a ListBoxDialog when 'listbox'
+			is set, whose type-ahead searches the index of 'src'.
+
+			Parameters: src: Source, listbox: bool, limit: int, pro: Provider
+
+			Returns: str: the selected 'code - name' item, or None
+
+		'''
+		try:
+			_search = lambda prefix: cls.search( src, prefix, limit, pro )
+			_dialog = ListBoxDialog( search=_search ) if listbox \
+				else ComboBoxDialog( search=_search )
+			_dialog.show( )
+			return _dialog.selected_item
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'LookupService'
+			exception.method = 'select( cls, src: Source, listbox: bool, limit: int, pro: Provider )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+class BulkLoader( ):
+	'''
+
+		Constructor:
+
+			BulkLoader( source: Source, path: str, provider: Provider=Provider.SQLite )
+
+		Purpose:
+
+			Class streaming a CSV or XLSX file into a Source table. The input
+			is read 'chunk_size' rows at a time, optionally parsed ahead on a
+			background thread, and written with one executemany per chunk on a
+			single pooled connection. SQLite loads run with WAL journaling and
+			synchronous=NORMAL, restored to the connection's previous settings
+			when the load ends, and commit every 'commit_chunks' chunks together
+			with a checkpoint row in the BulkLoads table, so a failed load can
+			resume after the last committed row. The checkpoint records the
+			file's size and modification time and is discarded when they change.
+
+	'''
+
+	chunk_size = 50000
+	commit_chunks = 10
+
+
+	def __init__( self, src: Source, path: str, pro: Provider=Provider.SQLite ):
+		self.source = src
+		self.path = path
+		self.provider = pro
+		self.rows = 0
+		self.resumed = 0
+		self.seconds = 0.0
+
+
+	def __dir__( self ) -> list[ str ]:
+		'''
+
+		Returns a list[ str ] of member names.
+
+		'''
+		return [ 'source', 'path', 'provider', 'chunk_size', 'commit_chunks',
+		         'rows', 'resumed', 'seconds', 'load', 'get_checkpoint', 'get_stats' ]
+
+
+	def get_checkpoint( self ) -> int:
+		'''
+
+			Returns: the number of input rows already committed by an earlier,
+			unfinished load of this file, or 0
+
+		'''
+		if self.provider != Provider.SQLite:
+			return 0
+		with ConnectionPool.checkout( self.source, self.provider ) as _connection:
+			self.__create_checkpoints( _connection )
+			_key = ( self.source.name, os.path.abspath( self.path ) )
+			_row = _connection.execute( 'SELECT Rows, Size, Modified FROM BulkLoads '
+			                            'WHERE Source = ? AND Path = ?;', _key ).fetchone( )
+			if _row is None:
+				return 0
+			if tuple( _row[ 1: ] ) != self.__get_signature( ):
+				_connection.execute( 'DELETE FROM BulkLoads WHERE Source = ? AND Path = ?;', _key )
+				_connection.commit( )
+				return 0
+			return _row[ 0 ]
+
+
+	def get_stats( self ) -> dict:
+		'''
+
+			Returns: dict with the rows written by the last load, the rows it
+			resumed after, its seconds and rows per second
+
+		'''
+		return { 'rows': self.rows, 'resumed': self.resumed, 'seconds': self.seconds,
+		         'rows_per_second': self.rows / self.seconds if self.seconds else 0.0 }
+
+
+	def load( self, columns: list[ str ]=None, resume: bool=True, parallel: bool=False ) -> dict:
+		'''
+
+			Purpose: appends the rows of the input file to the table.
+
+			Parameters:
+				columns: list[ str ] - the input columns to load, named as the
+				table columns; all columns when None
+				resume: bool - skip the rows committed by an unfinished earlier load
+				parallel: bool - parse the next chunks on a background thread
+				while the current one is written
+
+			Returns: dict from get_stats( )
+
+		'''
+		try:
+			_start = time.perf_counter( )
+			self.resumed = self.get_checkpoint( ) if resume else 0
+			self.rows = 0
+			_chunks = self.__read( columns, self.resumed )
+			if parallel:
+				_chunks = self.__prefetch( _chunks )
+			with ConnectionPool.checkout( self.source, self.provider ) as _connection:
+				_sqlite = self.provider == Provider.SQLite
+				_pragmas = { }
+				try:
+					if _sqlite:
+						for _name, _value in ( ( 'journal_mode', 'WAL' ), ( 'synchronous', 'NORMAL' ),
+						                       ( 'temp_store', 'MEMORY' ) ):
+							_pragmas[ _name ] = _connection.execute( f'PRAGMA {_name};' ).fetchone( )[ 0 ]
+							_connection.execute( f'PRAGMA {_name}={_value};' )
+						self.__create_checkpoints( _connection )
+					_cursor = _connection.cursor( )
+					if hasattr( _cursor, 'fast_executemany' ):
+						_cursor.fast_executemany = True
+					_builder = SqlBuilder( self.source, self.provider )
+					_sql = None
+					_pending = 0
+					for _names, _rows in _chunks:
+						if _sql is None:
+							_sql = _builder.create_insert( _names )
+						_cursor.executemany( _sql, _rows )
+						self.rows += len( _rows )
+						_pending += 1
+						if _sqlite and _pending >= self.commit_chunks:
+							self.__save_checkpoint( _connection, self.resumed + self.rows )
+							_connection.commit( )
+							_pending = 0
+					if _sqlite:
+						_connection.execute( 'DELETE FROM BulkLoads WHERE Source = ? AND Path = ?;',
+							( self.source.name, os.path.abspath( self.path ) ) )
+					_connection.commit( )
+					_cursor.close( )
+				finally:
+					if _pragmas:
+						# Uncommitted rows are past the checkpoint; journal_mode
+						# cannot change inside a transaction.
+						_connection.rollback( )
+						for _name, _value in _pragmas.items( ):
+							_connection.execute( f'PRAGMA {_name}={_value};' )
+			self.seconds = time.perf_counter( ) - _start
+			return self.get_stats( )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'Data'
+			exception.cause = 'BulkLoader'
+			exception.method = 'load( self, columns: list[ str ]=None, resume: bool=True, ' \
+			                   'parallel: bool=False )'
+			error = ErrorDialog( exception )
+			error.show( )
+
+
+	def __read( self, columns: list[ str ], skip: int ):
+		_extension = os.path.splitext( self.path )[ 1 ].lower( )
+		if _extension in ( '.xlsx', '.xlsm' ):
+			from openpyxl import load_workbook
+			_workbook = load_workbook( self.path, read_only=True, data_only=True )
+			try:
+				_sheet = _workbook.worksheets[ 0 ]
+				_values = _sheet.iter_rows( values_only=True )
+				_header = [ str( h ) for h in next( _values ) ]
+				_names = columns or _header
+				_positions = [ _header.index( n ) for n in _names ]
+				_values = islice( _values, skip, None )
+				while True:
+					_block = list( islice( _values, self.chunk_size ) )
+					if not _block:
+						break
+					yield _names, [ tuple( r[ i ] for i in _positions ) for r in _block ]
+			finally:
+				_workbook.close( )
+		else:
+			_reader = csvreader( self.path, usecols=columns, chunksize=self.chunk_size,
+				skiprows=range( 1, skip + 1 ) if skip else None )
+			with _reader:
+				for _chunk in _reader:
+					if columns:
+						_chunk = _chunk[ columns ]
+					if self.provider != Provider.SQLite:
+						_chunk = _chunk.astype( object ).where( _chunk.notna( ), None )
+					yield list( _chunk.columns ), list( _chunk.itertuples( index=False, name=None ) )
+
+
+	def __prefetch( self, chunks, depth: int=2 ):
+		_queue = queue.Queue( maxsize=depth )
+		_done = object( )
+		_stop = threading.Event( )
+
+		def _produce( ):
+			try:
+				for _chunk in chunks:
+					while not _stop.is_set( ):
+						try:
+							_queue.put( _chunk, timeout=0.1 )
+							break
+						except queue.Full:
+							pass
+					if _stop.is_set( ):
+						return
+				_queue.put( _done )
+			except Exception as _error:
+				_queue.put( _error )
+
+		threading.Thread( target=_produce, daemon=True ).start( )
+		try:
+			while True:
+				_item = _queue.get( )
+				if _item is _done:
+					return
+				if isinstance( _item, Exception ):
+					raise _item
+				yield _item
+		finally:
+			_stop.set( )
+
+
+	def __get_signature( self ) -> tuple:
+		_stat = os.stat( self.path )
+		return ( _stat.st_size, _stat.st_mtime_ns )
+
+
+	def __create_checkpoints( self, connection ) -> None:
+		connection.execute( 'CREATE TABLE IF NOT EXISTS BulkLoads ( Source TEXT, Path TEXT, '
+		                    'Rows INTEGER, Size INTEGER, Modified INTEGER, Updated REAL, '
+		                    'PRIMARY KEY ( Source, Path ) );' )
+
+
+	def __save_checkpoint( self, connection, rows: int ) -> None:
+		connection.execute( 'INSERT OR REPLACE INTO BulkLoads ( Source, Path, Rows, Size, '
+		                    'Modified, Updated ) VALUES ( ?, ?, ?, ?, ?, ? );',
+			( self.source.name, os.path.abspath( self.path ), rows,
+			  *self.__get_signature( ), time.time( ) ) )
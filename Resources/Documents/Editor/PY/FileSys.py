@@ -44,7 +44,12 @@
 import os
 import zipfile as zp
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, Font, PatternFill, Alignment
 import shutil as sh
+import mmap
+import numpy as np
+from itertools import islice
 from Booger import Error, ErrorDialog
 
 class Path( ):
@@ -334,12 +339,11 @@ class File( Path ):
 	
 	def __init__( self, path: str ):
 		super( ).__init__( path )
-		self.input = super( ).input
 		self.absolute_path = os.path.abspath( path )
 		self.relative_path = os.path.relpath( path )
 		self.name = os.path.basename( path )
 		self.size = os.path.getsize( path )
-		self.extension = super( ).file_extension
+		self.extension = self.file_extension
 		self.created = os.path.getctime( path )
 		self.accessed = os.path.getatime( path )
 		self.modified = os.path.getmtime( path )
@@ -363,7 +367,8 @@ class File( Path ):
 		         'name', 'size', 'extension', 'created',
 		         'accessed', 'modified', 'rename', 'move',
 		         'create', 'delete', 'get_lines', 'readlines', 'readall',
-		         'iterlines', 'writelines', 'writeall' ]
+		         'iterlines', 'iterchunks', 'get_index', 'writelines', 'writeall',
+		         'append', 'copy' ]
 	
 	def rename( self, other: str ) -> str | None:
 		'''
@@ -483,9 +488,8 @@ class File( Path ):
 				_msg = "The 'path' is not a file!"
 				raise Exception( _msg )
 			else:
-				file = open( self.input )
-				for i in file.readlines( ):
-					_lines.append( i )
+				with open( self.input ) as _file:
+					_lines.extend( _file )
 				return _lines
 		except Exception as e:
 			_exc = Error( e )
@@ -495,11 +499,12 @@ class File( Path ):
 			_err = ErrorDialog( _exc )
 			_err.show( )
 	
-	def iterlines( self ):
+	def iterlines( self, buffer: int = 1 << 16 ):
 		'''
-		Purpose: iterates lines of 'self.input'
+		Purpose: iterates lines of 'self.input' through a read buffer of
+		'buffer' bytes, holding one buffer of the file at a time
 
-		Parameters: void
+		Parameters: buffer: int
 
 		Returns: Generator
 		'''
@@ -508,14 +513,61 @@ class File( Path ):
 				_msg = "The 'path' is not a file!"
 				raise Exception( _msg )
 			else:
-				file = open( self.input )
-				for i in file.readlines( ):
-					yield i
+				with open( self.input, buffering = buffer ) as _file:
+					for _line in _file:
+						yield _line
 		except Exception as e:
 			_exc = Error( e )
 			_exc.module = 'FileSys'
 			_exc.cause = 'File'
-			_exc.method = 'iterlines( )'
+			_exc.method = 'iterlines( self, buffer )'
+			_err = ErrorDialog( _exc )
+			_err.show( )
+	
+	def iterchunks( self, size: int = 1 << 20 ):
+		'''
+		Purpose: iterates the bytes of 'self.input' in chunks of 'size' bytes
+
+		Parameters: size: int
+
+		Returns: Generator
+		'''
+		try:
+			if os.path.isfile( self.input ) == False:
+				_msg = "The 'path' is not a file!"
+				raise Exception( _msg )
+			else:
+				with open( self.input, 'rb', buffering = 0 ) as _file:
+					for _chunk in iter( lambda: _file.read( size ), b'' ):
+						yield _chunk
+		except Exception as e:
+			_exc = Error( e )
+			_exc.module = 'FileSys'
+			_exc.cause = 'File'
+			_exc.method = 'iterchunks( self, size )'
+			_err = ErrorDialog( _exc )
+			_err.show( )
+	
+	def get_index( self ):
+		'''
+		Purpose: returns a LineIndex giving random access to the lines of
+		'self.input' through a memory map
+
+		Parameters: void
+
+		Returns: LineIndex
+		'''
+		try:
+			if os.path.isfile( self.input ) == False:
+				_msg = "The 'path' is not a file!"
+				raise Exception( _msg )
+			else:
+				return LineIndex( self.input )
+		except Exception as e:
+			_exc = Error( e )
+			_exc.module = 'FileSys'
+			_exc.cause = 'File'
+			_exc.method = 'get_index( self )'
 			_err = ErrorDialog( _exc )
 			_err.show( )
 	
@@ -534,10 +586,8 @@ class File( Path ):
 				_msg = "The 'path' is not a file!"
 				raise Exception( _msg )
 			else:
-				_file = open( self.input )
-				for i in _file.readlines( ):
-					_contents.append( i )
-				_file.close( )
+				with open( self.input ) as _file:
+					_contents.extend( _file )
 				return _contents
 		except Exception as e:
 			_exc = Error( e )
@@ -574,11 +624,13 @@ class File( Path ):
 			_err = ErrorDialog( _exc )
 			_err.show( )
 	
-	def writelines( self, lines: list[ str ] ):
+	def writelines( self, lines: list[ str ], batch: int = 10000, buffer: int = 1 << 20 ):
 		'''
-		Purpose: writes lines in 'lines' to file 'self.input'
+		Purpose: appends 'lines', a list or any iterable of strings, to file
+		'self.input', joining 'batch' lines into each write through a
+		'buffer'-byte buffer
 
-		Parameters: list[ str ]
+		Parameters: lines: list[ str ], batch: int, buffer: int
 
 		Returns: void
 		'''
@@ -589,46 +641,37 @@ class File( Path ):
 				raise Exception( _msg )
 			else:
 				_path = os.path.relpath( self.input )
-				_contents = open( _path, 'a' )
-				for line in lines:
-					_contents.write( line )
-				_contents.flush( )
-				_contents.close( )
+				_lines = iter( lines )
+				with open( _path, 'a', buffering = buffer ) as _contents:
+					for _batch in iter( lambda: list( islice( _lines, batch ) ), [ ] ):
+						_contents.write( ''.join( _batch ) )
+				self.size = os.path.getsize( self.input )
 		except Exception as e:
 			_exc = Error( e )
 			_exc.module = 'FileSys'
 			_exc.cause = 'File'
-			_exc.method = 'writelines( self, lines = None )'
+			_exc.method = 'writelines( self, lines, batch, buffer )'
 			_err = ErrorDialog( _exc )
 			_err.show( )
 	
-	def writeall( self, other: str ):
+	def writeall( self, other: str ) -> int | None:
 		'''
 
-		Purpose: writes all text in 'other' to file 'self.input'
+		Purpose: appends the contents of file 'other' to file 'self.input'
 
 		Parameters: str
 
-		Returns: void
+		Returns: int - the number of bytes appended
 
 		'''
 		
 		try:
-			_contents = [ ]
-			_lines = [ ]
 			if other is None or os.path.isfile( self.input ) == False:
 				_msg = "The argument 'other' has not been specified " \
 				       "or the 'path' is not a file!"
 				raise Exception( _msg )
 			else:
-				_path = os.path.relpath( self.input )
-				_contents = open( _path, 'a' )
-				_lines = open( other )
-				for line in _lines.readlines( ):
-					_contents.write( line )
-				_contents.flush( )
-				_lines.close( )
-				return _contents
+				return self.append( other )
 		except Exception as e:
 			_exc = Error( e )
 			_exc.module = 'FileSys'
@@ -636,6 +679,258 @@ class File( Path ):
 			_exc.method = 'writeall( self, other )'
 			_err = ErrorDialog( _exc )
 			_err.show( )
+	
+	def append( self, other: str, buffer: int = 1 << 20 ) -> int | None:
+		'''
+
+		Purpose: appends the bytes of file 'other' to file 'self.input' with
+		the fastest copy available: os.copy_file_range, which copies ( or
+		shares ) extents inside the kernel, then os.sendfile, then
+		reads of at most 'buffer' bytes. Only the size of 'other' when the
+		copy starts is appended, and 'other' may not be the file itself
+
+		Parameters: other: str, buffer: int
+
+		Returns: int - the number of bytes appended
+
+		'''
+		
+		try:
+			if other is None or os.path.isfile( other ) == False \
+					or os.path.isfile( self.input ) == False:
+				_msg = "The argument 'other' or the 'path' is not a file!"
+				raise Exception( _msg )
+			elif os.path.samefile( other, self.input ):
+				_msg = "The argument 'other' is the 'path' itself and cannot be appended!"
+				raise Exception( _msg )
+			else:
+				with open( other, 'rb' ) as _source, open( self.input, 'r+b' ) as _target:
+					_target.seek( 0, os.SEEK_END )
+					_count = self.__copy( _source, _target, buffer )
+				self.size = os.path.getsize( self.input )
+				return _count
+		except Exception as e:
+			_exc = Error( e )
+			_exc.module = 'FileSys'
+			_exc.cause = 'File'
+			_exc.method = 'append( self, other, buffer )'
+			_err = ErrorDialog( _exc )
+			_err.show( )
+	
+	def copy( self, destination: str ) -> str | None:
+		'''
+
+		Purpose: copies file 'self.input' to 'destination', replacing it, with
+		shutil.copyfile, which uses the platform's in-kernel copy
+
+		Parameters: destination: str
+
+		Returns: str - the destination path
+
+		'''
+		
+		try:
+			if destination is None or os.path.isfile( self.input ) == False:
+				_msg = "The argument 'destination' has not been specified " \
+				       "or the 'path' is not a file!"
+				raise Exception( _msg )
+			else:
+				return sh.copyfile( self.input, destination )
+		except Exception as e:
+			_exc = Error( e )
+			_exc.module = 'FileSys'
+			_exc.cause = 'File'
+			_exc.method = 'copy( self, destination )'
+			_err = ErrorDialog( _exc )
+			_err.show( )
+	
+	@staticmethod
+	def __copy( source, target, buffer: int ) -> int:
+		_size = os.fstat( source.fileno( ) ).st_size
+		_offset = target.tell( )
+		_done = 0
+		for _name in ( 'copy_file_range', 'sendfile' ):
+			if _done >= _size or not hasattr( os, _name ):
+				continue
+			try:
+				while _done < _size:
+					_count = min( _size - _done, 1 << 30 )
+					if _name == 'copy_file_range':
+						_sent = os.copy_file_range( source.fileno( ), target.fileno( ), _count,
+							_done, _offset + _done )
+					else:
+						_sent = os.sendfile( target.fileno( ), source.fileno( ), _done, _count )
+					if _sent == 0:
+						break
+					_done += _sent
+			except OSError:
+				# Not supported between these files ( e.g. across file systems );
+				# continue where the failed method stopped.
+				pass
+			target.seek( _offset + _done )
+		source.seek( _done )
+		while _done < _size:
+			_chunk = source.read( min( buffer, _size - _done ) )
+			if not _chunk:
+				break
+			target.write( _chunk )
+			_done += len( _chunk )
+		target.flush( )
+		return target.tell( ) - _offset
+
+class LineIndex( ):
+	'''
+
+	Constructor:
+
+		LineIndex( path: str, encoding: str = 'utf-8' )
+
+	Purpose:
+
+		Class giving random access to the lines of a large file through a
+		read-only memory map. The byte offset of every line is found by
+		scanning the map in blocks of 'block' bytes with numpy, so building
+		the index holds one block and eight bytes per line, and reading a
+		line touches only its own pages
+
+	'''
+	
+	block = 1 << 24
+	
+	def __init__( self, path: str, encoding: str = 'utf-8' ):
+		self.path = path
+		self.encoding = encoding
+		self.size = os.path.getsize( path )
+		self.__file = open( path, 'rb' )
+		self.__map = None
+		if self.size > 0:
+			self.__map = mmap.mmap( self.__file.fileno( ), 0, access = mmap.ACCESS_READ )
+		self.__offsets = None
+	
+	def __len__( self ) -> int:
+		return len( self.get_offsets( ) )
+	
+	def __getitem__( self, index: int ) -> str:
+		if not -len( self ) <= index < len( self ):
+			raise IndexError( 'LineIndex index out of range' )
+		return self.get_line( index )
+	
+	def __iter__( self ):
+		return self.iterlines( )
+	
+	def __enter__( self ):
+		return self
+	
+	def __exit__( self, *args ):
+		self.close( )
+	
+	def __dir__( self ) -> list[ str ]:
+		'''
+
+		Returns a list[ str ] of member names.
+
+		'''
+		return [ 'path', 'encoding', 'size', 'block', 'get_offsets',
+		         'get_line', 'get_lines', 'iterlines', 'close' ]
+	
+	def get_offsets( self ) -> np.ndarray:
+		'''
+
+		Purpose: builds, once, the byte offset where each line starts
+
+		Parameters: void
+
+		Returns: np.ndarray
+
+		'''
+		if self.__offsets is None:
+			_parts = [ np.zeros( 1 if self.size > 0 else 0, dtype = np.int64 ) ]
+			for _start in range( 0, self.size, self.block ):
+				_count = min( self.block, self.size - _start )
+				_view = np.frombuffer( self.__map, dtype = np.uint8, count = _count,
+					offset = _start )
+				_parts.append( np.flatnonzero( _view == 10 ).astype( np.int64 ) + _start + 1 )
+				del _view
+			_offsets = np.concatenate( _parts )
+			if len( _offsets ) > 0 and _offsets[ -1 ] == self.size:
+				_offsets = _offsets[ :-1 ]
+			self.__offsets = _offsets
+		return self.__offsets
+	
+	def get_line( self, index: int ) -> str:
+		'''
+
+		Purpose: returns the line at 'index', with its line ending
+
+		Parameters: index: int
+
+		Returns: str
+
+		'''
+		try:
+			_offsets = self.get_offsets( )
+			_start = int( _offsets[ index ] )
+			_index = index % len( _offsets )
+			_end = int( _offsets[ _index + 1 ] ) if _index + 1 < len( _offsets ) else self.size
+			return self.__map[ _start:_end ].decode( self.encoding, errors = 'replace' )
+		except Exception as e:
+			_exc = Error( e )
+			_exc.module = 'FileSys'
+			_exc.cause = 'LineIndex'
+			_exc.method = 'get_line( self, index )'
+			_err = ErrorDialog( _exc )
+			_err.show( )
+	
+	def get_lines( self, start: int, stop: int ) -> list[ str ]:
+		'''
+
+		Purpose: returns the lines from 'start' up to 'stop', read as one slice
+		of the map
+
+		Parameters: start: int, stop: int
+
+		Returns: list[ str ]
+
+		'''
+		_offsets = self.get_offsets( )
+		start, stop, _ = slice( start, stop ).indices( len( _offsets ) )
+		if start >= stop:
+			return [ ]
+		_end = int( _offsets[ stop ] ) if stop < len( _offsets ) else self.size
+		_parts = self.__map[ int( _offsets[ start ] ):_end ].split( b'\n' )
+		_lines = [ p.decode( self.encoding, errors = 'replace' ) + '\n' for p in _parts[ :-1 ] ]
+		if _parts[ -1 ]:
+			_lines.append( _parts[ -1 ].decode( self.encoding, errors = 'replace' ) )
+		return _lines
+	
+	def iterlines( self, start: int = 0, count: int = 10000 ):
+		'''
+
+		Purpose: iterates the lines from 'start' to the end, decoding 'count'
+		lines at a time
+
+		Parameters: start: int, count: int
+
+		Returns: Generator
+
+		'''
+		for _first in range( start, len( self ), count ):
+			yield from self.get_lines( _first, _first + count )
+	
+	def close( self ):
+		'''
+
+		Purpose: releases the memory map and the file handle
+
+		Parameters: void
+
+		Returns: void
+
+		'''
+		if self.__map is not None:
+			self.__map.close( )
+			self.__map = None
+		self.__file.close( )
 
 class Folder( Path ):
 	'''
@@ -954,21 +1249,28 @@ class Excel( ):
 
 	Constructor:
 
-		Excel( path: str )
+		Excel( path: str, write_only: bool = False )
 
 	Purpose:
 
-		Class provides the spreadsheet for reports
+		Class provides the spreadsheet for reports. With 'write_only' the
+		workbook streams rows to disk as they are appended, holds constant
+		memory and can be saved once
 
 	'''
 	
-	def __init__( self, path: str ):
+	def __init__( self, path: str, write_only: bool = False ):
 		self.internal_path = r'../etc/templates/report/Excel.xlsx'
 		self.external_path = path
 		self.name = os.path.split( path )[ 1 ]
 		self.title = self.name.split( '.' )[ 0 ]
-		self.workbook = Workbook( )
-		self.worksheet = Workbook( ).create_sheet( self.title, 0 )
+		self.write_only = write_only
+		self.workbook = Workbook( write_only = write_only )
+		if write_only:
+			self.worksheet = self.workbook.create_sheet( self.title )
+		else:
+			self.worksheet = self.workbook.active
+			self.worksheet.title = self.title
 	
 	def __str__( self ) -> str | None:
 		if self.external_path is not None:
@@ -981,7 +1283,7 @@ class Excel( ):
 
 		'''
 		return [ 'internal_path', 'external_path', 'name',
-		         'title', 'workbook', 'worksheet', 'save' ]
+		         'title', 'write_only', 'workbook', 'worksheet', 'save' ]
 	
 	def save( self ):
 		'''
@@ -1008,25 +1310,35 @@ class ExcelReport( Excel ):
 
 	Constructor:
 
-		ExcelReport( path: str, rows: int = 46, cols: int = 12 ).
+		ExcelReport( path: str, rows: int = 46, cols: int = 12, write_only: bool = False ).
 
 	Purpose:
 
-		Class providing spreadsheet for reports
+		Class providing spreadsheet for reports. Rows from a DataFrame, a
+		cursor or any iterable of tuples are appended to one or more sheets
+		with the named styles in 'styles', which are registered with the
+		workbook once on first use. In write-only mode a report of any length
+		is written with constant memory
 
 	'''
 	
-	def __init__( self, path: str = None, rows: int = 46, cols: int = 12 ):
-		super( ).__init__( path )
-		self.internal = super( ).internal_path
-		self.path = super( ).external_path
-		self.name = super( ).name
+	styles = { 'Header': { 'font': { 'bold': True, 'color': 'FFFFFF' },
+	                       'fill': '1B262E', 'horizontal': 'center' },
+	           'Text': { },
+	           'Number': { 'number_format': '#,##0', 'horizontal': 'right' },
+	           'Currency': { 'number_format': '#,##0.00', 'horizontal': 'right' },
+	           'Date': { 'number_format': 'mm/dd/yyyy', 'horizontal': 'center' } }
+	
+	def __init__( self, path: str = None, rows: int = 46, cols: int = 12,
+	              write_only: bool = False ):
+		super( ).__init__( path, write_only )
+		self.internal = self.internal_path
+		self.path = self.external_path
 		self.rows = rows
 		self.columns = cols
 		self.dimensions = ( rows, cols )
-		self.title = super( ).title
-		self.workbook = super( ).workbook
-		self.worksheet = super( ).worksheet
+		self.__registered = set( )
+		self.__used = False
 	
 	def __dir__( self ) -> list[ str ]:
 		'''
@@ -1034,7 +1346,131 @@ class ExcelReport( Excel ):
 		Returns a list[ str ] of member names.
 
 		'''
-		return [ 'rows', 'columns', 'dimensions' ]
+		return [ 'rows', 'columns', 'dimensions', 'styles',
+		         'get_style', 'add_sheet', 'write_rows', 'write_frame' ]
+	
+	def get_style( self, name: str ) -> str:
+		'''
+
+		Purpose: registers the named style 'name' from 'styles' with the
+		workbook the first time it is used
+
+		Parameters: name: str
+
+		Returns: str - the style name to assign to cells
+
+		'''
+		if name not in self.__registered:
+			_spec = self.styles[ name ]
+			_style = NamedStyle( name = name )
+			if 'font' in _spec:
+				_style.font = Font( **_spec[ 'font' ] )
+			if 'fill' in _spec:
+				_style.fill = PatternFill( 'solid', start_color = _spec[ 'fill' ],
+					end_color = _spec[ 'fill' ] )
+			if 'horizontal' in _spec:
+				_style.alignment = Alignment( horizontal = _spec[ 'horizontal' ] )
+			if 'number_format' in _spec:
+				_style.number_format = _spec[ 'number_format' ]
+			if name not in self.workbook.named_styles:
+				self.workbook.add_named_style( _style )
+			self.__registered.add( name )
+		return name
+	
+	def add_sheet( self, title: str ):
+		'''
+
+		Purpose: adds a sheet to the report, reusing the initial sheet while
+		nothing has been written to it
+
+		Parameters: title: str
+
+		Returns: Worksheet
+
+		'''
+		try:
+			if not self.__used:
+				self.worksheet.title = title
+			else:
+				self.worksheet = self.workbook.create_sheet( title )
+			self.__used = True
+			return self.worksheet
+		except Exception as e:
+			_exc = Error( e )
+			_exc.module = 'FileSys'
+			_exc.cause = 'ExcelReport'
+			_exc.method = 'add_sheet( self, title: str )'
+			_err = ErrorDialog( _exc )
+			_err.show( )
+	
+	def write_rows( self, rows, columns: list[ str ] = None, styles: dict = None,
+	                sheet = None ) -> int:
+		'''
+
+		Purpose: appends 'rows', an iterable of tuples such as a cursor or a
+		generator, to 'sheet' ( the current sheet by default ) under a styled,
+		frozen header row of 'columns'. A cursor's column names are used when
+		'columns' is None. 'styles' maps column names to names in 'styles';
+		unstyled values are appended as they are, which is the fast path
+
+		Parameters: rows: iterable, columns: list[ str ], styles: dict, sheet: Worksheet
+
+		Returns: int - the number of rows written
+
+		'''
+		try:
+			_sheet = sheet or self.worksheet
+			self.__used = True
+			if columns is None and getattr( rows, 'description', None ):
+				columns = [ d[ 0 ] for d in rows.description ]
+			if columns:
+				_header = self.get_style( 'Header' )
+				_sheet.freeze_panes = 'A2'
+				_cells = [ ]
+				for _name in columns:
+					_cell = WriteOnlyCell( _sheet, value = _name )
+					_cell.style = _header
+					_cells.append( _cell )
+				_sheet.append( _cells )
+			_styled = { }
+			for _name, _style in ( styles or { } ).items( ):
+				_styled[ columns.index( _name ) ] = self.get_style( _style )
+			_count = 0
+			for _row in rows:
+				if _styled:
+					_row = list( _row )
+					for _index, _style in _styled.items( ):
+						_cell = WriteOnlyCell( _sheet, value = _row[ _index ] )
+						_cell.style = _style
+						_row[ _index ] = _cell
+				_sheet.append( _row )
+				_count += 1
+			return _count
+		except Exception as e:
+			_exc = Error( e )
+			_exc.module = 'FileSys'
+			_exc.cause = 'ExcelReport'
+			_exc.method = 'write_rows( self, rows, columns, styles, sheet )'
+			_err = ErrorDialog( _exc )
+			_err.show( )
+	
+	def write_frame( self, frame, styles: dict = None, sheet = None,
+	                 index: bool = False ) -> int:
+		'''
+
+		Purpose: appends the rows of 'frame' to 'sheet' under its column names
+		without materializing them as a second copy
+
+		Parameters: frame: DataFrame, styles: dict, sheet: Worksheet, index: bool
+
+		Returns: int - the number of rows written
+
+		'''
+		_columns = [ str( c ) for c in frame.columns ]
+		if index:
+			_columns.insert( 0, str( frame.index.name or '' ) )
+		return self.write_rows( frame.itertuples( index = index, name = None ),
+			_columns, styles, sheet )
 
 class ZipFile( ):
 	'''
@@ -45,8 +45,15 @@ from typing import List, Optional, Tuple, Union
 
 import PySimpleGUI as sg
 
+from src import Audio
 from src.Button import GREY_BUTTON, OFF_IMAGE
-from src.Configuration import APPLICATION_WIDTH, DEFAULT_MODEL, MODELS, THEME
+from src.Configuration import (
+    APPLICATION_WIDTH,
+    AUDIO_DEVICE_POLL_SECONDS,
+    DEFAULT_MODEL,
+    MODELS,
+    THEME,
+)
 
 class BtnInfo:
     """
@@ -230,10 +237,10 @@ def build_layout() -> (
     )
 
     instructions: sg.Text = create_text_area(
-        size = (int( APPLICATION_WIDTH * 0.7 ), 2),
+        size = (int( APPLICATION_WIDTH * 0.7 ), 3),
         key = "-INSTRUCTIONS-",
         text = "Press 'R' to start recording\nPress 'A' to transcribe the recording and provide "
-               "answers",
+               "answers\nPress 'D' to rescan the audio devices",
     )
 
     model = sg.Combo(
@@ -324,6 +331,12 @@ def initialize_window() -> sg.Window:
     """
     sg.theme( THEME )
 
+    # Resolve the audio device before the first recording, and watch for hot-plugged devices
+    # when periodic rescans are enabled
+    Audio.devices.warm_up( )
+    if AUDIO_DEVICE_POLL_SECONDS:
+        Audio.devices.watch( AUDIO_DEVICE_POLL_SECONDS )
+
     layout: List[
         List[ Union[ sg.Text, sg.Button, sg.Frame, sg.Combo, sg.Input ] ]
     ] = build_layout()
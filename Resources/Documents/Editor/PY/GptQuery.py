@@ -41,11 +41,23 @@
   </summary>
   ******************************************************************************************
   '''
+import time
+from typing import BinaryIO, Callable, Iterator, Optional, Union
+
 from dotenv import load_dotenv
 from loguru import logger
-from openai import ChatCompletion, OpenAI
+from openai import ChatCompletion, OpenAI, Stream
+from openai.types.chat import ChatCompletionChunk
 
-from src.Configuration import DEFAULT_MODEL, DEFAULT_POSITION, OUTPUT_FILE_NAME
+from src.Cache import ResponseCache
+from src.Configuration import (
+    DEFAULT_MODEL,
+    DEFAULT_POSITION,
+    OUTPUT_FILE_NAME,
+    RESPONSE_CACHE_PATH,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
+)
 
 SYS_PREFIX: str = "You are interviewing for a "
 SYS_SUFFIX: str = """ position.
@@ -59,40 +71,82 @@ load_dotenv()
 
 client: OpenAI = OpenAI()
 
+response_cache: ResponseCache = ResponseCache(
+    size=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL, path=RESPONSE_CACHE_PATH
+)
+
 
-def transcribe_audio(path_to_file: str = OUTPUT_FILE_NAME) -> str:
+def transcribe_audio(path_to_file: Union[str, BinaryIO] = OUTPUT_FILE_NAME) -> str:
     """
     Transcribe audio from a file using the OpenAI Whisper API.
 
     Args:
-        path_to_file (str, optional): Path to the audio file. Defaults to OUTPUT_FILE_NAME.
+        path_to_file (Union[str, BinaryIO], optional): Path to the audio file, or an open
+        binary file with a 'name' attribute. Defaults to OUTPUT_FILE_NAME.
 
     Returns:
         str: The audio transcription.
     """
-    logger.debug(f"Transcribing audio from: {path_to_file}...")
-
-    with open(path_to_file, "rb") as audio_file:
-        try:
-            transcript: str = client.audio.transcriptions.create(
-                model="whisper-1", file=audio_file, response_format="text"
-            )
-        except Exception as error:
-            logger.error(f"Can't transcribe audio: {error}")
-            raise error
+    if isinstance(path_to_file, str):
+        logger.debug(f"Transcribing audio from: {path_to_file}...")
+        with open(path_to_file, "rb") as audio_file:
+            transcript: str = create_transcription(audio_file)
+    else:
+        logger.debug(f"Transcribing audio from buffer: {getattr(path_to_file, 'name', '')}...")
+        transcript = create_transcription(path_to_file)
 
-    logger.debug("Audio transcribed.")
-    print("Transcription:", transcript)
+    logger.debug(f"Audio transcribed: {transcript}")
 
     return transcript
 
 
+def create_transcription(audio_file: BinaryIO) -> str:
+    """
+    Send an open audio file to the OpenAI Whisper API.
+
+    Args:
+        audio_file (BinaryIO): The audio file.
+
+    Returns:
+        str: The audio transcription.
+    """
+    try:
+        return client.audio.transcriptions.create(
+            model="whisper-1", file=audio_file, response_format="text"
+        )
+    except Exception as error:
+        logger.error(f"Can't transcribe audio: {error}")
+        raise error
+
+
+def create_system_prompt(position: str = DEFAULT_POSITION, short_answer: bool = True) -> str:
+    """
+    Create the system prompt for the given position and answer length.
+
+    Args:
+        position (str, optional): The position to use. Defaults to DEFAULT_POSITION.
+        short_answer (bool, optional): Whether to ask for a short answer. Defaults to True.
+
+    Returns:
+        str: The system prompt.
+    """
+    system_prompt: str = SYS_PREFIX + position + SYS_SUFFIX
+    if short_answer:
+        system_prompt += SHORT_INSTRUCTION
+    else:
+        system_prompt += LONG_INSTRUCTION
+
+    return system_prompt
+
+
 def generate_answer(
     transcript: str,
     short_answer: bool = True,
     temperature: float = 0.7,
     model: str = DEFAULT_MODEL,
     position: str = DEFAULT_POSITION,
+    cache: Optional[bool] = None,
+    timeout: Optional[float] = None,
 ) -> str:
     """
     Generate an answer to the question using the OpenAI API.
@@ -103,19 +157,29 @@ def generate_answer(
         temperature (float, optional): The temperature to use. Defaults to 0.7.
         model (str, optional): The model to use. Defaults to DEFAULT_MODEL.
         position (str, optional): The position to use. Defaults to DEFAULT_POSITION.
+        cache (Optional[bool], optional): Whether to use the response cache. Defaults to None,
+        which caches only temperature-0 requests.
+        timeout (Optional[float], optional): The request timeout in seconds. Defaults to None,
+        which uses the client's default.
 
     Returns:
         str: The generated answer.
     """
     # Generate system content
-    system_prompt: str = SYS_PREFIX + position + SYS_SUFFIX
-    if short_answer:
-        system_prompt += SHORT_INSTRUCTION
-    else:
-        system_prompt += LONG_INSTRUCTION
+    system_prompt: str = create_system_prompt(position, short_answer)
+
+    # Look up cached answer
+    key: Optional[str] = None
+    if response_cache.is_cacheable(temperature, cache):
+        key = ResponseCache.create_key(model, system_prompt, transcript, temperature)
+        answer: Optional[str] = response_cache.get(key)
+        if answer is not None:
+            logger.debug("Answer served from cache.")
+            return answer
 
     # Generate answer
     try:
+        start: float = time.perf_counter()
         response: ChatCompletion = client.chat.completions.create(
             model=model,
             temperature=temperature,
@@ -123,9 +187,95 @@ def generate_answer(
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": transcript},
             ],
+            timeout=timeout,
         )
     except Exception as error:
         logger.error(f"Can't generate answer: {error}")
         raise error
 
-    return response.choices[0].message.content
+    answer = response.choices[0].message.content
+    if key is not None:
+        tokens: int = response.usage.total_tokens if response.usage else 0
+        response_cache.put(key, answer, time.perf_counter() - start, tokens)
+
+    return answer
+
+
+def stream_answer(
+    transcript: str,
+    short_answer: bool = True,
+    temperature: float = 0.7,
+    model: str = DEFAULT_MODEL,
+    position: str = DEFAULT_POSITION,
+    cache: Optional[bool] = None,
+    timeout: Optional[float] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> Iterator[str]:
+    """
+    Stream an answer to the question using the OpenAI API.
+
+    Args:
+        transcript (str): The audio transcription.
+        short_answer (bool, optional): Whether to generate a short answer. Defaults to True.
+        temperature (float, optional): The temperature to use. Defaults to 0.7.
+        model (str, optional): The model to use. Defaults to DEFAULT_MODEL.
+        position (str, optional): The position to use. Defaults to DEFAULT_POSITION.
+        cache (Optional[bool], optional): Whether to use the response cache. Defaults to None,
+        which caches only temperature-0 requests.
+        timeout (Optional[float], optional): The request timeout in seconds. Defaults to None,
+        which uses the client's default.
+        cancelled (Optional[Callable[[], bool]], optional): Checked before every chunk; when it
+        returns True the stream is closed and nothing is cached. Defaults to None.
+
+    Yields:
+        str: The answer deltas as they arrive. A cached answer is yielded whole.
+    """
+    system_prompt: str = create_system_prompt(position, short_answer)
+
+    # Look up cached answer
+    key: Optional[str] = None
+    if response_cache.is_cacheable(temperature, cache):
+        key = ResponseCache.create_key(model, system_prompt, transcript, temperature)
+        answer: Optional[str] = response_cache.get(key)
+        if answer is not None:
+            logger.debug("Answer served from cache.")
+            yield answer
+            return
+
+    # Stream answer
+    try:
+        start: float = time.perf_counter()
+        stream: Stream[ChatCompletionChunk] = client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": transcript},
+            ],
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout=timeout,
+        )
+    except Exception as error:
+        logger.error(f"Can't generate answer: {error}")
+        raise error
+
+    parts: list[str] = []
+    tokens: int = 0
+    try:
+        for chunk in stream:
+            if cancelled is not None and cancelled():
+                logger.debug("Answer stream cancelled.")
+                return
+
+            if chunk.usage:
+                tokens = chunk.usage.total_tokens
+
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+    finally:
+        stream.close()
+
+    if key is not None:
+        response_cache.put(key, "".join(parts), time.perf_counter() - start, tokens)
@@ -41,13 +41,24 @@
   </summary>
   ******************************************************************************************
   '''
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import PySimpleGUI as sg
 from loguru import logger
 
 from src import Audio, GptQuery
 from src.Button import OFF_IMAGE, ON_IMAGE
+from src.Configuration import (
+    FULL_ANSWER_TIMEOUT,
+    QUICK_ANSWER_TIMEOUT,
+    STREAMING_TRANSCRIPTION,
+    TRANSCRIPTION_TIMEOUT,
+)
+from src.Scheduler import AnswerScheduler
+from src.Transcriber import StreamingTranscriber
+
+scheduler: AnswerScheduler = AnswerScheduler( )
+transcriber: StreamingTranscriber = StreamingTranscriber( )
 
 def handle_events( window: sg.Window, event: str, values: Dict[ str, Any ] ) -> None:
     '''
@@ -65,26 +76,44 @@ def handle_events( window: sg.Window, event: str, values: Dict[ str, Any ] ) ->
             recording_event( window )
         elif event in ('a', 'A', '-ANALYZE_BUTTON-'):
             transcribe_event( window )
+        elif event in ('d', 'D'):
+            devices_event( window )
 
     # If the user is focused on the position input
     if event[ :6 ] in ('Return', 'Escape'):
         window[ '-ANALYZE_BUTTON-' ].set_focus()
 
+    # When a chunk of the recording has been transcribed
+    elif event == '-PARTIAL_TRANSCRIPT-':
+        session, text = values[ '-PARTIAL_TRANSCRIPT-' ]
+        if session == transcriber.session and text:
+            window[ '-TRANSCRIBED_TEXT-' ].update( text )
+
     # When the transcription is ready
     elif event == '-WHISPER-':
         answer_events( window, values )
 
+    # While the quick answer is streaming
+    elif event == '-QUICK_DELTA-':
+        generation, text = values[ '-QUICK_DELTA-' ]
+        if scheduler.is_current( generation ):
+            window[ '-QUICK_ANSWER-' ].update( text )
+
     # When the quick answer is ready
     elif event == '-QUICK_ANSWER-':
-        logger.debug( 'Quick answer generated.' )
-        print( 'Quick answer:', values[ '-QUICK_ANSWER-' ] )
-        window[ '-QUICK_ANSWER-' ].update( values[ '-QUICK_ANSWER-' ] )
+        generation, text = values[ '-QUICK_ANSWER-' ]
+        if scheduler.is_current( generation ):
+            logger.debug( 'Quick answer generated.' )
+            print( 'Quick answer:', text )
+            window[ '-QUICK_ANSWER-' ].update( text )
 
     # When the full answer is ready
     elif event == '-FULL_ANSWER-':
-        logger.debug( 'Full answer generated.' )
-        print( 'Full answer:', values[ '-FULL_ANSWER-' ] )
-        window[ '-FULL_ANSWER-' ].update( values[ '-FULL_ANSWER-' ] )
+        generation, text = values[ '-FULL_ANSWER-' ]
+        if scheduler.is_current( generation ):
+            logger.debug( 'Full answer generated.' )
+            print( 'Full answer:', text )
+            window[ '-FULL_ANSWER-' ].update( text )
 
 def recording_event( window: sg.Window ) -> None:
     '''
@@ -97,9 +126,28 @@ def recording_event( window: sg.Window ) -> None:
     button.metadata.state = not button.metadata.state
     button.update( image_data = ON_IMAGE if button.metadata.state else OFF_IMAGE )
 
-    # Record audio
+    # Record audio, transcribing chunks while recording continues
     if button.metadata.state:
-        window.perform_long_operation( lambda: audio.record( button ), '-RECORDED-' )
+        if STREAMING_TRANSCRIPTION:
+            transcriber.start( window )
+            window.perform_long_operation(
+                lambda: Audio.record( button, on_chunk = transcriber.add ), '-RECORDED-'
+            )
+        else:
+            window.perform_long_operation( lambda: Audio.record( button ), '-RECORDED-' )
+
+def devices_event( window: sg.Window ) -> None:
+    '''
+    Handle the devices event. Rescan the audio devices and resolve the input device again.
+    Nothing is rescanned while a recording is running.
+
+    Args:
+        window (sg.Window): The window element.
+    '''
+    logger.debug( 'Rescanning audio devices...' )
+    window.perform_long_operation(
+        lambda: Audio.devices.invalidate( rescan = True ), '-DEVICES_RESCANNED-'
+    )
 
 def transcribe_event( window: sg.Window ) -> None:
     '''
@@ -109,15 +157,31 @@ def transcribe_event( window: sg.Window ) -> None:
         window (sg.Window): The window element.
     '''
     transcribed_text: sg.Element = window[ '-TRANSCRIBED_TEXT-' ]
-    transcribed_text.update( 'Transcribing audio...' )
 
-    # Transcribe audio
-    window.perform_long_operation( gpt_query.transcribe_audio, '-WHISPER-' )
+    # Stop the answers of the previous analysis
+    scheduler.cancel( )
+
+    # Finish the streamed transcript, or transcribe the recorded file
+    if STREAMING_TRANSCRIPTION and transcriber.is_active( ):
+        if not transcriber.get_text( ):
+            transcribed_text.update( 'Transcribing audio...' )
+        window.perform_long_operation(
+            lambda: transcriber.finish( TRANSCRIPTION_TIMEOUT ), '-WHISPER-'
+        )
+    else:
+        transcribed_text.update( 'Transcribing audio...' )
+        window.perform_long_operation(
+            lambda: GptQuery.transcribe_audio( Audio.get_recording( ) ), '-WHISPER-'
+        )
 
 def answer_events( window: sg.Window, values: Dict[ str, Any ] ) -> None:
     '''
     Handle the answer events. Generate quick and full answers and update the text areas.
 
+    Both answers run in parallel under a new scheduler generation, which cancels any jobs
+    still running for a previous analysis. The quick answer streams into the window as it
+    arrives; the full answer is posted when complete. Each job has its own deadline.
+
     Args:
         window (sg.Window): The window element.
         values (Dict[str, Any]): The values of the window.
@@ -134,30 +198,48 @@ def answer_events( window: sg.Window, values: Dict[ str, Any ] ) -> None:
     model: str = values[ '-MODEL_COMBO-' ]
     position: str = values[ '-POSITION_INPUT-' ]
 
+    # Start a new generation, skipping a duplicate of the current one
+    generation: Optional[ int ] = scheduler.start( (audio_transcript, model, position) )
+    if generation is None:
+        return
+
     # Generate quick answer
     logger.debug( 'Generating quick answer...' )
     quick_answer.update( 'Generating quick answer...' )
-    window.perform_long_operation(
-        lambda: gpt_query.generate_answer(
+    scheduler.submit(
+        window,
+        generation,
+        'Quick answer',
+        lambda cancelled, timeout: GptQuery.stream_answer(
             audio_transcript,
             short_answer = True,
             temperature = 0,
             model = model,
             position = position,
+            timeout = timeout,
+            cancelled = cancelled,
         ),
         '-QUICK_ANSWER-',
+        QUICK_ANSWER_TIMEOUT,
+        stream_event = '-QUICK_DELTA-',
     )
 
     # Generate full answer
     logger.debug( 'Generating full answer...' )
     full_answer.update( 'Generating full answer...' )
-    window.perform_long_operation(
-        lambda: gpt_query.generate_answer(
+    scheduler.submit(
+        window,
+        generation,
+        'Full answer',
+        lambda cancelled, timeout: GptQuery.stream_answer(
             audio_transcript,
             short_answer = False,
             temperature = 0.7,
             model = model,
             position = position,
+            timeout = timeout,
+            cancelled = cancelled,
         ),
         '-FULL_ANSWER-',
+        FULL_ANSWER_TIMEOUT,
     )
@@ -41,6 +41,13 @@
   </summary>
   ******************************************************************************************
   '''
+from collections import deque
+
+try:
+	import tiktoken
+except ImportError:
+	tiktoken = None
+
 class GptMessage( ):
 	'''
 		Base class for all messages used in the GPT application
@@ -48,6 +55,16 @@ class GptMessage( ):
 	def __init__( self, prompt: str, typ: str = 'text' ) -> None:
 		self.content = prompt
 		self.type = typ
+		self.role = None
+		self.tokens = None
+	
+	def get_data( self ) -> dict:
+		'''
+		
+			Returns: dict[ str ] of the role and content sent to the chat api
+		
+		'''
+		return { 'role': self.role, 'content': self.content }
 		
 class SystemMessage( GptMessage ):
 	'''
@@ -133,9 +150,181 @@ class AssistantMessage( GptMessage ):
 class ChatLog(  ):
 	'''
 	
-	Class used to encapsulate a collection of chat messages.
+	Class used to encapsulate a collection of chat messages bounded by a token
+	budget for the model.  The system prompt is held once, no matter how many
+	times it is added.  Each message is tokenized once, when it is added, and
+	the oldest turns are evicted, or folded into a summary by the optional
+	'summarize' callable, whenever the running total exceeds the budget.
 	
 	'''
-	def __init__( self ):
-		self.messages = []
+	budgets = { 'gpt-4o': 16384, 'gpt-4-turbo': 16384, 'gpt-4': 6144,
+	            'gpt-3.5-turbo': 12288, 'o1': 16384, 'o3': 16384 }
+	default_budget = 8192
+	overhead = 4
+	encoders = { }
+	
+	def __init__( self, model: str = 'gpt-4o', budget: int = None, summarize = None ):
+		self.model = model
+		self.budget = budget if budget is not None else ChatLog.get_budget( model )
+		self.summarize = summarize
+		self.system = None
+		self.summary = None
+		self.messages = deque( )
+		self.tokens = 0
+	
+	def __len__( self ) -> int:
+		return len( self.messages )
+	
+	def __dir__( self ) -> list[ str ]:
+		'''
+		
+			Returns a list[ str ] of member names.
+		
+		'''
+		return [ 'model', 'budget', 'summarize', 'system', 'summary',
+		         'messages', 'tokens', 'get_budget', 'get_encoder', 'count_tokens',
+		         'add', 'get_messages', 'trim', 'clear' ]
+	
+	@staticmethod
+	def get_budget( model: str ) -> int:
+		'''
+		
+			Returns: the token budget for 'model', matched by the longest prefix
+		
+		'''
+		_matches = [ m for m in ChatLog.budgets if model.startswith( m ) ]
+		if not _matches:
+			return ChatLog.default_budget
+		return ChatLog.budgets[ max( _matches, key = len ) ]
+	
+	def count_tokens( self, message: GptMessage ) -> int:
+		'''
+		
+			Returns: the number of tokens 'message' adds to the request, computed
+			with tiktoken when it is installed and approximated otherwise.  The
+			count is stored on the message so it is only computed once.
+		
+		'''
+		if message.tokens is None:
+			_text = message.content or ''
+			_encoder = ChatLog.get_encoder( self.model )
+			if _encoder is not None:
+				_count = len( _encoder.encode( _text ) )
+			else:
+				_count = ( len( _text ) + 3 ) // 4
+			message.tokens = _count + ChatLog.overhead
+		return message.tokens
+	
+	@staticmethod
+	def get_encoder( model: str ):
+		'''
+		
+			Returns: the cached tiktoken encoding for 'model', or None when
+			tiktoken or its encoding files are unavailable
+		
+		'''
+		if model not in ChatLog.encoders:
+			_encoder = None
+			if tiktoken is not None:
+				try:
+					_encoder = tiktoken.encoding_for_model( model )
+				except KeyError:
+					_encoder = tiktoken.get_encoding( 'o200k_base' )
+				except Exception:
+					_encoder = None
+			ChatLog.encoders[ model ] = _encoder
+		return ChatLog.encoders[ model ]
+	
+	def add( self, message: GptMessage ) -> None:
+		'''
+		
+			Purpose: appends 'message', replacing the system prompt rather than
+			repeating it, and trims the log back under the budget.
+		
+			Parameters: message: GptMessage
+		
+			Returns: None
+		
+		'''
+		if message.role == 'system':
+			if self.system is not None:
+				if self.system.content == message.content:
+					return
+				self.tokens -= self.system.tokens
+			self.system = message
+		else:
+			self.messages.append( message )
+		self.tokens += self.count_tokens( message )
+		self.trim( )
+	
+	def trim( self ) -> None:
+		'''
+		
+			Purpose: evicts the oldest turns until the log fits the budget,
+			always keeping the newest user message and every turn after it.
+			When 'summarize' is set the evicted turns, and any earlier summary,
+			are replaced by the system message it returns, and the total is
+			checked again.  A summary that cannot fit is dropped.
+		
+			Returns: None
+		
+		'''
+		while self.tokens > self.budget:
+			_evicted = self.__evict( )
+			if not _evicted:
+				if self.summary is not None:
+					self.tokens -= self.summary.tokens
+					self.summary = None
+				break
+			if self.summarize is not None:
+				if self.summary is not None:
+					self.tokens -= self.summary.tokens
+					_evicted.insert( 0, self.summary )
+				self.summary = SystemMessage( self.summarize( _evicted ) )
+				self.tokens += self.count_tokens( self.summary )
+	
+	def __evict( self ) -> list[ GptMessage ]:
+		'''
+		
+			Returns: list[ GptMessage ] of the oldest turns removed to bring the
+			log under the budget, stopping at the newest user message, or at the
+			latest message when there is no user message.
+		
+		'''
+		_keep = len( self.messages ) - 1
+		for _index in range( len( self.messages ) - 1, -1, -1 ):
+			if self.messages[ _index ].role == 'user':
+				_keep = _index
+				break
+		_evicted = [ ]
+		while self.tokens > self.budget and len( _evicted ) < _keep:
+			_message = self.messages.popleft( )
+			self.tokens -= _message.tokens
+			_evicted.append( _message )
+		return _evicted
+	
+	def get_messages( self ) -> list[ dict ]:
+		'''
+		
+			Returns: list[ dict ] of the system prompt, the summary and the
+			retained turns in the order sent to the chat api
+		
+		'''
+		_messages = [ ]
+		if self.system is not None:
+			_messages.append( self.system.get_data( ) )
+		if self.summary is not None:
+			_messages.append( self.summary.get_data( ) )
+		_messages.extend( m.get_data( ) for m in self.messages )
+		return _messages
+	
+	def clear( self ) -> None:
+		'''
+		
+			Purpose: removes every message except the system prompt.
+		
+		'''
+		self.messages.clear( )
+		self.summary = None
+		self.tokens = self.system.tokens if self.system is not None else 0
 		
\ No newline at end of file
@@ -0,0 +1,605 @@
+'''
+  ******************************************************************************************
+      Assembly:                Boo
+      Filename:                Readers.py
+      Author:                  Terry D. Eppler
+      Created:                 05-31-2023
+
+      Last Modified By:        Terry D. Eppler
+      Last Modified On:        06-01-2023
+  ******************************************************************************************
+  <copyright file="Readers.py" company="Terry D. Eppler">
+
+     This is a Federal Budget, Finance, and Accounting application.
+     Copyright ©  2024  Terry Eppler
+
+     Permission is hereby granted, free of charge, to any person obtaining a copy
+     of this software and associated documentation files (the “Software”),
+     to deal in the Software without restriction,
+     including without limitation the rights to use,
+     copy, modify, merge, publish, distribute, sublicense,
+     and/or sell copies of the Software,
+     and to permit persons to whom the Software is furnished to do so,
+     subject to the following conditions:
+
+     The above copyright notice and this permission notice shall be included in all
+     copies or substantial portions of the Software.
+
+     THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+     INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+     FITNESS FOR A PARTICULAR PURPOSE AND NON-INFRINGEMENT.
+     IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+     DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+     ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+     DEALINGS IN THE SOFTWARE.
+
+     You can contact me at: terryeppler@gmail.com or eppler.terry@epa.gov
+
+  </copyright>
+  <summary>
+    Readers.py
+  </summary>
+  ******************************************************************************************
+  '''
+import csv
+import hashlib
+import io
+import os
+import threading
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from openpyxl import load_workbook
+from openpyxl.utils.cell import range_boundaries
+from pandas import DataFrame, concat, read_csv
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+ENGINES = ( 'auto', 'pyarrow', 'c', 'python' )
+EXCEL_ENGINES = ( 'auto', 'calamine', 'openpyxl' )
+
+class CsvParser:
+    '''
+    Pluggable CSV reader over the pandas C parser, the pyarrow streaming reader
+    and the pandas python parser.
+
+    A sample from the top of the file is used to detect the delimiter and whether
+    the first row is a header, and to infer column types: all-digit columns with
+    leading zeros, such as agency, account and program codes, are read as text so
+    they keep their zeros, and everything else is typed by the engine. Reads can be
+    projected with 'usecols' and streamed in chunks of 'chunk_size' rows.
+
+    Args:
+        path (str): The CSV file.
+        engine (str, optional): One of ENGINES; 'auto' uses pyarrow for whole-file
+            reads when it is installed and the C parser otherwise, and always uses
+            the C parser for chunked reads, because the pyarrow streaming reader
+            fixes column types from its first block. Defaults to 'auto'.
+        header (Optional[bool], optional): Whether the first row holds the column
+            names; detected from the sample when None. Defaults to None.
+        delimiter (Optional[str], optional): The field delimiter; detected from the
+            sample when None. Defaults to None.
+        usecols (Optional[Sequence[Union[str, int]]], optional): Column names or
+            positions to read. Defaults to None.
+        chunk_size (int, optional): The rows per chunk from read_chunks. Defaults to 100000.
+        sample_size (int, optional): The bytes sampled for detection. Defaults to 65536.
+    '''
+
+    def __init__(
+            self,
+            path: str,
+            engine: str = 'auto',
+            header: Optional[ bool ] = None,
+            delimiter: Optional[ str ] = None,
+            usecols: Optional[ Sequence[ Union[ str, int ] ] ] = None,
+            chunk_size: int = 100000,
+            sample_size: int = 65536,
+    ) -> None:
+        if engine not in ENGINES:
+            raise ValueError( f'engine must be one of {ENGINES}' )
+        self.path: str = path
+        self.engine: str = engine
+        self.header: Optional[ bool ] = header
+        self.delimiter: Optional[ str ] = delimiter
+        self.usecols: Optional[ Sequence[ Union[ str, int ] ] ] = usecols
+        self.chunk_size: int = chunk_size
+        self.sample_size: int = sample_size
+        self.__sample: Optional[ List[ List[ str ] ] ] = None
+        self.__dtypes: Optional[ Dict[ str, str ] ] = None
+
+    def get_engine( self, chunked: bool = False ) -> str:
+        '''
+        Args:
+            chunked (bool, optional): Whether the engine is for read_chunks.
+                Defaults to False.
+
+        Returns:
+            str: The engine reads will use.
+        '''
+        if self.engine == 'auto':
+            return 'c' if pacsv is None or chunked else 'pyarrow'
+        if self.engine == 'pyarrow' and pacsv is None:
+            raise ImportError( 'pyarrow is required for the pyarrow engine' )
+        return self.engine
+
+    def get_sample( self ) -> List[ List[ str ] ]:
+        '''
+        Returns:
+            List[List[str]]: The complete rows within the first 'sample_size' bytes.
+        '''
+        if self.__sample is None:
+            with open( self.path, 'r', newline = '', encoding = 'utf-8', errors = 'replace' ) as _file:
+                _text = _file.read( self.sample_size )
+                _more = _file.read( 1 ) != ''
+            if _more and '\n' in _text:
+                _text = _text[ :_text.rindex( '\n' ) + 1 ]
+            if self.delimiter is None:
+                try:
+                    self.delimiter = csv.Sniffer( ).sniff( _text, delimiters = ',\t;|' ).delimiter
+                except csv.Error:
+                    self.delimiter = ','
+            self.__sample = [ r for r in csv.reader( io.StringIO( _text ),
+                delimiter = self.delimiter ) if r ]
+        return self.__sample
+
+    def get_delimiter( self ) -> str:
+        '''
+        Returns:
+            str: The given or detected delimiter.
+        '''
+        self.get_sample( )
+        return self.delimiter
+
+    def detect_header( self ) -> Optional[ bool ]:
+        '''
+        Guess whether the first sampled row is a header.
+
+        The first row is a header when it has no numeric fields while a column below
+        it is mostly numeric, or when a column's first value is much longer or shorter
+        than the values under it. It is data when it has a numeric field where the rows
+        below have the same numeric shape.
+
+        Returns:
+            Optional[bool]: True or False, or None when the sample does not decide it.
+        '''
+        _sample = self.get_sample( )
+        if len( _sample ) < 2:
+            return None
+        _first, _rows = _sample[ 0 ], _sample[ 1:101 ]
+        if len( set( _first ) ) < len( _first ) or any( f.strip( ) == '' for f in _first ):
+            return False
+        _votes = 0
+        for i, _name in enumerate( _first ):
+            _values = [ r[ i ] for r in _rows if i < len( r ) and r[ i ] != '' ]
+            if len( _values ) == 0:
+                continue
+            _numeric = sum( 1 for v in _values if self.__is_number( v ) ) / len( _values )
+            if self.__is_number( _name ):
+                if _numeric > 0.9:
+                    return False
+                continue
+            if _numeric > 0.9:
+                _votes += 1
+            else:
+                _lengths = [ len( v ) for v in _values ]
+                if min( _lengths ) == max( _lengths ) and len( _name ) != _lengths[ 0 ]:
+                    _votes += 1
+                elif _name in _values:
+                    _votes -= 1
+        if _votes > 0:
+            return True
+        if _votes < 0:
+            return False
+        return None
+
+    def has_header( self ) -> bool:
+        '''
+        Returns:
+            bool: The given header flag, else the detected one, else csv.Sniffer's guess.
+        '''
+        if self.header is None:
+            self.header = self.detect_header( )
+        if self.header is None:
+            with open( self.path, 'r', newline = '', encoding = 'utf-8', errors = 'replace' ) as _file:
+                try:
+                    self.header = csv.Sniffer( ).has_header( _file.read( self.sample_size ) )
+                except csv.Error:
+                    self.header = False
+        return self.header
+
+    def get_columns( self ) -> List[ str ]:
+        '''
+        Returns:
+            List[str]: The header names, or Column0, Column1, ... without a header.
+        '''
+        _sample = self.get_sample( )
+        if len( _sample ) == 0:
+            return [ ]
+        if self.has_header( ):
+            return [ c.strip( ) for c in _sample[ 0 ] ]
+        return [ 'Column' + str( i ) for i in range( len( _sample[ 0 ] ) ) ]
+
+    def get_usecols( self ) -> Optional[ List[ str ] ]:
+        '''
+        Returns:
+            Optional[List[str]]: 'usecols' as column names, or None for every column.
+        '''
+        if self.usecols is None:
+            return None
+        _columns = self.get_columns( )
+        return [ _columns[ c ] if isinstance( c, int ) else c for c in self.usecols ]
+
+    def infer_dtypes( self ) -> Dict[ str, str ]:
+        '''
+        Infer the column types the engines would get wrong from the sample.
+
+        Returns:
+            Dict[str, str]: 'str' for each column of digit strings with leading zeros.
+        '''
+        if self.__dtypes is None:
+            _columns = self.get_columns( )
+            _rows = self.get_sample( )[ 1 if self.has_header( ) else 0: ]
+            self.__dtypes = { }
+            for i, _name in enumerate( _columns ):
+                _values = [ r[ i ].strip( ) for r in _rows if i < len( r ) ]
+                if any( len( v ) > 1 and v[ 0 ] == '0' and v.isdigit( ) for v in _values ):
+                    self.__dtypes[ _name ] = 'str'
+        return self.__dtypes
+
+    def read( self ) -> DataFrame:
+        '''
+        Read the whole file into one DataFrame.
+
+        Returns:
+            DataFrame: The parsed rows.
+        '''
+        _engine = self.get_engine( )
+        if _engine == 'pyarrow':
+            return pacsv.read_csv( self.path, **self.__get_arrow_options( ) ).to_pandas( )
+        return read_csv( self.path, **self.__get_options( _engine ) )
+
+    def read_chunks( self ) -> Iterator[ DataFrame ]:
+        '''
+        Stream the file as DataFrames of about 'chunk_size' rows. An explicit
+        'pyarrow' engine types each column from the first block, so a later
+        value that does not fit raises ArrowInvalid; 'auto' streams with the
+        C parser instead.
+
+        Yields:
+            DataFrame: The next chunk.
+        '''
+        _engine = self.get_engine( chunked = True )
+        if _engine == 'pyarrow':
+            _reader = pacsv.open_csv( self.path, **self.__get_arrow_options( ) )
+            _batches, _rows = [ ], 0
+            for _batch in _reader:
+                _batches.append( _batch )
+                _rows += _batch.num_rows
+                if _rows >= self.chunk_size:
+                    yield pa.Table.from_batches( _batches ).to_pandas( )
+                    _batches, _rows = [ ], 0
+            if len( _batches ) > 0:
+                yield pa.Table.from_batches( _batches ).to_pandas( )
+            return
+        with read_csv( self.path, chunksize = self.chunk_size,
+                **self.__get_options( _engine ) ) as _reader:
+            for _chunk in _reader:
+                yield _chunk
+
+    def __get_options( self, engine: str ) -> dict:
+        _columns = self.get_columns( )
+        return { 'sep': self.get_delimiter( ), 'engine': engine,
+                 'header': 0 if self.has_header( ) else None,
+                 'names': _columns, 'usecols': self.get_usecols( ),
+                 'dtype': self.infer_dtypes( ) or None, 'skipinitialspace': True }
+
+    def __get_arrow_options( self ) -> dict:
+        _columns = self.get_columns( )
+        _types = { c: pa.string( ) for c in self.infer_dtypes( ) }
+        _read = pacsv.ReadOptions( column_names = _columns,
+            skip_rows = 1 if self.has_header( ) else 0,
+            block_size = 1 << 22 )
+        _parse = pacsv.ParseOptions( delimiter = self.get_delimiter( ) )
+        _convert = pacsv.ConvertOptions( column_types = _types,
+            include_columns = self.get_usecols( ) )
+        return { 'read_options': _read, 'parse_options': _parse,
+                 'convert_options': _convert }
+
+    @staticmethod
+    def __is_number( value: str ) -> bool:
+        try:
+            float( value.replace( ',', '' ) )
+            return True
+        except ValueError:
+            return False
+
+
+class ExcelParser:
+    '''
+    Streaming reader for one sheet, or one cell range of a sheet, of a workbook.
+
+    Rows are read with python-calamine when it is installed and with openpyxl in
+    read-only mode otherwise, so only the selected cells are parsed and a chunk
+    of rows is held at a time. Complete reads are cached as memory-mapped Arrow
+    files in 'folder', keyed by the SHA-256 of the workbook and the selection, so
+    reopening an unchanged workbook skips parsing. Chunks whose columns cannot
+    be stored in Arrow, such as mixed text and numbers, turn caching off for
+    that read.
+
+    Args:
+        path (str): The .xlsx workbook.
+        sheet (Optional[str], optional): The sheet name. Defaults to the first sheet.
+        cells (Optional[str], optional): A range such as 'A1:F500' or 'B:H'.
+            Defaults to the used area of the sheet.
+        header (bool, optional): Whether the first selected row holds the column
+            names. Defaults to True.
+        engine (str, optional): One of EXCEL_ENGINES. Defaults to 'auto'.
+        chunk_size (int, optional): The rows per chunk from read_chunks. Defaults to 50000.
+        cache (bool, optional): Whether to read and write the Arrow cache. Defaults to True.
+    '''
+
+    folder: str = os.path.join( os.getcwd( ), 'db', 'excel' )
+    __lock = threading.Lock( )
+
+    def __init__(
+            self,
+            path: str,
+            sheet: Optional[ str ] = None,
+            cells: Optional[ str ] = None,
+            header: bool = True,
+            engine: str = 'auto',
+            chunk_size: int = 50000,
+            cache: bool = True,
+    ) -> None:
+        if engine not in EXCEL_ENGINES:
+            raise ValueError( f'engine must be one of {EXCEL_ENGINES}' )
+        self.path: str = path
+        self.sheet: Optional[ str ] = sheet
+        self.cells: Optional[ str ] = cells
+        self.header: bool = header
+        self.engine: str = engine
+        self.chunk_size: int = chunk_size
+        self.cache: bool = cache and pa is not None
+        self.__hash: Optional[ str ] = None
+
+    def get_engine( self ) -> str:
+        '''
+        Returns:
+            str: The engine reads will use.
+        '''
+        if self.engine == 'auto':
+            return 'openpyxl' if CalamineWorkbook is None else 'calamine'
+        if self.engine == 'calamine' and CalamineWorkbook is None:
+            raise ImportError( 'python-calamine is required for the calamine engine' )
+        return self.engine
+
+    def get_sheets( self ) -> List[ str ]:
+        '''
+        Returns:
+            List[str]: The sheet names, read without loading any cells.
+        '''
+        if self.get_engine( ) == 'calamine':
+            return list( CalamineWorkbook.from_path( self.path ).sheet_names )
+        _workbook = load_workbook( self.path, read_only = True )
+        try:
+            return list( _workbook.sheetnames )
+        finally:
+            _workbook.close( )
+
+    def get_bounds( self ) -> Tuple[ Optional[ int ], ... ]:
+        '''
+        Returns:
+            Tuple[Optional[int], ...]: The one based ( min_col, min_row, max_col, max_row )
+            of 'cells', with None for open ends.
+        '''
+        if not self.cells:
+            return ( None, None, None, None )
+        return range_boundaries( self.cells.replace( '$', '' ).upper( ) )
+
+    def get_hash( self ) -> str:
+        '''
+        Returns:
+            str: The SHA-256 of the workbook's bytes.
+        '''
+        if self.__hash is None:
+            _digest = hashlib.sha256( )
+            with open( self.path, 'rb' ) as _file:
+                for _block in iter( lambda: _file.read( 1 << 20 ), b'' ):
+                    _digest.update( _block )
+            self.__hash = _digest.hexdigest( )
+        return self.__hash
+
+    def get_cache_path( self ) -> str:
+        '''
+        Returns:
+            str: The Arrow file caching this workbook and selection.
+        '''
+        _key = hashlib.sha256(
+            repr( ( self.sheet, self.cells, self.header, self.get_engine( ) ) ).encode( ) )
+        return os.path.join( self.folder, f'{self.get_hash( )}.{_key.hexdigest( )[ :16 ]}.arrow' )
+
+    def iter_rows( self ) -> Iterator[ Tuple[ Any, ... ] ]:
+        '''
+        Stream the selected rows as tuples, skipping rows with no values. Both
+        engines start at the first column of 'cells', or at the first used column
+        of the sheet when no range is given, and fill columns without values in a
+        range with None.
+
+        Yields:
+            Tuple[Any, ...]: The next row.
+        '''
+        _min_col, _min_row, _max_col, _max_row = self.get_bounds( )
+        if self.get_engine( ) == 'calamine':
+            _workbook = CalamineWorkbook.from_path( self.path )
+            _sheet = _workbook.get_sheet_by_name( self.sheet or _workbook.sheet_names[ 0 ] )
+            _left = ( _sheet.start or ( 0, 0 ) )[ 1 ]
+            _column = _left if _min_col is None else _min_col - 1
+            _lead = ( None, ) * max( 0, _left - _column )
+            _first = max( 0, _column - _left )
+            _last = None if _max_col is None else max( 0, _max_col - _left )
+            _width = None if _max_col is None else max( 0, _max_col - _column )
+            # iter_rows starts at the first row of the sheet but at the first used column
+            for i, _row in enumerate( _sheet.iter_rows( ) ):
+                _number = i + 1
+                if _min_row is not None and _number < _min_row:
+                    continue
+                if _max_row is not None and _number > _max_row:
+                    break
+                _values = _lead + tuple( None if v == '' else int( v )
+                                         if isinstance( v, float ) and v.is_integer( ) else v
+                                         for v in _row[ _first:_last ] )
+                if _width is not None and len( _values ) < _width:
+                    _values += ( None, ) * ( _width - len( _values ) )
+                if any( v is not None for v in _values ):
+                    yield _values
+            return
+        _workbook = load_workbook( self.path, read_only = True, data_only = True )
+        try:
+            _sheet = _workbook[ self.sheet ] if self.sheet else _workbook.worksheets[ 0 ]
+            # The sheet's dimension gives the first used column, as calamine reports it
+            if _min_col is None:
+                _min_col = _sheet.min_column
+            for _row in _sheet.iter_rows( min_row = _min_row, max_row = _max_row,
+                    min_col = _min_col, max_col = _max_col, values_only = True ):
+                if any( v is not None for v in _row ):
+                    yield _row
+        finally:
+            _workbook.close( )
+
+    def get_columns( self ) -> List[ str ]:
+        '''
+        Returns:
+            List[str]: The names in the first selected row, or Column0, Column1, ...
+            for its width without a header.
+        '''
+        _rows = self.iter_rows( )
+        try:
+            _first = next( _rows, None )
+        finally:
+            _rows.close( )
+        if _first is None:
+            return [ ]
+        if self.header:
+            return self.__get_names( _first )
+        return [ 'Column' + str( i ) for i in range( len( _first ) ) ]
+
+    def read_chunks( self ) -> Iterator[ DataFrame ]:
+        '''
+        Stream the selection as DataFrames of 'chunk_size' rows, from the cache
+        when it holds this workbook and selection.
+
+        Yields:
+            DataFrame: The next chunk.
+        '''
+        _path = self.get_cache_path( ) if self.cache else None
+        if _path is not None and os.path.exists( _path ):
+            try:
+                _table = pa.ipc.open_file( pa.memory_map( _path, 'r' ) ).read_all( )
+            except ( pa.ArrowException, OSError ):
+                _table = None
+            if _table is not None:
+                for _batch in _table.to_batches( max_chunksize = self.chunk_size ):
+                    yield _batch.to_pandas( )
+                return
+        _rows = self.iter_rows( )
+        _columns = None
+        if self.header:
+            _names = next( _rows, None )
+            if _names is None:
+                return
+            _columns = self.__get_names( _names )
+        _writer, _sink, _schema = None, None, None
+        _temp = None if _path is None else f'{_path}.{os.getpid( )}.{threading.get_ident( )}.tmp'
+        _cacheable = _temp is not None
+        _complete = False
+        try:
+            while True:
+                _chunk = list( islice( _rows, self.chunk_size ) )
+                if len( _chunk ) == 0:
+                    break
+                _width = max( len( r ) for r in _chunk )
+                if _columns is None:
+                    _columns = [ 'Column' + str( i ) for i in range( _width ) ]
+                _size = len( _columns )
+                _frame = DataFrame( [ tuple( r[ :_size ] ) + ( None, ) * ( _size - len( r ) )
+                                      for r in _chunk ], columns = _columns )
+                if _cacheable:
+                    try:
+                        _table = pa.Table.from_pandas( _frame, preserve_index = False )
+                        if _writer is None:
+                            os.makedirs( self.folder, exist_ok = True )
+                            _schema = _table.schema
+                            _sink = pa.OSFile( _temp, 'wb' )
+                            _writer = pa.ipc.new_file( _sink, _schema )
+                        _writer.write_table( _table.cast( _schema ) )
+                    except ( pa.ArrowException, ValueError, TypeError ):
+                        _cacheable = False
+                yield _frame
+            _complete = True
+        finally:
+            if _writer is not None:
+                _writer.close( )
+                _sink.close( )
+                self.__store( _temp, _path if _complete and _cacheable else None )
+
+    def read( self ) -> DataFrame:
+        '''
+        Read the whole selection into one DataFrame.
+
+        Returns:
+            DataFrame: The selected rows.
+        '''
+        _chunks = list( self.read_chunks( ) )
+        if len( _chunks ) == 0:
+            return DataFrame( )
+        return _chunks[ 0 ] if len( _chunks ) == 1 else concat( _chunks, ignore_index = True )
+
+    def clear( self ) -> None:
+        '''
+        Delete the cached reads of this workbook.
+        '''
+        if not os.path.isdir( self.folder ):
+            return
+        _prefix = self.get_hash( ) + '.'
+        for _name in os.listdir( self.folder ):
+            if _name.startswith( _prefix ):
+                try:
+                    os.remove( os.path.join( self.folder, _name ) )
+                except OSError:
+                    pass
+
+    def __store( self, temp: str, path: Optional[ str ] ) -> None:
+        with self.__lock:
+            try:
+                if path is not None:
+                    os.replace( temp, path )
+                else:
+                    os.remove( temp )
+            except OSError:
+                # A cache file still mapped by another reader cannot be replaced
+                # on Windows; the next read parses the workbook again.
+                if os.path.exists( temp ):
+                    os.remove( temp )
+
+    @staticmethod
+    def __get_names( row: Tuple[ Any, ... ] ) -> List[ str ]:
+        _names, _seen = [ ], { }
+        for i, _value in enumerate( row ):
+            _name = 'Column' + str( i ) if _value is None else str( _value ).strip( )
+            if _name in _seen:
+                _seen[ _name ] += 1
+                _name = f'{_name}.{_seen[ _name ]}'
+            else:
+                _seen[ _name ] = 0
+            _names.append( _name )
+        return _names
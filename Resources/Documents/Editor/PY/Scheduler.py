@@ -0,0 +1,243 @@
+'''
+  ******************************************************************************************
+      Assembly:                Boo
+      Filename:                Scheduler.py
+      Author:                  Terry D. Eppler
+      Created:                 05-31-2023
+
+      Last Modified By:        Terry D. Eppler
+      Last Modified On:        06-01-2023
+  ******************************************************************************************
+  <copyright file="Scheduler.py" company="Terry D. Eppler">
+
+     This is a Federal Budget, Finance, and Accounting application.
+     Copyright ©  2024  Terry Eppler
+
+     Permission is hereby granted, free of charge, to any person obtaining a copy
+     of this software and associated documentation files (the “Software”),
+     to deal in the Software without restriction,
+     including without limitation the rights to use,
+     copy, modify, merge, publish, distribute, sublicense,
+     and/or sell copies of the Software,
+     and to permit persons to whom the Software is furnished to do so,
+     subject to the following conditions:
+
+     The above copyright notice and this permission notice shall be included in all
+     copies or substantial portions of the Software.
+
+     THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+     INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+     FITNESS FOR A PARTICULAR PURPOSE AND NON-INFRINGEMENT.
+     IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+     DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+     ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+     DEALINGS IN THE SOFTWARE.
+
+     You can contact me at: terryeppler@gmail.com or eppler.terry@epa.gov
+
+  </copyright>
+  <summary>
+    Scheduler.py
+  </summary>
+  ******************************************************************************************
+  '''
+import threading
+import time
+from typing import Callable, Hashable, Iterator, List, Optional
+
+import PySimpleGUI as sg
+from loguru import logger
+
+class Job:
+    '''
+    A unit of background work tagged with the generation that scheduled it.
+
+    Args:
+        generation (int): The generation the job belongs to.
+        name (str): The name of the job, used for logging.
+        timeout (float): The number of seconds the job may run before it expires.
+    '''
+
+    def __init__( self, generation: int, name: str, timeout: float ) -> None:
+        self.generation: int = generation
+        self.name: str = name
+        self.deadline: float = time.monotonic( ) + timeout
+        self.succeeded: bool = False
+        self.__cancelled: threading.Event = threading.Event( )
+
+    def cancel( self ) -> None:
+        '''
+        Signal the job to stop at its next checkpoint.
+        '''
+        self.__cancelled.set( )
+
+    def is_expired( self ) -> bool:
+        '''
+        Returns:
+            bool: True when the job has run past its deadline.
+        '''
+        return time.monotonic( ) >= self.deadline
+
+    def is_cancelled( self ) -> bool:
+        '''
+        Returns:
+            bool: True when the job was cancelled or has run past its deadline.
+        '''
+        return self.__cancelled.is_set( ) or self.is_expired( )
+
+    def remaining( self ) -> float:
+        '''
+        Returns:
+            float: The number of seconds left before the deadline.
+        '''
+        return max( 0.0, self.deadline - time.monotonic( ) )
+
+class AnswerScheduler:
+    '''
+    Schedule the quick and full answer jobs of an analysis.
+
+    Every analysis gets a new generation ID. Starting a generation cancels the jobs of the
+    previous one, and results are posted to the window as ( generation, text ) tuples so the
+    event loop can drop anything that no longer belongs to the current generation. Submitting
+    the same request while its generation is still live or already answered is a no-op.
+    '''
+
+    def __init__( self ) -> None:
+        self.generation: int = 0
+        self.key: Optional[ Hashable ] = None
+        self.jobs: List[ Job ] = [ ]
+        self.__lock: threading.Lock = threading.Lock( )
+
+    def start( self, key: Optional[ Hashable ] = None ) -> Optional[ int ]:
+        '''
+        Begin a new generation and cancel the jobs of the previous one.
+
+        Args:
+            key (Optional[Hashable], optional): Identifies the request. Defaults to None.
+
+        Returns:
+            Optional[int]: The new generation, or None when 'key' duplicates the current one.
+        '''
+        with self.__lock:
+            if key is not None and key == self.key and self.jobs and all(
+                    job.succeeded or not job.is_cancelled( ) for job in self.jobs ):
+                logger.debug( f'Duplicate request ignored (generation {self.generation}).' )
+                return None
+
+            for job in self.jobs:
+                job.cancel( )
+
+            self.generation += 1
+            self.key = key
+            self.jobs = [ ]
+            return self.generation
+
+    def cancel( self ) -> None:
+        '''
+        Cancel the jobs of the current generation and retire it.
+
+        The key and the jobs are kept so that 'start' can still recognize a duplicate of
+        a request whose answers all succeeded. When every job has already succeeded there
+        is nothing left to drop, so the generation stays current and results still queued
+        in the window are shown.
+        '''
+        with self.__lock:
+            if self.jobs and all( job.succeeded for job in self.jobs ):
+                return
+
+            for job in self.jobs:
+                job.cancel( )
+
+            self.generation += 1
+
+    def is_current( self, generation: int ) -> bool:
+        '''
+        Args:
+            generation (int): The generation to check.
+
+        Returns:
+            bool: True when 'generation' is the current generation.
+        '''
+        return generation == self.generation
+
+    def submit(
+            self,
+            window: sg.Window,
+            generation: int,
+            name: str,
+            function: Callable[ [ Callable[ [ ], bool ], float ], Iterator[ str ] ],
+            event: str,
+            timeout: float,
+            stream_event: Optional[ str ] = None,
+    ) -> Optional[ Job ]:
+        '''
+        Run a streaming job on a background thread.
+
+        Args:
+            window (sg.Window): The window that receives the result events.
+            generation (int): The generation the job belongs to.
+            name (str): The name of the job, used for logging.
+            function (Callable): Called with the job's cancellation check and timeout, and
+                returns an iterator of text deltas.
+            event (str): The event posted with the final text.
+            timeout (float): The number of seconds the job may run.
+            stream_event (Optional[str], optional): The event posted with the partial text
+                after every delta. Defaults to None.
+
+        Returns:
+            Optional[Job]: The scheduled job, or None when 'generation' is no longer current.
+        '''
+        with self.__lock:
+            if not self.is_current( generation ):
+                return None
+
+            job: Job = Job( generation, name, timeout )
+            self.jobs.append( job )
+
+        thread: threading.Thread = threading.Thread(
+            target = self.__run, args = (window, job, function, event, stream_event), daemon = True
+        )
+        thread.start( )
+        return job
+
+    def __run(
+            self,
+            window: sg.Window,
+            job: Job,
+            function: Callable[ [ Callable[ [ ], bool ], float ], Iterator[ str ] ],
+            event: str,
+            stream_event: Optional[ str ],
+    ) -> None:
+        parts: List[ str ] = [ ]
+        stream: Optional[ Iterator[ str ] ] = None
+        try:
+            stream = function( job.is_cancelled, job.remaining( ) )
+            for delta in stream:
+                if job.is_cancelled( ):
+                    break
+
+                parts.append( delta )
+                if stream_event is not None:
+                    window.write_event_value( stream_event, (job.generation, ''.join( parts )) )
+        except Exception as error:
+            logger.error( f'{job.name} failed: {error}' )
+            if not job.is_cancelled( ):
+                job.cancel( )
+                window.write_event_value( event, (job.generation, f'Error: {error}') )
+            return
+        finally:
+            close: Optional[ Callable[ [ ], None ] ] = getattr( stream, 'close', None )
+            if close is not None:
+                try:
+                    close( )
+                except Exception as error:
+                    logger.warning( f'{job.name} stream did not close: {error}' )
+
+        if job.is_expired( ):
+            logger.warning( f'{job.name} timed out (generation {job.generation}).' )
+            window.write_event_value( event, (job.generation, ''.join( parts ) + ' [timed out]') )
+        elif job.is_cancelled( ):
+            logger.debug( f'{job.name} cancelled (generation {job.generation}).' )
+        else:
+            job.succeeded = True
+            window.write_event_value( event, (job.generation, ''.join( parts )) )
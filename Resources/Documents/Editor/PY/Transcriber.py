@@ -0,0 +1,235 @@
+'''
+  ******************************************************************************************
+      Assembly:                Boo
+      Filename:                Transcriber.py
+      Author:                  Terry D. Eppler
+      Created:                 05-31-2023
+
+      Last Modified By:        Terry D. Eppler
+      Last Modified On:        06-01-2023
+  ******************************************************************************************
+  <copyright file="Transcriber.py" company="Terry D. Eppler">
+
+     This is a Federal Budget, Finance, and Accounting application.
+     Copyright ©  2024  Terry Eppler
+
+     Permission is hereby granted, free of charge, to any person obtaining a copy
+     of this software and associated documentation files (the “Software”),
+     to deal in the Software without restriction,
+     including without limitation the rights to use,
+     copy, modify, merge, publish, distribute, sublicense,
+     and/or sell copies of the Software,
+     and to permit persons to whom the Software is furnished to do so,
+     subject to the following conditions:
+
+     The above copyright notice and this permission notice shall be included in all
+     copies or substantial portions of the Software.
+
+     THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+     INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+     FITNESS FOR A PARTICULAR PURPOSE AND NON-INFRINGEMENT.
+     IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+     DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+     ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+     DEALINGS IN THE SOFTWARE.
+
+     You can contact me at: terryeppler@gmail.com or eppler.terry@epa.gov
+
+  </copyright>
+  <summary>
+    Transcriber.py
+  </summary>
+  ******************************************************************************************
+  '''
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional
+
+import numpy as np
+import PySimpleGUI as sg
+from loguru import logger
+
+from src import Audio, GptQuery
+from src.Configuration import TRANSCRIPTION_TIMEOUT, TRANSCRIPTION_WORKERS, VAD_TRIM
+
+def transcribe_chunk( audio_data: np.ndarray ) -> str:
+    '''
+    Transcribe a chunk of audio without writing it to disk. Silent chunks are not uploaded.
+
+    Args:
+        audio_data (np.ndarray): The audio chunk.
+
+    Returns:
+        str: The transcription of the chunk.
+    '''
+    if VAD_TRIM:
+        audio_data, _ = Audio.trim_silence( audio_data )
+        if not len( audio_data ):
+            return ''
+
+    return GptQuery.transcribe_audio( Audio.encode_audio( audio_data ) )
+
+def normalize( word: str ) -> str:
+    '''
+    Normalize a word for overlap matching.
+
+    Args:
+        word (str): The word.
+
+    Returns:
+        str: The word in lower case without punctuation.
+    '''
+    return re.sub( r'[^\w]', '', word.lower( ) )
+
+def stitch( left: str, right: str, window: int = 12 ) -> str:
+    '''
+    Join two transcripts of overlapping audio, dropping the words they share.
+
+    Args:
+        left (str): The earlier transcript.
+        right (str): The later transcript.
+        window (int, optional): The largest number of shared words to look for. Defaults to 12.
+
+    Returns:
+        str: The joined transcript.
+    '''
+    left_words: List[ str ] = left.split( )
+    right_words: List[ str ] = right.split( )
+    if not left_words:
+        return ' '.join( right_words )
+
+    tail: List[ str ] = [ normalize( word ) for word in left_words[ -window: ] ]
+    head: List[ str ] = [ normalize( word ) for word in right_words[ :window ] ]
+    for size in range( min( len( tail ), len( head ) ), 0, -1 ):
+        if tail[ -size: ] == head[ :size ]:
+            right_words = right_words[ size: ]
+            break
+
+    return ' '.join( left_words + right_words )
+
+class StreamingTranscriber:
+    '''
+    Transcribe audio chunks on a worker pool while recording continues.
+
+    Chunks are submitted in capture order and transcribed in parallel. Each time a chunk
+    finishes, the transcripts of all leading finished chunks are stitched and posted to the
+    window as a '-PARTIAL_TRANSCRIPT-' event carrying ( session, text ).
+
+    Args:
+        workers (int, optional): The number of worker threads. Defaults to TRANSCRIPTION_WORKERS.
+        transcribe (Callable[[np.ndarray], str], optional): Transcribes one chunk.
+            Defaults to transcribe_chunk.
+    '''
+
+    def __init__(
+            self,
+            workers: int = TRANSCRIPTION_WORKERS,
+            transcribe: Callable[ [ np.ndarray ], str ] = transcribe_chunk,
+    ) -> None:
+        self.session: int = 0
+        self.window: Optional[ sg.Window ] = None
+        self.futures: List[ Future ] = [ ]
+        self.transcribe: Callable[ [ np.ndarray ], str ] = transcribe
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers = workers, thread_name_prefix = 'transcriber'
+        )
+        self.__finished: threading.Event = threading.Event( )
+        self.__lock: threading.Lock = threading.Lock( )
+
+    def start( self, window: Optional[ sg.Window ] = None ) -> int:
+        '''
+        Begin a new recording session, discarding the chunks of the previous one.
+
+        Args:
+            window (Optional[sg.Window], optional): The window that receives partial
+                transcripts. Defaults to None.
+
+        Returns:
+            int: The new session.
+        '''
+        with self.__lock:
+            for future in self.futures:
+                future.cancel( )
+
+            self.session += 1
+            self.window = window
+            self.futures = [ ]
+            self.__finished.clear( )
+            return self.session
+
+    def is_active( self ) -> bool:
+        '''
+        Returns:
+            bool: True once a recording session has been started.
+        '''
+        return self.session > 0
+
+    def add( self, audio_data: np.ndarray, final: bool = False ) -> None:
+        '''
+        Queue a chunk for transcription.
+
+        Args:
+            audio_data (np.ndarray): The audio chunk. Empty chunks are skipped.
+            final (bool, optional): Whether this is the last chunk of the session.
+                Defaults to False.
+        '''
+        with self.__lock:
+            session: int = self.session
+            if audio_data.size:
+                future: Future = self.__executor.submit( self.transcribe, audio_data )
+                future.add_done_callback( lambda _: self.__publish( session ) )
+                self.futures.append( future )
+
+            if final:
+                self.__finished.set( )
+
+    def get_text( self ) -> str:
+        '''
+        Returns:
+            str: The stitched transcript of the leading chunks that have finished.
+        '''
+        text: str = ''
+        for future in list( self.futures ):
+            if not future.done( ) or future.cancelled( ):
+                break
+
+            if future.exception( ) is None:
+                text = stitch( text, future.result( ) )
+
+        return text
+
+    def finish( self, timeout: float = TRANSCRIPTION_TIMEOUT ) -> str:
+        '''
+        Wait for the last chunk and all pending transcriptions of the session.
+
+        Args:
+            timeout (Optional[float], optional): The number of seconds to wait in total
+                for the recording to flush its last chunk and for the chunks to be
+                transcribed; chunks still running afterwards are left out. Defaults to
+                TRANSCRIPTION_TIMEOUT.
+
+        Returns:
+            str: The stitched transcript of the session.
+        '''
+        deadline: float = time.monotonic( ) + timeout
+        if not self.__finished.wait( timeout ):
+            logger.warning( 'Recording did not finish; transcribing the chunks received.' )
+
+        text: str = ''
+        for future in list( self.futures ):
+            try:
+                text = stitch( text, future.result( max( 0.0, deadline - time.monotonic( ) ) ) )
+            except FutureTimeoutError:
+                logger.warning( 'Transcription timed out; returning the chunks transcribed.' )
+                break
+            except Exception as error:
+                logger.error( f'Chunk transcription failed: {error}' )
+
+        return text
+
+    def __publish( self, session: int ) -> None:
+        if session == self.session and self.window is not None:
+            self.window.write_event_value( '-PARTIAL_TRANSCRIPT-', (session, self.get_text( )) )